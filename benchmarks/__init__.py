@@ -0,0 +1,4 @@
+"""
+效能基準測試
+包含合成測試資料產生器與基準測試執行器
+"""
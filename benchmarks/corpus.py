@@ -0,0 +1,179 @@
+"""
+合成測試資料產生器
+依指定的數量與尺寸產生 JPEG、PNG 圖片與多頁 PDF，相同參數產生相同的內容
+
+用法: python -m benchmarks.corpus OUTPUT_DIR --jpeg 50 --png 10 --pdf 5 --pages 20
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+from typing import List, Tuple
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+
+def make_image(size: Tuple[int, int], seed: int, alpha: bool = False) -> Image.Image:
+    """
+    產生具有漸層與色塊的合成圖片（壓縮特性接近一般照片與掃描檔）
+    
+    Args:
+        size: 圖片尺寸 (寬, 高)
+        seed: 亂數種子
+        alpha: 是否包含透明度
+    
+    Returns:
+        Image.Image: 合成圖片
+    """
+    rng = random.Random(seed)
+    width, height = size
+    
+    # 以小尺寸的雜訊放大作為底圖，再疊加隨機色塊
+    base = Image.new('RGB', (32, 24))
+    base.putdata([
+        (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        for _ in range(32 * 24)
+    ])
+    img = base.resize(size, Image.BICUBIC)
+    
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(width // 4 + 1), y0 + rng.randrange(height // 4 + 1)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+        else:
+            draw.ellipse((x0, y0, x1, y1), outline=color, width=3)
+    
+    if alpha:
+        mask = Image.linear_gradient('L').resize(size)
+        img.putalpha(mask)
+    
+    return img
+
+
+def make_pdf(
+    output_path: str,
+    pages: int,
+    seed: int,
+    with_images: bool = False,
+    image_size: Tuple[int, int] = (1200, 900)
+) -> None:
+    """
+    產生多頁 PDF
+    
+    Args:
+        output_path: 輸出路徑
+        pages: 頁數
+        seed: 亂數種子
+        with_images: True 表示每頁放置一張圖片，否則為文字頁
+        image_size: 圖片頁使用的圖片尺寸
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    try:
+        for page_no in range(pages):
+            page = doc.new_page()
+            if with_images:
+                buffer = _encode(make_image(image_size, rng.randrange(1 << 30)), 'JPEG')
+                page.insert_image(page.rect + (36, 36, -36, -36), stream=buffer)
+            else:
+                words = [
+                    ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 9)))
+                    for _ in range(400)
+                ]
+                page.insert_textbox(page.rect + (50, 50, -50, -50), ' '.join(words), fontsize=10)
+            page.insert_text((50, 30), f"{os.path.basename(output_path)} - {page_no + 1}/{pages}")
+        doc.save(output_path, deflate=True)
+    finally:
+        doc.close()
+
+
+def generate_corpus(
+    output_dir: str,
+    jpeg_count: int = 20,
+    png_count: int = 5,
+    pdf_count: int = 5,
+    pdf_pages: int = 10,
+    image_size: Tuple[int, int] = (2000, 1500),
+    pdf_images: bool = False,
+    seed: int = 0
+) -> dict:
+    """
+    產生測試資料集
+    
+    Args:
+        output_dir: 輸出目錄
+        jpeg_count: JPEG 圖片數量
+        png_count: PNG 圖片數量（含透明度）
+        pdf_count: PDF 數量
+        pdf_pages: 每份 PDF 的頁數
+        image_size: 圖片尺寸 (寬, 高)
+        pdf_images: PDF 頁面是否為圖片頁（否則為文字頁）
+        seed: 亂數種子
+    
+    Returns:
+        dict: 資料集清單 {'jpeg': [...], 'png': [...], 'pdf': [...]}，同時寫入 corpus.json
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    corpus = {'jpeg': [], 'png': [], 'pdf': []}
+    
+    for i in range(jpeg_count):
+        path = os.path.join(output_dir, f"photo_{i:05d}.jpg")
+        make_image(image_size, seed * 100003 + i).save(path, quality=90)
+        corpus['jpeg'].append(path)
+    
+    for i in range(png_count):
+        path = os.path.join(output_dir, f"overlay_{i:05d}.png")
+        make_image(image_size, seed * 100003 + 50000 + i, alpha=True).save(path)
+        corpus['png'].append(path)
+    
+    for i in range(pdf_count):
+        path = os.path.join(output_dir, f"document_{i:05d}.pdf")
+        make_pdf(path, pdf_pages, seed * 100003 + 90000 + i, with_images=pdf_images)
+        corpus['pdf'].append(path)
+    
+    with open(os.path.join(output_dir, 'corpus.json'), 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, indent=2)
+    
+    return corpus
+
+
+def _encode(img: Image.Image, image_format: str) -> bytes:
+    """將圖片編碼為位元組資料"""
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, quality=85)
+    return buffer.getvalue()
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    """解析「寬x高」格式"""
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv: List[str] = None) -> None:
+    """命令列主函數"""
+    parser = argparse.ArgumentParser(description='產生合成測試資料集')
+    parser.add_argument('output_dir', help='輸出目錄')
+    parser.add_argument('--jpeg', type=int, default=20, help='JPEG 圖片數量')
+    parser.add_argument('--png', type=int, default=5, help='PNG 圖片數量')
+    parser.add_argument('--pdf', type=int, default=5, help='PDF 數量')
+    parser.add_argument('--pages', type=int, default=10, help='每份 PDF 的頁數')
+    parser.add_argument('--size', type=_parse_size, default=(2000, 1500), help='圖片尺寸，寬x高')
+    parser.add_argument('--pdf-images', action='store_true', help='PDF 頁面使用圖片而非文字')
+    parser.add_argument('--seed', type=int, default=0, help='亂數種子')
+    args = parser.parse_args(argv)
+    
+    corpus = generate_corpus(
+        args.output_dir, args.jpeg, args.png, args.pdf, args.pages,
+        args.size, args.pdf_images, args.seed
+    )
+    print(json.dumps({kind: len(paths) for kind, paths in corpus.items()}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+效能基準測試執行器
+在合成資料集上執行合併流程的主要路徑，記錄耗時、每秒頁數、記憶體峰值與輸出大小，
+並可與儲存的基準結果比較以偵測效能退化
+
+每個情境在獨立的子行程中執行，確保記憶體峰值互不影響。
+
+用法:
+    python -m benchmarks.harness --output result.json
+    python -m benchmarks.harness --corpus DIR --baseline baseline.json
+    python -m benchmarks.harness --save-baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+import fitz  # PyMuPDF
+from core.file_handler import FileHandler
+from core.image_converter import ImageConverter
+from core.pdf_merger import PDFMerger
+from utils.process_memory import peak_rss_bytes
+from benchmarks.corpus import generate_corpus
+
+# 專案根目錄（子行程的工作目錄）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 與基準比較時允許的誤差比例
+DEFAULT_TOLERANCE = 0.15
+
+# 比較的指標（數值越大越差）
+COMPARED_METRICS = ('wall_seconds', 'peak_rss_mb', 'output_bytes')
+
+
+def _interleave(corpus: dict) -> List[str]:
+    """將圖片與 PDF 交錯排列，模擬混合列表"""
+    images = corpus['jpeg'] + corpus['png']
+    pdfs = corpus['pdf']
+    files = []
+    step = max(1, len(images) // max(1, len(pdfs)))
+    for i in range(max(len(pdfs), -(-len(images) // step))):
+        files.extend(images[i * step:(i + 1) * step])
+        if i < len(pdfs):
+            files.append(pdfs[i])
+    return files
+
+
+def _images_to_pdf_bytes(corpus: dict, work_dir: str, **options) -> Tuple[int, int]:
+    """ImageConverter.images_to_pdf_bytes"""
+    pdf_bytes = ImageConverter.images_to_pdf_bytes(corpus['jpeg'] + corpus['png'], **options)
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return doc.page_count, len(pdf_bytes)
+
+
+def _pdf_merger_save(corpus: dict, work_dir: str) -> Tuple[int, int]:
+    """PDFMerger.add_pdf + PDFMerger.save"""
+    output_path = os.path.join(work_dir, 'pdf_merger_save.pdf')
+    merger = PDFMerger(max_open_docs=1)
+    try:
+        for pdf_path in corpus['pdf']:
+            merger.add_pdf(pdf_path)
+        pages = merger.save(output_path)
+    finally:
+        merger.close()
+    return pages, os.path.getsize(output_path)
+
+
+def _merge_files(corpus: dict, work_dir: str, **layout_options) -> Tuple[int, int]:
+    """FileHandler.merge_files（圖片與 PDF 交錯）"""
+    output_path = os.path.join(work_dir, 'merge_files.pdf')
+    pages = FileHandler.merge_files(_interleave(corpus), output_path, layout_options=layout_options)
+    return pages, os.path.getsize(output_path)
+
+
+# 情境名稱 → (函數, 參數)
+SCENARIOS: Dict[str, Tuple[Callable, dict]] = {
+    'images_to_pdf_bytes': (_images_to_pdf_bytes, {
+        'page_size': (210, 297), 'images_per_page': (1, 1)
+    }),
+    'images_to_pdf_bytes_grid_150dpi': (_images_to_pdf_bytes, {
+        'page_size': (210, 297), 'images_per_page': (3, 3), 'target_dpi': 150
+    }),
+    'images_to_pdf_bytes_parallel': (_images_to_pdf_bytes, {
+        'page_size': (210, 297), 'images_per_page': (1, 1), 'workers': None
+    }),
+    'pdf_merger_save': (_pdf_merger_save, {}),
+    'merge_files_mixed': (_merge_files, {
+        'page_size': (210, 297), 'images_per_page': (2, 2), 'margin_mm': 10, 'spacing_mm': 5
+    }),
+}
+
+# 各輸出壓縮設定檔的耗時與檔案大小
+for _profile in PDFMerger.SAVE_PROFILES:
+    SCENARIOS[f'save_profile_{_profile}'] = (_merge_files, {
+        'page_size': (210, 297), 'images_per_page': (2, 2), 'margin_mm': 10, 'spacing_mm': 5,
+        'save_profile': _profile
+    })
+
+
+def run_scenario(name: str, corpus: dict) -> dict:
+    """
+    於目前行程執行單一情境
+    
+    Args:
+        name: 情境名稱
+        corpus: 資料集清單
+    
+    Returns:
+        dict: 耗時、頁數、每秒頁數、記憶體峰值、輸出大小
+    """
+    func, options = SCENARIOS[name]
+    with tempfile.TemporaryDirectory(prefix='mergepdf_bench_') as work_dir:
+        start = time.perf_counter()
+        pages, output_bytes = func(corpus, work_dir, **options)
+        wall = time.perf_counter() - start
+    
+    return {
+        'wall_seconds': round(wall, 4),
+        'pages': pages,
+        'pages_per_second': round(pages / wall, 2) if wall > 0 else None,
+        'peak_rss_mb': round(peak_rss_bytes() / (1024 * 1024), 1),
+        'output_bytes': output_bytes
+    }
+
+
+def run_isolated(name: str, corpus_dir: str, repeat: int) -> dict:
+    """
+    在子行程中執行情境（重複 repeat 次，耗時取最小值、記憶體取最大值）
+    
+    Returns:
+        dict: 情境結果
+    """
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.harness', '--corpus', corpus_dir, '--run-scenario', name],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"情境 {name} 執行失敗:\n{completed.stderr}")
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    
+    result = min(runs, key=lambda r: r['wall_seconds'])
+    result['peak_rss_mb'] = max(r['peak_rss_mb'] for r in runs)
+    result['runs'] = repeat
+    return result
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> List[dict]:
+    """
+    與基準結果比較
+    
+    Args:
+        results: 本次的情境結果
+        baseline: 基準的情境結果
+        tolerance: 允許的誤差比例
+    
+    Returns:
+        List[dict]: 超出誤差的指標
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = reference.get(metric), result.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append({
+                    'scenario': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': f"{(new / old - 1) * 100:+.1f}%"
+                })
+    return regressions
+
+
+def load_corpus(corpus_dir: str) -> dict:
+    """讀取資料集目錄中的 corpus.json"""
+    with open(os.path.join(corpus_dir, 'corpus.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: List[str] = None) -> int:
+    """命令列主函數"""
+    parser = argparse.ArgumentParser(description='MergePDF 效能基準測試')
+    parser.add_argument('--corpus', help='既有的資料集目錄（未指定時產生預設資料集）')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='只執行指定情境（可重複）')
+    parser.add_argument('--repeat', type=int, default=3, help='每個情境的執行次數')
+    parser.add_argument('--output', help='將結果寫入 JSON 檔案（預設輸出至標準輸出）')
+    parser.add_argument('--baseline', help='與此基準結果比較，有退化時結束代碼為 1')
+    parser.add_argument('--save-baseline', help='將本次結果儲存為基準')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='允許的退化比例')
+    parser.add_argument('--run-scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    # 子行程：執行單一情境並輸出結果
+    if args.run_scenario:
+        print(json.dumps(run_scenario(args.run_scenario, load_corpus(args.corpus))))
+        return 0
+    
+    with tempfile.TemporaryDirectory(prefix='mergepdf_corpus_') as temp_dir:
+        corpus_dir = args.corpus or temp_dir
+        if not args.corpus:
+            generate_corpus(corpus_dir)
+        corpus = load_corpus(corpus_dir)
+        
+        names = args.scenario or list(SCENARIOS)
+        results = {}
+        for name in names:
+            results[name] = run_isolated(name, corpus_dir, args.repeat)
+            print(f"{name}: {results[name]['wall_seconds']} s, "
+                  f"{results[name]['pages_per_second']} pages/s, "
+                  f"{results[name]['peak_rss_mb']} MB", file=sys.stderr)
+    
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pymupdf': fitz.VersionBind,
+            'cpu_count': os.cpu_count()
+        },
+        'corpus': {kind: len(paths) for kind, paths in corpus.items()},
+        'scenarios': results
+    }
+    
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare_to_baseline(results, baseline['scenarios'], args.tolerance)
+        if report['regressions']:
+            exit_code = 1
+    
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report_json)
+    else:
+        print(report_json)
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(report_json)
+    
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+命令列模組
+提供不需 GUI 的批次合併功能（不載入 PySide6）
+"""
@@ -0,0 +1,7 @@
+"""
+命令列子命令名稱
+不匯入任何其他模組，主程式判斷要啟動 GUI 或命令列時不必載入命令列與核心模組
+"""
+
+# 命令列支援的子命令
+COMMANDS = ('merge', 'watch')
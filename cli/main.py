@@ -0,0 +1,331 @@
+"""
+命令列進入點
+以 FileHandler 執行單一或批次合併工作，並以 JSON 輸出每個工作的耗時
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+# PyMuPDF 的訊息（含匯入時的警告）預設寫入標準輸出，會混入 JSON 報告或「-o -」的 PDF 資料，
+# 須在匯入 PyMuPDF 之前改寫至標準錯誤
+os.environ.setdefault('PYMUPDF_MESSAGE', 'fd:2')
+
+from core.file_handler import FileHandler
+from core.pdf_merger import PDFMerger
+from core.tracing import NULL_TRACER, Tracer
+from cli.commands import COMMANDS
+from cli.manifest import load_manifest
+from cli.watch import WATCH_MODES, FolderWatcher, print_result
+from utils.page_ranges import validate_page_spec
+
+# 命令列可用的頁面大小 (寬, 高) mm
+PAGE_SIZES_MM = {
+    'A4': (210, 297),
+    'LETTER': (216, 279),
+    'A3': (297, 420),
+}
+
+# 表示標準輸出的輸出路徑
+STDOUT_TARGET = '-'
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """建立命令列參數解析器"""
+    parser = argparse.ArgumentParser(
+        prog='mergepdf',
+        description='MergePDF 命令列模式：不開啟 GUI 合併圖片與 PDF'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    merge = subparsers.add_parser('merge', help='合併檔案')
+    merge.add_argument(
+        'files', nargs='*',
+        help='要合併的檔案（按順序），與 --manifest 擇一；PDF 可以「路徑@頁面範圍」只合併部分頁面，例如 report.pdf@1-5,9,20-'
+    )
+    merge.add_argument('-o', '--output', help='輸出 PDF 路徑（搭配 files 使用），- 表示寫入標準輸出')
+    merge.add_argument('-m', '--manifest', help='批次工作清單 (.json 或 .csv)')
+    merge.add_argument('--report', help='將 JSON 報告寫入檔案（預設輸出至標準輸出）')
+    merge.add_argument('--append', action='store_true', help='輸出檔案已存在時附加在其末端（增量儲存）')
+    merge.add_argument('--trace', help='將各階段耗時寫入 Chrome trace JSON（以 chrome://tracing 或 Perfetto 開啟）')
+    
+    split = merge.add_argument_group('分割輸出（輸出為 名稱_001.pdf、名稱_002.pdf…，各份平行產生）')
+    split.add_argument('--max-pages', type=int, help='每份的頁數上限')
+    split.add_argument('--max-mb', type=float, help='每份的預估大小上限 (MB)')
+    split.add_argument('--files-per-part', type=int, help='每份的輸入檔案數上限')
+    _add_layout_arguments(merge, '版面選項（套用至所有工作，清單中的設定優先）')
+    
+    watch = subparsers.add_parser('watch', help='監看資料夾，新檔案寫入完成後自動合併')
+    watch.add_argument('directory', help='監看的資料夾')
+    watch.add_argument('-o', '--output', required=True, help='輸出 PDF 路徑（batch 模式下輸出為 名稱_001.pdf…）')
+    watch.add_argument('--mode', choices=WATCH_MODES, default='batch', help='rolling 附加在同一個輸出檔案，batch 每批輸出新檔案')
+    watch.add_argument('--settle', type=float, default=2.0, help='檔案停止變動多少秒後才合併')
+    watch.add_argument('--interval', type=float, default=1.0, help='輪詢間隔 (秒)')
+    watch.add_argument('--max-wait', type=float, default=30.0, help='已穩定的檔案等候其他檔案寫入完成的最長秒數')
+    watch.add_argument('--max-jobs', type=int, default=2, help='同時進行的合併工作上限，其餘批次排隊等候')
+    watch.add_argument('--max-batch', type=int, default=500, help='每批的檔案數上限')
+    watch.add_argument('--include', help='只納入符合的檔名，以分號分隔，例如 "*.jpg;scan_*"')
+    watch.add_argument('--exclude', help='排除符合的檔名或資料夾，以分號分隔')
+    watch.add_argument('--no-recursive', action='store_true', help='不監看子資料夾')
+    watch.add_argument('--existing', action='store_true', help='一併合併啟動時已存在的檔案')
+    watch.add_argument('--once', action='store_true', help='處理完目前的檔案後即結束')
+    _add_layout_arguments(watch, '版面選項')
+    
+    return parser
+
+
+def _add_layout_arguments(parser: argparse.ArgumentParser, title: str) -> None:
+    """加入版面選項參數"""
+    layout = parser.add_argument_group(title)
+    layout.add_argument('--page-size', help='A4、LETTER、A3、寬x高 (mm) 或 original')
+    layout.add_argument('--grid', help='每頁圖片數，列x欄，例如 2x2')
+    layout.add_argument('--margin', type=float, help='頁面邊距 (mm)')
+    layout.add_argument('--spacing', type=float, help='圖片間距 (mm)')
+    layout.add_argument('--workers', type=int, help='圖片轉換的平行行程數，0 表示使用所有 CPU 核心')
+    layout.add_argument('--dpi', type=float, help='圖片降採樣的目標解析度')
+    layout.add_argument('--jpeg-quality', type=int, help='降採樣後的 JPEG 品質 (1-95)')
+    layout.add_argument('--profile', choices=sorted(PDFMerger.SAVE_PROFILES), help='輸出壓縮設定檔')
+    layout.add_argument('--page-cache', help='圖片頁面的磁碟快取目錄（重複合併相同圖片時略過轉換）')
+    layout.add_argument('--page-cache-mb', type=float, help='頁面快取的容量上限 (MB)')
+    layout.add_argument('--memory-budget', type=float, help='記憶體預算 (MB)，超過時將合併中的結果寫出至暫存檔')
+    layout.add_argument('--spill-dir', help='記憶體預算的暫存檔目錄（預設為系統暫存目錄）')
+
+
+def layout_from_args(args: argparse.Namespace) -> dict:
+    """將命令列參數轉換為 layout_options（僅包含有指定的項目）"""
+    layout = {}
+    
+    if args.page_size:
+        name = args.page_size.upper()
+        if name == 'ORIGINAL':
+            layout['page_size'] = None
+        elif name in PAGE_SIZES_MM:
+            layout['page_size'] = PAGE_SIZES_MM[name]
+        else:
+            layout['page_size'] = _parse_pair(args.page_size, float, '--page-size')
+    
+    if args.grid:
+        layout['images_per_page'] = _parse_pair(args.grid, int, '--grid')
+    if args.margin is not None:
+        layout['margin_mm'] = args.margin
+    if args.spacing is not None:
+        layout['spacing_mm'] = args.spacing
+    if args.workers is not None:
+        layout['workers'] = args.workers or None
+    if args.dpi is not None:
+        layout['target_dpi'] = args.dpi
+    if args.jpeg_quality is not None:
+        layout['jpeg_quality'] = args.jpeg_quality
+    if args.profile:
+        layout['save_profile'] = args.profile
+    if args.page_cache:
+        layout['page_cache_dir'] = args.page_cache
+    if args.page_cache_mb is not None:
+        layout['page_cache_max_mb'] = args.page_cache_mb
+    if args.memory_budget is not None:
+        layout['memory_budget_mb'] = args.memory_budget
+    if args.spill_dir:
+        layout['spill_dir'] = args.spill_dir
+    
+    return layout
+
+
+def split_from_args(args: argparse.Namespace) -> dict:
+    """將命令列參數轉換為分割規則（僅包含有指定的項目）"""
+    split = {}
+    if args.max_pages:
+        split['max_pages'] = args.max_pages
+    if args.max_mb:
+        split['max_bytes'] = int(args.max_mb * 1024 * 1024)
+    if args.files_per_part:
+        split['files_per_part'] = args.files_per_part
+    return split
+
+
+def run_job(
+    job: dict,
+    layout: dict,
+    append: bool = False,
+    tracer: Tracer = NULL_TRACER,
+    split: Optional[dict] = None
+) -> dict:
+    """
+    執行單一合併工作
+    
+    Args:
+        job: 工作 (output、files、layout，可選 append、split)
+        layout: 命令列指定的版面選項，工作本身的設定優先
+        append: 命令列指定的附加模式，工作本身的設定優先
+        tracer: 效能追蹤器 (可選)
+        split: 命令列指定的分割規則 (可選)，工作本身的設定優先
+    
+    Returns:
+        dict: 工作結果（輸出路徑、檔案數、頁數、大小、耗時、狀態）
+    """
+    result = {
+        'output': job['output'],
+        'files': len(job['files']),
+        'status': 'ok'
+    }
+    
+    # 「-」表示將 PDF 寫入標準輸出（例如以管線交給其他程式）
+    to_stdout = job['output'] == STDOUT_TARGET
+    
+    split = job.get('split', split)
+    
+    start = time.perf_counter()
+    try:
+        if split:
+            if job.get('append', append):
+                raise ValueError("分割輸出不支援附加模式")
+            parts = FileHandler.merge_split(
+                job['files'],
+                job['output'],
+                split,
+                layout_options={**layout, **job.get('layout', {})},
+                tracer=tracer
+            )
+            result['parts'] = [{**part, 'bytes': os.path.getsize(part['path'])} for part in parts]
+            result['pages'] = sum(part['pages'] for part in parts)
+            result['bytes'] = sum(part['bytes'] for part in result['parts'])
+        else:
+            result['pages'] = FileHandler.merge_files(
+                job['files'],
+                sys.stdout.buffer if to_stdout else job['output'],
+                layout_options={**layout, **job.get('layout', {})},
+                append=job.get('append', append),
+                tracer=tracer
+            )
+            if not to_stdout:
+                result['bytes'] = os.path.getsize(job['output'])
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    
+    return result
+
+
+def main(argv: Optional[List[str]] = None, start_time: Optional[float] = None) -> int:
+    """
+    命令列主函數
+    
+    Args:
+        argv: 命令列參數（不含程式名稱），None 表示使用 sys.argv
+        start_time: 程式啟動時的 time.perf_counter()，用於計算啟動時間
+    
+    Returns:
+        int: 結束代碼，所有工作成功時為 0
+    """
+    args = build_parser().parse_args(argv)
+    ready_time = time.perf_counter()
+    
+    if args.command == 'watch':
+        return watch(args)
+    
+    if args.manifest:
+        jobs = load_manifest(args.manifest)
+    elif args.files and args.output:
+        jobs = [{'output': args.output, 'files': [_parse_file_arg(f) for f in args.files], 'layout': {}}]
+    else:
+        print("請指定 --manifest，或要合併的檔案與 --output", file=sys.stderr)
+        return 2
+    
+    layout = layout_from_args(args)
+    tracer = Tracer() if args.trace else NULL_TRACER
+    split = split_from_args(args)
+    if split and args.append:
+        print("分割輸出不支援 --append", file=sys.stderr)
+        return 2
+    results = [run_job(job, layout, args.append, tracer, split) for job in jobs]
+    if args.trace:
+        tracer.save(args.trace)
+    
+    report = {
+        'startup_seconds': round(ready_time - start_time, 4) if start_time is not None else None,
+        'qt_loaded': 'PySide6' in sys.modules,
+        'total_seconds': round(time.perf_counter() - ready_time, 4),
+        'jobs': results
+    }
+    
+    report_json = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(report_json)
+    elif any(job['output'] == STDOUT_TARGET for job in jobs):
+        # 標準輸出已用於 PDF 資料，報告改寫至標準錯誤
+        print(report_json, file=sys.stderr)
+    else:
+        print(report_json)
+    
+    return 0 if all(r['status'] == 'ok' for r in results) else 1
+
+
+def watch(args: argparse.Namespace) -> int:
+    """
+    執行資料夾監看模式，每批完成時以一行 JSON 輸出結果
+    
+    Returns:
+        int: 結束代碼
+    """
+    try:
+        watcher = FolderWatcher(
+            args.directory,
+            args.output,
+            run_job,
+            layout_options=layout_from_args(args),
+            mode=args.mode,
+            settle_seconds=args.settle,
+            poll_interval=args.interval,
+            max_wait_seconds=args.max_wait,
+            max_workers=args.max_jobs,
+            max_batch_files=args.max_batch,
+            include=_split_patterns(args.include),
+            exclude=_split_patterns(args.exclude),
+            recursive=not args.no_recursive,
+            process_existing=args.existing,
+            on_result=print_result
+        )
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    
+    watcher.run(once=args.once)
+    return 0
+
+
+def _split_patterns(value: Optional[str]) -> List[str]:
+    """解析以分號或逗號分隔的檔名樣式"""
+    if not value:
+        return []
+    return [pattern.strip() for pattern in value.replace(',', ';').split(';') if pattern.strip()]
+
+
+def _parse_file_arg(value: str):
+    """
+    解析檔案參數「路徑@頁面範圍」
+    
+    路徑本身存在（檔名含 @）或 @ 之後不是有效的頁面範圍時，整個參數視為路徑
+    """
+    path, sep, pages = value.rpartition('@')
+    if not sep or not path or os.path.exists(value):
+        return value
+    try:
+        validate_page_spec(pages)
+    except ValueError:
+        return value
+    return (path, pages) if pages else path
+
+
+def _parse_pair(value: str, cast, option: str) -> tuple:
+    """解析「數值x數值」格式的參數"""
+    parts = value.lower().split('x')
+    if len(parts) != 2:
+        raise SystemExit(f"{option} 格式錯誤: {value}")
+    try:
+        return (cast(parts[0]), cast(parts[1]))
+    except ValueError:
+        raise SystemExit(f"{option} 格式錯誤: {value}")
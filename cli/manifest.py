@@ -0,0 +1,143 @@
+"""
+批次工作清單讀取
+支援 JSON 與 CSV 格式的合併工作清單
+"""
+
+import csv
+import json
+import os
+from typing import List
+from utils.page_ranges import validate_page_spec
+
+
+def load_manifest(manifest_path: str) -> List[dict]:
+    """
+    讀取工作清單
+    
+    JSON 格式：
+        {
+            "defaults": {"page_size": [210, 297], "images_per_page": [2, 2]},
+            "jobs": [
+                {"output": "a.pdf", "files": ["1.jpg", "2.pdf"], "layout": {"margin_mm": 5}},
+                {"output": "archive.pdf", "files": ["new.pdf"], "append": true},
+                {"output": "b.pdf", "files": [{"path": "report.pdf", "pages": "1-5,9,20-"}]},
+                {"output": "c.pdf", "files": ["big.pdf"], "split": {"max_pages": 1000}}
+            ]
+        }
+        亦可直接為工作列表。files 的項目可為路徑，或含 path 與 pages（頁面範圍）的物件。
+    
+    CSV 格式（每列一個檔案，output 相同的列依序組成一個工作，pages 欄位可省略）：
+        output,file,pages
+        a.pdf,1.jpg,
+        a.pdf,2.pdf,1-3
+    
+    相對路徑以清單所在目錄為基準。
+    
+    Args:
+        manifest_path: 清單檔案路徑（.json 或 .csv）
+    
+    Returns:
+        List[dict]: 工作列表，每個工作包含 output、files、layout，JSON 工作可另含 append 與
+            split（分割規則，見 FileHandler.merge_split）；
+            files 的項目為路徑，或指定頁面範圍時為 (路徑, 頁面範圍)
+    
+    Raises:
+        ValueError: 清單格式錯誤或頁面範圍格式錯誤
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    _, ext = os.path.splitext(manifest_path)
+    
+    if ext.lower() == '.csv':
+        jobs = _load_csv(manifest_path)
+    else:
+        jobs = _load_json(manifest_path)
+    
+    for job in jobs:
+        job['output'] = _resolve(base_dir, job['output'])
+        job['files'] = [_resolve_entry(base_dir, entry) for entry in job['files']]
+    
+    return jobs
+
+
+def normalize_layout(layout: dict) -> dict:
+    """將 JSON 中的列表轉為 FileHandler 使用的 tuple"""
+    layout = dict(layout)
+    for key in ('page_size', 'images_per_page'):
+        if isinstance(layout.get(key), list):
+            layout[key] = tuple(layout[key])
+    return layout
+
+
+def _load_json(manifest_path: str) -> List[dict]:
+    """讀取 JSON 清單"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    if isinstance(data, list):
+        data = {'jobs': data}
+    
+    defaults = normalize_layout(data.get('defaults', {}))
+    jobs = []
+    for index, entry in enumerate(data.get('jobs', [])):
+        if 'output' not in entry or not entry.get('files'):
+            raise ValueError(f"工作 #{index + 1} 缺少 output 或 files")
+        job = {
+            'output': entry['output'],
+            'files': [_file_entry(item) for item in entry['files']],
+            'layout': {**defaults, **normalize_layout(entry.get('layout', {}))}
+        }
+        if 'append' in entry:
+            job['append'] = bool(entry['append'])
+        if entry.get('split'):
+            job['split'] = dict(entry['split'])
+        jobs.append(job)
+    return jobs
+
+
+def _load_csv(manifest_path: str) -> List[dict]:
+    """讀取 CSV 清單，依 output 欄位分組並保持出現順序"""
+    jobs = {}
+    with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or not {'output', 'file'} <= set(reader.fieldnames):
+            raise ValueError("CSV 清單需包含 output 與 file 欄位")
+        
+        for row in reader:
+            output = (row['output'] or '').strip()
+            file_path = (row['file'] or '').strip()
+            pages = (row.get('pages') or '').strip()
+            if not output or not file_path:
+                continue
+            job = jobs.setdefault(output, {'output': output, 'files': [], 'layout': {}})
+            job['files'].append(_file_entry({'path': file_path, 'pages': pages}))
+    
+    return list(jobs.values())
+
+
+def _file_entry(item):
+    """將清單中的檔案項目轉為路徑或 (路徑, 頁面範圍)"""
+    if not isinstance(item, dict):
+        return item
+    path = item.get('path') or item.get('file')
+    if not path:
+        raise ValueError(f"檔案項目缺少 path: {item}")
+    pages = item.get('pages')
+    if not pages:
+        return path
+    validate_page_spec(pages)
+    return (path, pages)
+
+
+def _resolve_entry(base_dir: str, entry):
+    """解析檔案項目中的路徑，保留頁面範圍"""
+    if isinstance(entry, tuple):
+        return (_resolve(base_dir, entry[0]), entry[1])
+    return _resolve(base_dir, entry)
+
+
+def _resolve(base_dir: str, path: str) -> str:
+    """將相對路徑轉為以清單目錄為基準的絕對路徑"""
+    path = os.path.expanduser(path)
+    if os.path.isabs(path):
+        return path
+    return os.path.join(base_dir, path)
@@ -0,0 +1,248 @@
+"""
+資料夾監看模式
+以輪詢掃描監看資料夾，新檔案停止變動（大小與修改時間維持不變）後分批合併；
+合併在有上限的行程池中執行，大量檔案同時到達時批次會排隊等候，不會佔滿整台機器
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.folder_scanner import scan_paths
+from utils.validators import is_supported_file
+
+# 輸出模式：rolling 附加在同一個輸出檔案末端；batch 每批寫成新的檔案
+WATCH_MODES = ('rolling', 'batch')
+
+
+class FolderWatcher:
+    """資料夾監看器：輪詢 → 等待檔案穩定 → 分批排入行程池合併"""
+    
+    def __init__(
+        self,
+        watch_dir: str,
+        output_path: str,
+        job_runner: Callable[[dict, dict], dict],
+        layout_options: Optional[dict] = None,
+        mode: str = 'batch',
+        settle_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+        max_wait_seconds: float = 30.0,
+        max_workers: int = 2,
+        max_batch_files: int = 500,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        recursive: bool = True,
+        process_existing: bool = False,
+        on_result: Optional[Callable[[dict], None]] = None
+    ):
+        """
+        初始化資料夾監看器
+        
+        Args:
+            watch_dir: 監看的資料夾
+            output_path: 輸出 PDF 路徑；batch 模式下為檔名樣板，實際輸出為 名稱_001.pdf、名稱_002.pdf…
+            job_runner: 執行單一工作的函數 (工作, 版面選項) → 結果，需可序列化傳入子行程（模組層級函數）
+            layout_options: 版面選項
+            mode: 'rolling' 附加在同一個輸出檔案末端，或 'batch' 每批寫成新的檔案
+            settle_seconds: 檔案大小與修改時間維持不變多久後視為寫入完成
+            poll_interval: 輪詢間隔 (秒)
+            max_wait_seconds: 已穩定的檔案等候其他檔案寫入完成的最長時間 (秒)，持續有新檔案到達時仍會送出
+            max_workers: 同時進行的合併工作上限（rolling 模式固定為 1，以維持頁面順序）
+            max_batch_files: 每批的檔案數上限，持續有檔案到達時仍會分批送出已穩定的檔案
+            include: 只納入符合任一樣式的檔名 (可選)
+            exclude: 排除符合任一樣式的檔名或資料夾名稱 (可選)
+            recursive: 是否監看子資料夾
+            process_existing: 是否合併啟動時已存在的檔案
+            on_result: 每批完成時的回呼（於背景執行緒呼叫）
+        """
+        if mode not in WATCH_MODES:
+            raise ValueError(f"不支援的輸出模式: {mode}")
+        if not os.path.isdir(watch_dir):
+            raise ValueError(f"監看的資料夾不存在: {watch_dir}")
+        
+        self.watch_dir = watch_dir
+        self.output_path = os.path.abspath(output_path)
+        self.job_runner = job_runner
+        self.mode = mode
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.max_wait_seconds = max_wait_seconds
+        self.max_batch_files = max(1, max_batch_files)
+        self.include = include
+        self.exclude = exclude
+        self.recursive = recursive
+        self.on_result = on_result
+        
+        self.max_workers = 1 if mode == 'rolling' else max(1, max_workers)
+        
+        # 各合併工作平分 CPU 核心，避免每個工作都各自使用所有核心
+        self.layout_options = dict(layout_options or {})
+        if self.layout_options.get('workers') is None:
+            self.layout_options['workers'] = max(1, (os.cpu_count() or 1) // self.max_workers)
+        
+        self._seen: Dict[str, Tuple[int, int]] = {}  # {路徑: 已處理時的 (大小, 修改時間)}
+        self._candidates: Dict[str, Tuple[Tuple[int, int], float]] = {}  # {路徑: ((大小, 修改時間), 最後變動時間)}
+        self._outputs = {self.output_path}
+        # batch 模式的輸出（名稱_001.pdf…）可能位於監看的資料夾內，包含先前執行留下的，一律不視為輸入
+        self._output_pattern = None
+        if mode == 'batch':
+            stem, ext = os.path.splitext(os.path.normcase(self.output_path))
+            self._output_pattern = re.compile(re.escape(stem) + r'_\d{3,}' + re.escape(ext or '.pdf'))
+        self._batch_number = 0
+        self._in_flight: List[Future] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        
+        if not process_existing:
+            for path, signature in self._scan():
+                self._seen[path] = signature
+    
+    def run(self, once: bool = False) -> None:
+        """
+        開始監看，直到呼叫 stop() 或收到 KeyboardInterrupt
+        
+        Args:
+            once: 處理完目前的檔案（沒有等待中的檔案與工作）後即結束
+        """
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            while not self._stop.is_set():
+                self.poll()
+                if once and not self._candidates and not self.pending_jobs():
+                    break
+                self._stop.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # 已排入的批次仍會完成，避免檔案被標記為已處理卻沒有輸出
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def stop(self) -> None:
+        """要求停止監看（目前的輪詢結束後生效）"""
+        self._stop.set()
+    
+    def pending_jobs(self) -> int:
+        """排隊中與執行中的合併工作數"""
+        with self._lock:
+            self._in_flight = [future for future in self._in_flight if not future.done()]
+            return len(self._in_flight)
+    
+    def poll(self) -> List[str]:
+        """
+        掃描一次資料夾，送出已穩定的檔案
+        
+        Returns:
+            List[str]: 本次送出合併的檔案
+        """
+        now = time.monotonic()
+        found = set()
+        
+        for path, signature in self._scan():
+            found.add(path)
+            if self._seen.get(path) == signature:
+                continue
+            previous = self._candidates.get(path)
+            if previous is None or previous[0] != signature:
+                self._candidates[path] = (signature, now)
+        
+        # 被刪除或移走的檔案（已處理的也一併移除，記錄不會無限增長）
+        for path in list(self._candidates):
+            if path not in found:
+                del self._candidates[path]
+        for path in list(self._seen):
+            if path not in found:
+                del self._seen[path]
+        
+        stable = [
+            path for path, (signature, changed) in self._candidates.items()
+            if now - changed >= self.settle_seconds
+        ]
+        if not stable:
+            return []
+        # 仍有檔案在寫入時先等待，讓同一批掃描的檔案合併在一起；累積過多或等候過久時直接送出
+        if len(stable) < len(self._candidates) and len(stable) < self.max_batch_files:
+            stable_since = min(self._candidates[path][1] for path in stable) + self.settle_seconds
+            if now - stable_since < self.max_wait_seconds:
+                return []
+        
+        submitted = []
+        batch = []
+        for path in stable:
+            signature = self._candidates.pop(path)[0]
+            self._seen[path] = signature
+            if is_supported_file(path):
+                batch.append(path)
+            if len(batch) >= self.max_batch_files:
+                self._submit(batch)
+                submitted.extend(batch)
+                batch = []
+        if batch:
+            self._submit(batch)
+            submitted.extend(batch)
+        return submitted
+    
+    def _scan(self):
+        """掃描資料夾，逐一產生 (路徑, (大小, 修改時間))，略過本身的輸出檔案"""
+        for path in scan_paths([self.watch_dir], self.include, self.exclude, self.recursive):
+            path = os.path.abspath(path)
+            if self._is_output(path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield path, (stat.st_size, stat.st_mtime_ns)
+    
+    def _is_output(self, path: str) -> bool:
+        """是否為本監看器的輸出檔案（含 batch 模式先前執行留下的編號輸出）"""
+        if path in self._outputs:
+            return True
+        return self._output_pattern is not None and self._output_pattern.fullmatch(os.path.normcase(path)) is not None
+    
+    def _submit(self, files: List[str]) -> None:
+        """將一批檔案排入行程池"""
+        self._batch_number += 1
+        if self.mode == 'rolling':
+            job = {'output': self.output_path, 'files': files, 'append': True}
+        else:
+            job = {'output': self._next_batch_output(), 'files': files}
+        self._outputs.add(os.path.abspath(job['output']))
+        
+        future = self._executor.submit(self.job_runner, job, self.layout_options)
+        batch_number = self._batch_number
+        future.add_done_callback(lambda f: self._on_done(f, batch_number, job))
+        with self._lock:
+            self._in_flight.append(future)
+    
+    def _next_batch_output(self) -> str:
+        """batch 模式的下一個輸出路徑（略過已存在的檔案，重新啟動後接續編號）"""
+        stem, ext = os.path.splitext(self.output_path)
+        while True:
+            candidate = f"{stem}_{self._batch_number:03d}{ext or '.pdf'}"
+            if not os.path.exists(candidate) and candidate not in self._outputs:
+                return candidate
+            self._batch_number += 1
+    
+    def _on_done(self, future: Future, batch_number: int, job: dict) -> None:
+        """合併工作結束（於背景執行緒）"""
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'output': job['output'], 'files': len(job['files']), 'status': 'error', 'error': str(e)}
+        result['batch'] = batch_number
+        if self.on_result:
+            self.on_result(result)
+
+
+def print_result(result: dict) -> None:
+    """以一行 JSON 輸出批次結果（服務模式下方便以日誌收集）"""
+    print(json.dumps(result, ensure_ascii=False), flush=True)
+    if result.get('status') != 'ok':
+        print(f"批次 #{result.get('batch')} 合併失敗: {result.get('error')}", file=sys.stderr, flush=True)
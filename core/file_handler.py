@@ -4,103 +4,369 @@
 """
 
 import os
-from typing import List
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import groupby
+from typing import BinaryIO, Callable, Iterable, List, Optional, Tuple, Union
 from core.image_converter import ImageConverter
+from core.output_splitter import part_path, plan_parts
+from core.page_cache import PageCache
 from core.pdf_merger import PDFMerger
+from core.tracing import NULL_TRACER, Tracer
+from utils.page_ranges import validate_page_spec
 from utils.validators import is_image_file, is_pdf_file
 
+# 檔案項目：路徑，或 (路徑, 頁面範圍)，例如 ("report.pdf", "1-5,9,20-")
+FileEntry = Union[str, Tuple[str, Optional[str]]]
+
 
 class FileHandler:
     """檔案處理器，統籌整個合併流程"""
     
+    # 預設版面與處理選項
+    DEFAULT_LAYOUT_OPTIONS = {
+        'page_size': None,
+        'images_per_page': (1, 1),
+        'margin_mm': 0,
+        'spacing_mm': 0,
+        'max_open_docs': 1,
+        'workers': 1,
+        'target_dpi': None,
+        'jpeg_quality': 85,
+        'save_profile': 'fast',
+        'page_cache_dir': None,
+        'page_cache_max_mb': 1024,
+        'memory_budget_mb': None,
+        'spill_dir': None
+    }
+    
     @staticmethod
     def merge_files(
-        file_paths: List[str], 
-        output_path: str, 
+        file_paths: Iterable[FileEntry], 
+        output_path: Union[str, BinaryIO], 
         progress_callback=None,
-        layout_options: dict = None
-    ) -> None:
+        layout_options: dict = None,
+        append: bool = False,
+        tracer: Tracer = NULL_TRACER,
+        split_policy: Optional[dict] = None
+    ) -> int:
         """
         合併多個檔案（圖片和 PDF）為單一 PDF
         
+        檔案依輸入順序單次處理：相鄰的圖片視為一組進行排版，PDF 則插入在其
+        出現的位置，頁面產生後立即寫入同一份輸出文件。
+        
         Args:
-            file_paths: 要合併的檔案路徑列表（按順序）
-            output_path: 輸出 PDF 檔案路徑
-            progress_callback: 進度回呼函數 (可選)，接收參數 (current, total, message)
+            file_paths: 要合併的檔案（按順序），可為列表或惰性迭代器；每個項目為路徑，
+                或 (路徑, 頁面範圍) 以只合併 PDF 的部分頁面（圖片忽略頁面範圍）
+            output_path: 輸出 PDF 檔案路徑，或可寫入的二進位串流（管線、socket 包裝、BytesIO 等），
+                結果直接寫入串流而不經過暫存檔
+            progress_callback: 進度回呼函數 (可選)，接收參數 (current, total, message)；
+                輸入為迭代器時 total 為 0
             layout_options: 圖片版面選項 (可選)
                 - page_size: (寬, 高) mm 或 None
                 - images_per_page: (列, 欄)
                 - margin_mm: 邊距
                 - spacing_mm: 間距
+                - max_open_docs: 同時開啟的來源 PDF 上限，None 表示全部保留至儲存時
+                - workers: 圖片轉換的平行行程數，None 表示使用所有 CPU 核心
+                - target_dpi: 圖片降採樣的目標解析度，None 表示嵌入原始圖片
+                - jpeg_quality: 降採樣後的 JPEG 品質
+                - save_profile: 輸出壓縮設定檔（fast、balanced、smallest；MuPDF 支援線性化時另有 web），見 PDFMerger.SAVE_PROFILES
+                - page_cache_dir: 已排版圖片頁面的磁碟快取目錄，None 表示不使用快取
+                - page_cache_max_mb: 頁面快取的容量上限 (MB)，超過時淘汰最久未使用的頁面
+                - memory_budget_mb: 記憶體預算 (MB)，行程 RSS 超過時將合併中的結果寫出至暫存檔，
+                  None 表示不限制；暫存檔於工作結束或失敗時刪除
+                - spill_dir: 暫存檔的上層目錄，None 表示使用系統暫存目錄
+            append: 輸出檔案已存在時，將新頁面附加在其末端並以增量儲存寫回，
+                而非重新產生整份文件（僅適用於檔案路徑，不可與 split_policy 同時使用）
+            tracer: 效能追蹤器 (可選)，記錄每個階段與每個檔案的耗時區段，見 core.tracing
+            split_policy: 分割規則 (可選)，輸出改為多份 名稱_001.pdf、名稱_002.pdf…，見 merge_split
+                
+        Returns:
+            int: 輸出文件的頁數（分割時為所有分割檔案的總頁數）
         """
-        if not file_paths:
-            raise ValueError("檔案列表不能為空")
+        if split_policy:
+            if append:
+                raise ValueError("分割輸出不支援附加模式")
+            parts = FileHandler.merge_split(
+                file_paths, output_path, split_policy, progress_callback, layout_options, tracer
+            )
+            return sum(part['pages'] for part in parts)
+        
+        output_name = '<stream>' if PDFMerger.is_stream(output_path) else output_path
+        with tracer.span('merge_files', 'merge', output=output_name) as span:
+            page_count = FileHandler._merge_files(
+                file_paths, output_path, progress_callback, layout_options, append, tracer
+            )
+            span.set(pages=page_count)
+            return page_count
+    
+    @staticmethod
+    def _merge_files(
+        file_paths: Iterable[FileEntry],
+        output_path: Union[str, BinaryIO],
+        progress_callback,
+        layout_options: Optional[dict],
+        append: bool,
+        tracer: Tracer
+    ) -> int:
+        """merge_files 的實作（外層記錄整體耗時）"""
+        if append and PDFMerger.is_stream(output_path):
+            raise ValueError("附加模式的輸出必須為檔案路徑")
         
-        # 預設版面選項
-        if layout_options is None:
-            layout_options = {
-                'page_size': None,
-                'images_per_page': (1, 1),
-                'margin_mm': 0,
-                'spacing_mm': 0
-            }
+        # 列表可預先檢查，及早發現不支援的檔案；迭代器則在處理時檢查
+        if isinstance(file_paths, (list, tuple)):
+            if not file_paths:
+                raise ValueError("檔案列表不能為空")
+            with tracer.span('validate', 'merge', files=len(file_paths)):
+                for entry in file_paths:
+                    FileHandler._classify(entry)
+                    validate_page_spec(FileHandler.split_entry(entry)[1])
         
-        total_files = len(file_paths)
-        merger = PDFMerger()
+        # 預設版面選項（未指定的項目使用預設值）
+        layout_options = {**FileHandler.DEFAULT_LAYOUT_OPTIONS, **(layout_options or {})}
+        
+        total_files = len(file_paths) if hasattr(file_paths, '__len__') else 0
+        memory_budget = None
+        if layout_options['memory_budget_mb']:
+            memory_budget = int(layout_options['memory_budget_mb'] * 1024 * 1024)
+        merger = PDFMerger(
+            max_open_docs=layout_options['max_open_docs'],
+            append_to=output_path if append and os.path.exists(output_path) else None,
+            tracer=tracer,
+            memory_budget=memory_budget,
+            spill_dir=layout_options['spill_dir']
+        )
+        page_cache = None
+        if layout_options['page_cache_dir']:
+            page_cache = PageCache(
+                layout_options['page_cache_dir'],
+                max_bytes=int(layout_options['page_cache_max_mb'] * 1024 * 1024)
+            )
+        processed = 0
+        
+        def track_images(paths):
+            """逐張回報圖片進度"""
+            nonlocal processed
+            for entry in paths:
+                img_path = FileHandler.split_entry(entry)[0]
+                processed += 1
+                if progress_callback:
+                    progress_callback(processed, total_files, f"轉換圖片: {os.path.basename(img_path)}")
+                yield img_path
         
         try:
-            # 分離圖片和 PDF
-            image_files = []
-            pdf_files_positions = []
-            
-            for index, file_path in enumerate(file_paths):
-                if is_image_file(file_path):
-                    image_files.append((index, file_path))
-                elif is_pdf_file(file_path):
-                    pdf_files_positions.append((index, file_path))
+            # 依序處理連續的同類檔案
+            for file_type, group in groupby(file_paths, key=FileHandler._classify):
+                if file_type == 'Image':
+                    # 相鄰圖片直接排版至合併結果文件
+                    with tracer.span('images', 'merge') as span:
+                        image_pages = ImageConverter.insert_images(
+                            merger.get_output_document(),
+                            track_images(group),
+                            page_size=layout_options['page_size'],
+                            images_per_page=layout_options['images_per_page'],
+                            margin_mm=layout_options['margin_mm'],
+                            spacing_mm=layout_options['spacing_mm'],
+                            workers=layout_options['workers'],
+                            target_dpi=layout_options['target_dpi'],
+                            jpeg_quality=layout_options['jpeg_quality'],
+                            image_xrefs=merger.image_xrefs,
+                            page_cache=page_cache,
+                            tracer=tracer,
+                            checkpoint=merger.checkpoint
+                        )
+                        span.set(pages=image_pages)
                 else:
-                    raise ValueError(f"不supported的檔案格式: {file_path}")
+                    for entry in group:
+                        pdf_path, pages = FileHandler.split_entry(entry)
+                        with tracer.span('add_pdf', 'merge', file=pdf_path, pages=pages or 'all'):
+                            merger.add_pdf(pdf_path, pages)
+                        processed += 1
+                        
+                        if progress_callback:
+                            progress_callback(processed, total_files, f"處理中: {os.path.basename(pdf_path)}")
             
-            # 處理圖片檔案（批次轉換）
-            if image_files:
-                # 取得圖片路徑列表
-                img_paths = [path for _, path in image_files]
-                
-                # 使用版面選項轉換圖片
-                pdf_bytes = ImageConverter.images_to_pdf_bytes(
-                    img_paths,
-                    page_size=layout_options['page_size'],
-                    images_per_page=layout_options['images_per_page'],
-                    margin_mm=layout_options['margin_mm'],
-                    spacing_mm=layout_options['spacing_mm']
-                )
-                merger.add_pdf_bytes(pdf_bytes)
-                
-                if progress_callback:
-                    progress_callback(len(image_files), total_files, f"已轉換 {len(image_files)} 張圖片")
-            
-            # 處理 PDF 檔案
-            for index, pdf_path in pdf_files_positions:
-                file_name = os.path.basename(pdf_path)
-                merger.add_pdf(pdf_path)
-                
-                if progress_callback:
-                    progress_callback(index + 1, total_files, f"處理中: {file_name}")
+            if processed == 0:
+                raise ValueError("檔案列表不能為空")
             
             # 儲存合併結果
             if progress_callback:
-                progress_callback(total_files, total_files, "正在儲存...")
+                progress_callback(processed, total_files, "正在儲存...")
             
-            merger.save(output_path)
+            page_count = merger.save(output_path, profile=layout_options['save_profile'])
             
             if progress_callback:
-                progress_callback(total_files, total_files, "完成！")
+                progress_callback(processed, total_files, "完成！")
+            
+            return page_count
                 
         except Exception as e:
             raise Exception(f"合併檔案失敗: {str(e)}")
         finally:
             merger.close()
     
+    @staticmethod
+    def merge_split(
+        file_paths: Iterable[FileEntry],
+        output_path: str,
+        split_policy: dict,
+        progress_callback=None,
+        layout_options: dict = None,
+        tracer: Tracer = NULL_TRACER
+    ) -> List[dict]:
+        """
+        合併檔案並依分割規則輸出為多份 PDF（名稱_001.pdf、名稱_002.pdf…）
+        
+        先依規則規劃每份分割檔案的內容（超過上限的 PDF 以頁面範圍拆開），
+        各分割檔案彼此獨立，以行程池平行產生與儲存。任一份失敗時刪除已產生的分割檔案。
+        
+        Args:
+            file_paths: 要合併的檔案（按順序），項目同 merge_files
+            output_path: 輸出檔案路徑，分割檔案在其檔名後加上序號
+            split_policy: 分割規則，至少指定一項
+                - max_pages: 每份的頁數上限
+                - max_bytes: 每份的預估大小上限（依來源檔案大小估算）
+                - files_per_part: 每份的輸入檔案數上限
+            progress_callback: 進度回呼函數 (可選)，接收參數 (完成份數, 總份數, message)
+            layout_options: 版面選項，同 merge_files；workers 為同時產生的分割檔案數
+            tracer: 效能追蹤器 (可選)
+        
+        Returns:
+            List[dict]: 每份分割檔案的 {'path', 'pages', 'files'}，依序號排列
+        """
+        if PDFMerger.is_stream(output_path):
+            raise ValueError("分割輸出必須為檔案路徑")
+        
+        entries = list(file_paths)
+        if not entries:
+            raise ValueError("檔案列表不能為空")
+        for entry in entries:
+            FileHandler._classify(entry)
+            validate_page_spec(FileHandler.split_entry(entry)[1])
+        
+        layout_options = {**FileHandler.DEFAULT_LAYOUT_OPTIONS, **(layout_options or {})}
+        with tracer.span('plan_parts', 'merge', files=len(entries)) as span:
+            part_entries = plan_parts(
+                entries, split_policy, FileHandler._classify, FileHandler.split_entry,
+                layout_options['images_per_page']
+            )
+            span.set(parts=len(part_entries))
+        
+        paths = [part_path(output_path, index + 1) for index in range(len(part_entries))]
+        page_counts = [None] * len(part_entries)
+        workers = min(layout_options['workers'] or os.cpu_count() or 1, len(part_entries))
+        
+        def report(index: int):
+            if progress_callback:
+                done = sum(count is not None for count in page_counts)
+                progress_callback(done, len(part_entries), f"已產生: {os.path.basename(paths[index])}")
+        
+        try:
+            if workers > 1:
+                FileHandler._build_parts_parallel(
+                    part_entries, paths, page_counts, layout_options, workers, tracer, report
+                )
+            
+            for index, part in enumerate(part_entries):
+                if page_counts[index] is None:
+                    page_counts[index] = FileHandler.merge_files(
+                        part, paths[index], layout_options=layout_options, tracer=tracer
+                    )
+                    report(index)
+        except Exception:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        
+        return [
+            {'path': path, 'pages': pages, 'files': len(part)}
+            for path, pages, part in zip(paths, page_counts, part_entries)
+        ]
+    
+    @staticmethod
+    def _build_parts_parallel(
+        part_entries: List[list],
+        paths: List[str],
+        page_counts: list,
+        layout_options: dict,
+        workers: int,
+        tracer: Tracer,
+        report: Callable[[int], None]
+    ) -> None:
+        """
+        以行程池產生分割檔案，完成的頁數寫入 page_counts
+        
+        只有行程池無法啟動時（例如受限的沙箱）才提前返回，由呼叫端以單一行程產生
+        尚未完成的分割檔案；個別分割檔案的錯誤（例如無法寫入）直接拋出
+        """
+        # 每份內部的圖片轉換使用單一行程，避免行程數相乘
+        part_layout = {**layout_options, 'workers': 1}
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (NotImplementedError, PermissionError):
+            return
+        
+        futures = {}
+        try:
+            try:
+                for index, part in enumerate(part_entries):
+                    future = executor.submit(_build_part, part, paths[index], part_layout, tracer.enabled)
+                    futures[future] = index
+            except (BrokenProcessPool, NotImplementedError, PermissionError):
+                # 無法建立子行程
+                return
+            
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    page_counts[index], events = future.result()
+                except BrokenProcessPool:
+                    # 子行程無法啟動或異常結束，剩餘的分割檔案改用單一行程
+                    return
+                tracer.add_events(events)
+                report(index)
+        finally:
+            # 提前返回或發生錯誤時不再開始尚未執行的分割檔案
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    @staticmethod
+    def split_entry(entry: FileEntry) -> Tuple[str, Optional[str]]:
+        """
+        將檔案項目拆為 (路徑, 頁面範圍)
+        
+        Args:
+            entry: 路徑，或 (路徑, 頁面範圍)
+        
+        Returns:
+            Tuple[str, Optional[str]]: 頁面範圍為空時回傳 None（全部頁面）
+        """
+        if isinstance(entry, (tuple, list)):
+            return entry[0], (entry[1] or None)
+        return entry, None
+    
+    @staticmethod
+    def _classify(entry: FileEntry) -> str:
+        """
+        判斷檔案類型
+        
+        Returns:
+            str: 'Image' 或 'PDF'
+            
+        Raises:
+            ValueError: 不支援的檔案格式
+        """
+        file_path = FileHandler.split_entry(entry)[0]
+        if is_image_file(file_path):
+            return 'Image'
+        if is_pdf_file(file_path):
+            return 'PDF'
+        raise ValueError(f"不支援的檔案格式或內容無法辨識: {file_path}")
+    
     @staticmethod
     def get_file_info(file_path: str) -> dict:
         """
@@ -132,3 +398,22 @@ class FileHandler:
             info['error'] = str(e)
         
         return info
+
+
+def _build_part(
+    entries: list,
+    output_path: str,
+    layout_options: dict,
+    trace: bool = False
+) -> Tuple[int, List[dict]]:
+    """
+    產生單一分割檔案
+    
+    定義於模組層級，以便行程池序列化並在子行程中執行。
+    
+    Returns:
+        Tuple[int, List[dict]]: (頁數, 追蹤事件)；未啟用追蹤時事件為空列表
+    """
+    tracer = Tracer() if trace else NULL_TRACER
+    page_count = FileHandler.merge_files(entries, output_path, layout_options=layout_options, tracer=tracer)
+    return page_count, tracer.events
@@ -6,9 +6,16 @@
 
 import fitz  # PyMuPDF
 from PIL import Image
-from typing import List, Tuple, Optional
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Tuple, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from itertools import chain, islice
 import io
 import os
+from core.image_probe import ImageProbe
+from core.page_cache import PageCache
+from core.tracing import NULL_TRACER, Tracer
 
 
 class ImageConverter:
@@ -21,6 +28,15 @@ class ImageConverter:
         'A3': (842, 1191),     # 297mm × 420mm
     }
     
+    # 頁數少於此值時不啟用行程池（啟動行程的成本高於平行化的效益）
+    PARALLEL_MIN_PAGES = 8
+    
+    # 行程池每個工作處理的頁數
+    PARALLEL_CHUNK_PAGES = 4
+    
+    # 有效解析度超過目標解析度此倍數時才降採樣，避免為微小差異重新編碼
+    DOWNSAMPLE_THRESHOLD = 1.1
+    
     @staticmethod
     def mm_to_points(mm: float) -> float:
         """將毫米轉換為點"""
@@ -46,10 +62,9 @@ class ImageConverter:
         try:
             pdf_document = fitz.open()
             
-            # 開啟圖片以獲取尺寸
-            img = Image.open(image_path)
-            img_width, img_height = img.size
-            img.close()
+            # 讀取圖片標頭以獲取尺寸
+            probe = ImageProbe.probe(image_path)
+            img_width, img_height = probe['width'], probe['height']
             
             # 計算頁面大小
             if page_size:
@@ -84,7 +99,12 @@ class ImageConverter:
         page_size: Optional[Tuple[int, int]] = None,
         images_per_page: Tuple[int, int] = (1, 1),
         margin_mm: float = 10,
-        spacing_mm: float = 5
+        spacing_mm: float = 5,
+        workers: Optional[int] = 1,
+        target_dpi: Optional[float] = None,
+        jpeg_quality: int = 85,
+        page_cache: Optional[PageCache] = None,
+        tracer: Tracer = NULL_TRACER
     ) -> bytes:
         """
         將多張圖片轉換為 PDF，支援多圖併頁
@@ -95,66 +115,422 @@ class ImageConverter:
             images_per_page: 每頁圖片數 (列數, 欄數)
             margin_mm: 頁面邊距 (毫米)
             spacing_mm: 圖片間距 (毫米)
+            workers: 平行轉換的行程數，1 表示單一行程，None 表示使用所有 CPU 核心
+            target_dpi: 降採樣的目標解析度 (可選)，None 表示嵌入原始圖片
+            jpeg_quality: 降採樣後重新編碼的 JPEG 品質 (1-95)
+            page_cache: 已排版頁面的磁碟快取 (可選)
+            tracer: 效能追蹤器 (可選)，見 core.tracing
             
         Returns:
             bytes: PDF 格式的位元組資料
         """
         try:
             pdf_document = fitz.open()
+            try:
+                ImageConverter.insert_images(
+                    pdf_document, image_paths, page_size, images_per_page, margin_mm, spacing_mm,
+                    workers, target_dpi, jpeg_quality, page_cache=page_cache, tracer=tracer
+                )
+                with tracer.span('tobytes', 'pdf'):
+                    return pdf_document.tobytes()
+            finally:
+                pdf_document.close()
             
-            rows, cols = images_per_page
-            images_count = rows * cols
+        except Exception as e:
+            raise Exception(f"多圖片轉換失敗: {str(e)}")
+    
+    @staticmethod
+    def insert_images(
+        pdf_document: fitz.Document,
+        image_paths: Iterable[str],
+        page_size: Optional[Tuple[int, int]] = None,
+        images_per_page: Tuple[int, int] = (1, 1),
+        margin_mm: float = 10,
+        spacing_mm: float = 5,
+        workers: Optional[int] = 1,
+        target_dpi: Optional[float] = None,
+        jpeg_quality: int = 85,
+        image_xrefs: Optional[dict] = None,
+        page_cache: Optional[PageCache] = None,
+        tracer: Tracer = NULL_TRACER,
+        checkpoint: Optional[Callable[[], fitz.Document]] = None
+    ) -> int:
+        """
+        將多張圖片直接排版至既有的 PDF 文件末端，不經過序列化與重新解析
+        
+        Args:
+            pdf_document: 目標 PDF 文件（例如 PDFMerger 的輸出文件）
+            image_paths: 圖片檔案路徑（列表或迭代器）
+            page_size: 頁面大小 (寬, 高) mm，None 表示使用原始大小
+            images_per_page: 每頁圖片數 (列數, 欄數)
+            margin_mm: 頁面邊距 (毫米)
+            spacing_mm: 圖片間距 (毫米)
+            workers: 平行轉換的行程數，1 表示單一行程，None 表示使用所有 CPU 核心。
+                平行轉換時各子行程分別排版不同頁面，重複的圖片只在同一個區段
+                (PARALLEL_CHUNK_PAGES 頁) 內共用，跨區段會各自嵌入；需要最小的輸出時
+                以 'smallest' 設定檔儲存 (garbage=4)，重複的影像物件會在儲存時合併
+            target_dpi: 降採樣的目標解析度 (可選)，依圖片在格子中的實際顯示大小計算，
+                超過此解析度的圖片會先縮小並重新編碼再嵌入；None 表示嵌入原始圖片
+            jpeg_quality: 降採樣後重新編碼的 JPEG 品質 (1-95)
+            image_xrefs: 此文件中已嵌入圖片的對照表 (可選)；多次呼叫寫入同一份文件時傳入
+                同一個 dict，可跨呼叫重複使用已嵌入的圖片
+            page_cache: 已排版頁面的磁碟快取 (可選)；圖片與版面參數都未變更的頁面直接
+                複製快取內容，不需解碼圖片。從快取複製的頁面不與其他頁面共用重複的圖片
+            tracer: 效能追蹤器 (可選)，記錄每頁的排版、解碼與 insert_image 耗時；
+                行程池子行程的區段也會一併收集
+            checkpoint: 每插入頁面後呼叫的函數 (可選)，回傳後續頁面要寫入的文件；
+                例如 PDFMerger.checkpoint 在超過記憶體預算時會將文件寫出至暫存檔並重新開啟
             
-            # 將圖片分組
-            for i in range(0, len(image_paths), images_count):
-                batch = image_paths[i:i + images_count]
-                
-                # 確定頁面大小
-                if page_size:
-                    page_w = ImageConverter.mm_to_points(page_size[0])
-                    page_h = ImageConverter.mm_to_points(page_size[1])
-                else:
-                    # 使用第一張圖片的大小
-                    img = Image.open(batch[0])
-                    page_w, page_h = img.size
-                    img.close()
-                
-                # 創建新頁面
-                page = pdf_document.new_page(width=page_w, height=page_h)
-                
-                # 計算邊距和間距
-                margin = ImageConverter.mm_to_points(margin_mm)
-                spacing = ImageConverter.mm_to_points(spacing_mm)
-                
-                # 計算可用區域
-                available_w = page_w - 2 * margin - (cols - 1) * spacing
-                available_h = page_h - 2 * margin - (rows - 1) * spacing
-                
-                # 每個格子的大小
-                cell_w = available_w / cols
-                cell_h = available_h / rows
-                
-                # 放置圖片
-                for idx, img_path in enumerate(batch):
-                    row = idx // cols
-                    col = idx % cols
-                    
-                    # 計算圖片位置
-                    x = margin + col * (cell_w + spacing)
-                    y = margin + row * (cell_h + spacing)
+        Returns:
+            int: 新增的頁數
+        """
+        if image_xrefs is None:
+            image_xrefs = {}
+        
+        # 版面參數（傳遞給排版函數及行程池的子行程）
+        layout = {
+            'page_size': page_size,
+            'images_per_page': images_per_page,
+            'margin_mm': margin_mm,
+            'spacing_mm': spacing_mm,
+            'target_dpi': target_dpi,
+            'jpeg_quality': jpeg_quality
+        }
+        
+        rows, cols = images_per_page
+        images_count = rows * cols
+        
+        # 將圖片逐組讀取，每組為一頁（支援惰性迭代器，不需預先展開整個列表）
+        image_iter = iter(image_paths)
+        batches = iter(lambda: list(islice(image_iter, images_count)), [])
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        # 預先讀取少量頁面，判斷是否值得啟用行程池
+        head = list(islice(batches, ImageConverter.PARALLEL_MIN_PAGES))
+        batches = chain(head, batches)
+        
+        if workers > 1 and len(head) >= ImageConverter.PARALLEL_MIN_PAGES:
+            return ImageConverter._insert_batches_parallel(
+                pdf_document, batches, layout, workers, image_xrefs, page_cache, tracer, checkpoint
+            )
+        
+        pages = 0
+        for batch in batches:
+            ImageConverter._append_page(pdf_document, batch, layout, image_xrefs, page_cache, tracer)
+            pages += 1
+            if checkpoint:
+                pdf_document = checkpoint()
+        
+        return pages
+    
+    @staticmethod
+    def _insert_batches_parallel(
+        pdf_document: fitz.Document,
+        batches: Iterator[List[str]],
+        layout: dict,
+        workers: int,
+        image_xrefs: dict,
+        page_cache: Optional[PageCache] = None,
+        tracer: Tracer = NULL_TRACER,
+        checkpoint: Optional[Callable[[], fitz.Document]] = None
+    ) -> int:
+        """
+        以行程池平行產生頁面，並依原始順序插入目標文件
+        
+        同時處理中的區段數量有上限，因此長列表也只會佔用固定的記憶體。
+        行程池無法使用時，尚未完成的頁面改用單一行程處理。
+        
+        Returns:
+            int: 新增的頁數
+        """
+        chunks = iter(lambda: list(islice(batches, ImageConverter.PARALLEL_CHUNK_PAGES)), [])
+        pending_chunks = deque()  # 已取出但尚未插入的區段，依提交順序排列
+        futures = deque()
+        pages = 0
+        
+        def insert_next() -> int:
+            nonlocal pdf_document
+            with tracer.span('wait_worker', 'image'):
+                part_bytes, events = futures[0].result()
+            tracer.add_events(events)
+            with tracer.span('insert_pdf', 'image', pages=len(pending_chunks[0])):
+                with fitz.open(stream=part_bytes, filetype="pdf") as part:
+                    pdf_document.insert_pdf(part)
+            if checkpoint:
+                pdf_document = checkpoint()
+            futures.popleft()
+            return len(pending_chunks.popleft())
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for chunk in chunks:
+                    pending_chunks.append(chunk)
+                    futures.append(executor.submit(_render_batches, chunk, layout, page_cache, tracer.enabled))
                     
-                    img_rect = fitz.Rect(x, y, x + cell_w, y + cell_h)
+                    # 依提交順序取回結果，確保頁面順序不變
+                    if len(futures) >= workers * 2:
+                        pages += insert_next()
+                
+                while futures:
+                    pages += insert_next()
                     
-                    # 插入圖片
-                    page.insert_image(img_rect, filename=img_path, keep_proportion=True)
+        except (BrokenProcessPool, NotImplementedError, PermissionError):
+            # 環境不支援多行程（例如受限的沙箱），剩餘頁面改用單一行程
+            for batch in chain.from_iterable(chain(pending_chunks, chunks)):
+                ImageConverter._append_page(pdf_document, batch, layout, image_xrefs, page_cache, tracer)
+                pages += 1
+                if checkpoint:
+                    pdf_document = checkpoint()
+        
+        return pages
+    
+    @staticmethod
+    def _append_page(
+        pdf_document: fitz.Document,
+        batch: List[str],
+        layout: dict,
+        image_xrefs: dict,
+        page_cache: Optional[PageCache],
+        tracer: Tracer = NULL_TRACER
+    ) -> None:
+        """
+        在文件末端新增一頁：快取命中時直接複製快取的頁面，否則排版後寫入快取
+        
+        Args:
+            pdf_document: 目標 PDF 文件
+            batch: 本頁的圖片路徑
+            layout: 版面參數
+            image_xrefs: 此文件中已嵌入圖片的對照表，見 _place_image
+            page_cache: 已排版頁面的磁碟快取，None 表示不使用快取
+            tracer: 效能追蹤器
+        """
+        with tracer.span('page', 'image', images=len(batch)) as span:
+            if page_cache is None:
+                ImageConverter._layout_page(pdf_document, batch, layout, image_xrefs, tracer)
+                return
             
-            pdf_bytes = pdf_document.tobytes()
-            pdf_document.close()
+            key = page_cache.make_key(batch, layout)
+            cached = page_cache.get(key)
+            if cached is not None:
+                try:
+                    with fitz.open(stream=cached, filetype="pdf") as part:
+                        pdf_document.insert_pdf(part)
+                    span.set(cache='hit')
+                    return
+                except Exception:
+                    # 損毀的快取項目視為未命中，重新排版後覆寫
+                    pass
             
-            return pdf_bytes
+            span.set(cache='miss')
+            ImageConverter._layout_page(pdf_document, batch, layout, image_xrefs, tracer)
             
-        except Exception as e:
-            raise Exception(f"多圖片轉換失敗: {str(e)}")
+            # 將剛產生的頁面複製為單頁文件寫入快取
+            with tracer.span('cache_put', 'image'):
+                page_number = pdf_document.page_count - 1
+                with fitz.open() as single:
+                    single.insert_pdf(pdf_document, from_page=page_number, to_page=page_number)
+                    page_cache.put(key, single.tobytes())
+    
+    @staticmethod
+    def _layout_page(
+        pdf_document: fitz.Document,
+        batch: List[str],
+        layout: dict,
+        image_xrefs: dict,
+        tracer: Tracer = NULL_TRACER
+    ) -> None:
+        """
+        在文件末端新增一頁，並以格狀版面放置一組圖片
+        
+        Args:
+            pdf_document: 目標 PDF 文件
+            batch: 本頁的圖片路徑（最多 列數 × 欄數 張）
+            layout: 版面參數，鍵值同 insert_images 的參數
+            image_xrefs: 此文件中已嵌入圖片的對照表，見 _place_image
+            tracer: 效能追蹤器
+        """
+        page_size = layout['page_size']
+        rows, cols = layout['images_per_page']
+        
+        # 確定頁面大小
+        if page_size:
+            page_w = ImageConverter.mm_to_points(page_size[0])
+            page_h = ImageConverter.mm_to_points(page_size[1])
+        else:
+            # 使用第一張圖片的大小
+            probe = ImageProbe.probe(batch[0])
+            page_w, page_h = probe['width'], probe['height']
+        
+        # 創建新頁面
+        page = pdf_document.new_page(width=page_w, height=page_h)
+        
+        # 計算邊距和間距
+        margin = ImageConverter.mm_to_points(layout['margin_mm'])
+        spacing = ImageConverter.mm_to_points(layout['spacing_mm'])
+        
+        # 計算可用區域
+        available_w = page_w - 2 * margin - (cols - 1) * spacing
+        available_h = page_h - 2 * margin - (rows - 1) * spacing
+        
+        # 每個格子的大小
+        cell_w = available_w / cols
+        cell_h = available_h / rows
+        
+        # 放置圖片
+        for idx, img_path in enumerate(batch):
+            row = idx // cols
+            col = idx % cols
+            
+            # 計算圖片位置
+            x = margin + col * (cell_w + spacing)
+            y = margin + row * (cell_h + spacing)
+            
+            img_rect = fitz.Rect(x, y, x + cell_w, y + cell_h)
+            
+            # 插入圖片（需要時先降採樣，重複的圖片只嵌入一次）
+            ImageConverter._place_image(page, img_rect, img_path, layout, image_xrefs, tracer)
+    
+    @staticmethod
+    def _place_image(
+        page: fitz.Page,
+        rect: fitz.Rect,
+        image_path: str,
+        layout: dict,
+        image_xrefs: dict,
+        tracer: Tracer = NULL_TRACER
+    ) -> None:
+        """
+        將圖片放入格子，相同內容（及相同降採樣尺寸）的圖片只嵌入一次
+        
+        Args:
+            page: 目標頁面
+            rect: 圖片放置的格子（點）
+            image_path: 圖片檔案路徑
+            layout: 版面參數
+            image_xrefs: 已嵌入圖片的對照表 {(內容雜湊, 降採樣尺寸, 品質): xref}，須對應同一份文件
+            tracer: 效能追蹤器
+        """
+        target_size = None
+        if layout['target_dpi']:
+            target_size = ImageConverter.downsample_size(image_path, rect, layout['target_dpi'])
+        
+        # 第一次遇到的檔案讀取一次內容，同時用於計算雜湊與嵌入，不必再由 insert_image 重新讀取
+        data = None
+        digest = ImageProbe.cached_digest(image_path)
+        if digest is None:
+            with tracer.span('read', 'image', file=image_path):
+                data = ImageConverter._read_file(image_path)
+            digest = ImageProbe.content_digest(image_path, data)
+        
+        key = (
+            digest,
+            target_size,
+            layout['jpeg_quality'] if target_size else None
+        )
+        
+        # 重複出現的圖片直接引用已嵌入的影像物件
+        xref = image_xrefs.get(key)
+        if xref:
+            with tracer.span('insert_image', 'image', file=image_path, reused=True):
+                page.insert_image(rect, xref=xref, keep_proportion=True)
+            return
+        
+        if data is None:
+            data = ImageConverter._read_file(image_path)
+        
+        if target_size:
+            with tracer.span('decode', 'image', file=image_path, size=list(target_size)):
+                stream = ImageConverter.reencode_image(io.BytesIO(data), target_size, layout['jpeg_quality'])
+            with tracer.span('insert_image', 'image', file=image_path):
+                xref = page.insert_image(rect, stream=stream, keep_proportion=True)
+        else:
+            with tracer.span('insert_image', 'image', file=image_path):
+                xref = page.insert_image(rect, stream=data, keep_proportion=True)
+        
+        image_xrefs[key] = xref
+    
+    @staticmethod
+    def _read_file(file_path: str) -> bytes:
+        """讀取整個檔案內容"""
+        with open(file_path, 'rb') as f:
+            return f.read()
+    
+    @staticmethod
+    def downsample_size(
+        image_path: str,
+        rect: fitz.Rect,
+        target_dpi: float
+    ) -> Optional[Tuple[int, int]]:
+        """
+        依圖片在頁面上的實際顯示大小，計算降採樣後的像素尺寸
+        
+        Args:
+            image_path: 圖片檔案路徑
+            rect: 圖片放置的格子（點），依 keep_proportion 縮放至格子內
+            target_dpi: 目標解析度
+            
+        Returns:
+            Optional[Tuple[int, int]]: 降採樣後的 (寬, 高)；解析度未超過目標時回傳 None，表示直接嵌入原檔
+        """
+        # 以標頭資訊判斷是否需要降採樣，不需要時不必開啟圖片
+        probe = ImageProbe.probe(image_path)
+        img_w, img_h = probe['width'], probe['height']
+        
+        # 圖片等比例縮放至格子內的比例（點 / 像素），有效解析度 = 72 / 比例
+        scale = min(rect.width / img_w, rect.height / img_h)
+        effective_dpi = 72 / scale
+        if effective_dpi <= target_dpi * ImageConverter.DOWNSAMPLE_THRESHOLD:
+            return None
+        
+        return (
+            max(1, round(img_w * scale * target_dpi / 72)),
+            max(1, round(img_h * scale * target_dpi / 72))
+        )
+    
+    @staticmethod
+    def reencode_image(
+        image_path: Union[str, BinaryIO],
+        target_size: Tuple[int, int],
+        jpeg_quality: int = 85
+    ) -> bytes:
+        """
+        將圖片縮小至指定尺寸並重新編碼
+        
+        JPEG 使用 Pillow 的 draft 模式在解碼時直接縮小，避免解碼完整解析度。
+        含透明度的圖片重新編碼為 PNG，其餘為 JPEG。
+        
+        Args:
+            image_path: 圖片檔案路徑，或已讀取內容的二進位檔案物件
+            target_size: 目標尺寸 (寬, 高) 像素
+            jpeg_quality: JPEG 品質 (1-95)
+            
+        Returns:
+            bytes: 重新編碼的圖片資料
+        """
+        with Image.open(image_path) as img:
+            # JPEG 以縮小比例解碼（僅對 JPEG 有效，其他格式會忽略）
+            img.draft(img.mode, target_size)
+            exif = img.info.get('exif')
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            
+            if has_alpha:
+                resized = img.convert('RGBA').resize(target_size, Image.LANCZOS)
+                output = io.BytesIO()
+                resized.save(output, format='PNG', optimize=False)
+                return output.getvalue()
+            
+            if img.mode not in ('RGB', 'L', 'CMYK'):
+                img = img.convert('RGB')
+            resized = img.resize(target_size, Image.LANCZOS)
+            
+            output = io.BytesIO()
+            save_options = {'quality': jpeg_quality}
+            if exif:
+                save_options['exif'] = exif
+            resized.save(output, format='JPEG', **save_options)
+            return output.getvalue()
     
     @staticmethod
     def save_image_as_pdf(image_path: str, output_path: str) -> None:
@@ -181,15 +557,38 @@ class ImageConverter:
             image_path: 圖片檔案路徑
             
         Returns:
-            dict: 包含寬度、高度、格式等資訊
+            dict: 包含寬度、高度、格式、色彩模式及 EXIF 方向
         """
         try:
-            with Image.open(image_path) as img:
-                return {
-                    'width': img.width,
-                    'height': img.height,
-                    'format': img.format,
-                    'mode': img.mode
-                }
+            # 僅讀取標頭，結果與轉換流程共用快取
+            return ImageProbe.probe(image_path)
         except Exception as e:
             raise Exception(f"讀取圖片資訊失敗: {str(e)}")
+
+
+def _render_batches(
+    batches: List[List[str]],
+    layout: dict,
+    page_cache: Optional[PageCache] = None,
+    trace: bool = False
+) -> Tuple[bytes, List[dict]]:
+    """
+    將多組圖片依序排版成 PDF 頁面並回傳位元組資料
+    
+    定義於模組層級，以便行程池序列化並在子行程中執行。
+    
+    Returns:
+        Tuple[bytes, List[dict]]: (PDF 位元組資料, 追蹤事件)；未啟用追蹤時事件為空列表
+    """
+    tracer = Tracer() if trace else NULL_TRACER
+    pdf_document = fitz.open()
+    image_xrefs = {}
+    try:
+        with tracer.span('render_chunk', 'image', pages=len(batches)):
+            for batch in batches:
+                ImageConverter._append_page(pdf_document, batch, layout, image_xrefs, page_cache, tracer)
+            with tracer.span('tobytes', 'pdf'):
+                pdf_bytes = pdf_document.tobytes()
+        return pdf_bytes, tracer.events
+    finally:
+        pdf_document.close()
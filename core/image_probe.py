@@ -0,0 +1,323 @@
+"""
+圖片標頭探測模組
+僅讀取檔案標頭（JPEG SOF、PNG IHDR、EXIF 方向）取得圖片資訊，
+並以檔案識別 (路徑, 大小, 修改時間) 快取結果，避免重複開啟與解碼；
+與 FileSniffer 共用同一份標頭緩衝區，分類與探測合計只讀取一次
+"""
+
+import hashlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from PIL import Image
+from utils.file_sniffer import FileSniffer
+
+
+# JPEG 的 SOF (Start Of Frame) 標記，包含影像尺寸
+_JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF
+}
+
+# JPEG 色彩元件數對應的 Pillow 色彩模式
+_JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+
+# PNG 色彩類型對應的 Pillow 色彩模式
+_PNG_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class _HeaderReader:
+    """類檔案物件：先從已讀取的標頭緩衝區讀取，超出範圍時才開啟檔案"""
+    
+    def __init__(self, header: bytes, file_path: str):
+        self.header = header
+        self.file_path = file_path
+        self.position = 0
+        # 標頭小於讀取上限表示已包含整個檔案
+        self.complete = len(header) < FileSniffer.HEADER_SIZE
+        self._file = None
+    
+    def read(self, size: int) -> bytes:
+        end = self.position + size
+        if end <= len(self.header) or self.complete:
+            data = self.header[self.position:end]
+        else:
+            if self._file is None:
+                self._file = open(self.file_path, 'rb')
+            self._file.seek(self.position)
+            data = self._file.read(size)
+        self.position += len(data)
+        return data
+    
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> None:
+        self.position = offset if whence == os.SEEK_SET else self.position + offset
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class ImageProbe:
+    """圖片標頭探測器，結果依檔案識別快取並於各模組間共用"""
+    
+    # 快取項目上限（超過時淘汰最久未使用的項目）
+    CACHE_MAX_ENTRIES = 20000
+    
+    # 計算內容雜湊時每次讀取的大小
+    HASH_CHUNK_SIZE = 1024 * 1024
+    
+    _cache = OrderedDict()
+    _digests = OrderedDict()
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def file_identity(file_path: str) -> Tuple[str, int, int]:
+        """
+        取得檔案識別，檔案內容變更時識別也會改變
+        
+        Args:
+            file_path: 檔案路徑
+        
+        Returns:
+            Tuple[str, int, int]: (絕對路徑, 檔案大小, 修改時間 ns)
+        """
+        return FileSniffer.file_identity(file_path)
+    
+    @staticmethod
+    def probe(image_path: str) -> dict:
+        """
+        取得圖片資訊（僅讀取標頭，結果會被快取）
+        
+        Args:
+            image_path: 圖片檔案路徑
+        
+        Returns:
+            dict: width、height（原始像素尺寸，未套用 EXIF 方向）、format、mode、orientation
+        """
+        key = ImageProbe.file_identity(image_path)
+        
+        with ImageProbe._lock:
+            info = ImageProbe._cache.get(key)
+            if info is not None:
+                ImageProbe._cache.move_to_end(key)
+                return dict(info)
+        
+        # 讀取一次標頭，同時記錄檔案類型供 FileSniffer 使用
+        header = FileSniffer.read_header(image_path)
+        FileSniffer.remember(key, FileSniffer.detect(header))
+        info = ImageProbe._parse_header(image_path, header)
+        ImageProbe._store(key, info)
+        
+        return dict(info)
+    
+    @staticmethod
+    def content_digest(file_path: str, data: Optional[bytes] = None) -> str:
+        """
+        取得檔案內容雜湊（結果會被快取，相同檔案只讀取一次）
+        
+        Args:
+            file_path: 檔案路徑
+            data: 已讀取的檔案內容 (可選)，傳入時直接以此計算，不再讀取檔案
+        
+        Returns:
+            str: 內容雜湊（十六進位字串）
+        """
+        key = ImageProbe.file_identity(file_path)
+        
+        digest = ImageProbe.cached_digest(file_path, key)
+        if digest is not None:
+            return digest
+        
+        hasher = hashlib.blake2b(digest_size=16)
+        if data is not None:
+            hasher.update(data)
+        else:
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(ImageProbe.HASH_CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+        digest = hasher.hexdigest()
+        
+        with ImageProbe._lock:
+            ImageProbe._digests[key] = digest
+            if len(ImageProbe._digests) > ImageProbe.CACHE_MAX_ENTRIES:
+                ImageProbe._digests.popitem(last=False)
+        
+        return digest
+    
+    @staticmethod
+    def cached_digest(file_path: str, key: Optional[Tuple[str, int, int]] = None) -> Optional[str]:
+        """
+        取得已快取的內容雜湊，不讀取檔案內容
+        
+        Args:
+            file_path: 檔案路徑
+            key: 檔案識別 (可選)，見 file_identity
+        
+        Returns:
+            Optional[str]: 內容雜湊，尚未計算過時為 None
+        """
+        if key is None:
+            key = ImageProbe.file_identity(file_path)
+        with ImageProbe._lock:
+            digest = ImageProbe._digests.get(key)
+            if digest is not None:
+                ImageProbe._digests.move_to_end(key)
+            return digest
+    
+    @staticmethod
+    def _store(key: Tuple[str, int, int], info: dict) -> None:
+        """寫入探測結果快取"""
+        with ImageProbe._lock:
+            ImageProbe._cache[key] = info
+            ImageProbe._cache.move_to_end(key)
+            if len(ImageProbe._cache) > ImageProbe.CACHE_MAX_ENTRIES:
+                ImageProbe._cache.popitem(last=False)
+    
+    @staticmethod
+    def _consume_header(image_path: str, key: Tuple[str, int, int], kind: Optional[str], header: bytes) -> None:
+        """FileSniffer 讀取標頭後呼叫：圖片檔案直接以同一份標頭探測，之後的 probe() 不必再讀取"""
+        if kind not in ('JPEG', 'PNG'):
+            return
+        with ImageProbe._lock:
+            if key in ImageProbe._cache:
+                return
+        ImageProbe._store(key, ImageProbe._parse_header(image_path, header))
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """清除快取"""
+        with ImageProbe._lock:
+            ImageProbe._cache.clear()
+            ImageProbe._digests.clear()
+    
+    @staticmethod
+    def _parse_header(image_path: str, header: bytes) -> dict:
+        """
+        解析檔案標頭；無法解析時改用 Pillow（同樣只讀取標頭，不解碼像素）
+        
+        Args:
+            image_path: 圖片檔案路徑
+            header: 已讀取的檔案開頭；結構超出此範圍時才繼續讀取檔案
+        """
+        f = _HeaderReader(header, image_path)
+        try:
+            signature = f.read(8)
+            
+            info = None
+            if signature[:2] == b'\xff\xd8':
+                f.seek(2)
+                info = ImageProbe._read_jpeg(f)
+            elif signature == _PNG_SIGNATURE:
+                info = ImageProbe._read_png(f)
+        finally:
+            f.close()
+        
+        if info is None:
+            with Image.open(image_path) as img:
+                info = {
+                    'width': img.width,
+                    'height': img.height,
+                    'format': img.format,
+                    'mode': img.mode,
+                    'orientation': img.getexif().get(0x0112, 1)
+                }
+        
+        return info
+    
+    @staticmethod
+    def _read_jpeg(f) -> Optional[dict]:
+        """依序走訪 JPEG 區段至 SOF，略過的區段以 seek 跳過而不讀取"""
+        orientation = 1
+        
+        while True:
+            byte = f.read(1)
+            if not byte:
+                return None
+            if byte != b'\xff':
+                continue
+            
+            # 略過填充用的 0xFF
+            marker = f.read(1)
+            while marker == b'\xff':
+                marker = f.read(1)
+            if not marker:
+                return None
+            marker = marker[0]
+            
+            # 無長度欄位的標記
+            if marker == 0xD8 or 0xD0 <= marker <= 0xD7 or marker == 0x01:
+                continue
+            if marker == 0xD9:
+                return None
+            
+            length_bytes = f.read(2)
+            if len(length_bytes) < 2:
+                return None
+            length = struct.unpack('>H', length_bytes)[0]
+            
+            if marker in _JPEG_SOF_MARKERS:
+                data = f.read(6)
+                if len(data) < 6:
+                    return None
+                _, height, width, components = struct.unpack('>BHHB', data)
+                return {
+                    'width': width,
+                    'height': height,
+                    'format': 'JPEG',
+                    'mode': _JPEG_MODES.get(components, 'RGB'),
+                    'orientation': orientation
+                }
+            
+            if marker == 0xE1:
+                data = f.read(length - 2)
+                if data.startswith(b'Exif\x00\x00'):
+                    orientation = ImageProbe._parse_exif_orientation(data[6:])
+            else:
+                f.seek(length - 2, os.SEEK_CUR)
+    
+    @staticmethod
+    def _parse_exif_orientation(tiff: bytes) -> int:
+        """從 EXIF 的 TIFF 結構（IFD0）讀取方向標籤 (0x0112)"""
+        try:
+            endian = '<' if tiff[:2] == b'II' else '>'
+            ifd_offset = struct.unpack(endian + 'I', tiff[4:8])[0]
+            entry_count = struct.unpack(endian + 'H', tiff[ifd_offset:ifd_offset + 2])[0]
+            
+            for i in range(entry_count):
+                entry = ifd_offset + 2 + i * 12
+                tag = struct.unpack(endian + 'H', tiff[entry:entry + 2])[0]
+                if tag == 0x0112:
+                    return struct.unpack(endian + 'H', tiff[entry + 8:entry + 10])[0]
+        except struct.error:
+            pass
+        return 1
+    
+    @staticmethod
+    def _read_png(f) -> Optional[dict]:
+        """讀取緊接在簽章後的 IHDR 區塊"""
+        data = f.read(25)
+        if len(data) < 25 or data[4:8] != b'IHDR':
+            return None
+        
+        width, height, bit_depth, color_type = struct.unpack('>IIBB', data[8:18])
+        mode = _PNG_MODES.get(color_type, 'RGB')
+        if color_type == 0 and bit_depth == 1:
+            mode = '1'
+        elif color_type == 0 and bit_depth == 16:
+            mode = 'I;16'
+        
+        return {
+            'width': width,
+            'height': height,
+            'format': 'PNG',
+            'mode': mode,
+            'orientation': 1
+        }
+
+
+# 分類時讀取的標頭一併用於探測圖片尺寸
+FileSniffer.add_header_consumer(ImageProbe._consume_header)
@@ -0,0 +1,76 @@
+"""
+記憶體預算管控模組
+合併期間追蹤行程的常駐記憶體 (RSS)，超過預算時由 PDFMerger 將合併中的結果文件
+寫出至暫存檔並重新開啟，已寫出的頁面內容改由磁碟按需讀取；暫存檔於工作結束或失敗時刪除
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Optional
+from utils.process_memory import current_rss_bytes
+
+
+class MemoryGovernor:
+    """記憶體預算管控器：判斷何時需要寫出中間結果，並管理暫存目錄"""
+    
+    # 兩次查詢 RSS 的最短間隔 (秒)，逐頁呼叫時避免頻繁讀取系統資訊
+    CHECK_INTERVAL = 0.05
+    
+    # 寫出後 RSS 仍高於預算（例如程式本身已佔用大量記憶體）時，
+    # 需再成長此量才會再次寫出，避免每頁都寫出
+    MIN_GROWTH_BYTES = 64 * 1024 * 1024
+    
+    def __init__(self, budget_bytes: int, spill_dir: Optional[str] = None):
+        """
+        初始化記憶體預算管控器
+        
+        Args:
+            budget_bytes: 記憶體預算 (bytes)
+            spill_dir: 暫存檔的上層目錄 (可選)，None 表示使用系統暫存目錄
+        """
+        if budget_bytes <= 0:
+            raise ValueError("記憶體預算必須大於 0")
+        
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.spills = 0
+        self.peak_rss = 0
+        self._threshold = budget_bytes
+        self._last_check = 0.0
+        self._temp_dir = None
+    
+    def over_budget(self) -> bool:
+        """
+        目前的 RSS 是否超過預算（依 CHECK_INTERVAL 限制查詢頻率）
+        
+        Returns:
+            bool: 是否應寫出中間結果
+        """
+        now = time.monotonic()
+        if now - self._last_check < MemoryGovernor.CHECK_INTERVAL:
+            return False
+        self._last_check = now
+        
+        rss = current_rss_bytes()
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss > self._threshold
+    
+    def spill_path(self) -> str:
+        """取得中間結果的暫存檔路徑（第一次呼叫時建立暫存目錄）"""
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix='mergepdf_spill_', dir=self.spill_dir)
+        return os.path.join(self._temp_dir, 'spill.pdf')
+    
+    def spilled(self) -> None:
+        """記錄已寫出一次，並依寫出後的 RSS 調整下一次的門檻"""
+        self.spills += 1
+        self._threshold = max(self.budget_bytes, current_rss_bytes() + MemoryGovernor.MIN_GROWTH_BYTES)
+        self._last_check = time.monotonic()
+    
+    def cleanup(self) -> None:
+        """刪除暫存目錄（須在關閉暫存檔之後呼叫）"""
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
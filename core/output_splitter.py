@@ -0,0 +1,151 @@
+"""
+輸出分割模組
+依分割規則（頁數上限、預估大小上限、每份輸入檔案數）預先規劃各分割檔案的內容，
+讓每份分割檔案可以獨立（平行）產生，輸出為 名稱_001.pdf、名稱_002.pdf…
+"""
+
+import math
+import os
+from itertools import groupby
+from typing import Callable, List, Optional, Set, Tuple
+import fitz  # PyMuPDF
+from utils.page_ranges import expand_page_ranges, format_page_ranges
+
+# 分割規則的鍵
+SPLIT_POLICY_KEYS = ('max_pages', 'max_bytes', 'files_per_part')
+
+
+def part_path(output_path: str, index: int) -> str:
+    """
+    取得分割檔案的路徑
+    
+    Args:
+        output_path: 輸出檔案路徑，例如 archive.pdf
+        index: 分割序號（1 起算）
+    
+    Returns:
+        str: 例如 archive_001.pdf
+    """
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}_{index:03d}{ext or '.pdf'}"
+
+
+def validate_policy(policy: dict) -> None:
+    """
+    檢查分割規則
+    
+    Raises:
+        ValueError: 含未知的鍵、數值不為正數，或未指定任何上限
+    """
+    unknown = set(policy) - set(SPLIT_POLICY_KEYS)
+    if unknown:
+        raise ValueError(f"未知的分割規則: {', '.join(sorted(unknown))}")
+    limits = [value for value in policy.values() if value is not None]
+    if not limits:
+        raise ValueError(f"分割規則至少需指定一項: {', '.join(SPLIT_POLICY_KEYS)}")
+    if any(value <= 0 for value in limits):
+        raise ValueError("分割規則的數值必須大於 0")
+
+
+class _PartPlanner:
+    """逐一加入頁面單位，超過上限時開始新的分割檔案"""
+    
+    def __init__(self, policy: dict):
+        self.max_pages = policy.get('max_pages')
+        self.max_bytes = policy.get('max_bytes')
+        self.files_per_part = policy.get('files_per_part')
+        self.parts: List[list] = []
+        self._start_part()
+    
+    def _start_part(self) -> None:
+        self.entries = []
+        self.pages = 0
+        self.bytes = 0
+        self.files: Set[str] = set()
+    
+    def capacity(self, pages: int, page_bytes: float, files: Set[str]) -> int:
+        """目前的分割檔案還能容納多少頁（每頁 page_bytes 位元組，屬於 files）"""
+        if self.files_per_part and len(self.files | files) > self.files_per_part:
+            return 0
+        if self.max_pages:
+            pages = min(pages, self.max_pages - self.pages)
+        if self.max_bytes and page_bytes > 0:
+            pages = min(pages, math.floor((self.max_bytes - self.bytes) / page_bytes))
+        return max(0, pages)
+    
+    def add(self, entries: list, pages: int, page_bytes: float, files: Set[str]) -> None:
+        """加入內容（呼叫前已確認可容納，或目前的分割檔案為空）"""
+        self.entries.extend(entries)
+        self.pages += pages
+        self.bytes += pages * page_bytes
+        self.files |= files
+    
+    def next_part(self) -> None:
+        """結束目前的分割檔案"""
+        if self.entries:
+            self.parts.append(self.entries)
+        self._start_part()
+
+
+def plan_parts(
+    entries: list,
+    policy: dict,
+    classify: Callable[[object], str],
+    split_entry: Callable[[object], Tuple[str, Optional[str]]],
+    images_per_page: Tuple[int, int] = (1, 1)
+) -> List[list]:
+    """
+    規劃分割檔案的內容
+    
+    PDF 超過剩餘容量時以頁面範圍拆到多份分割檔案（每頁大小以檔案大小平均估算）；
+    相鄰圖片只在頁面邊界分割，各分割檔案的版面與不分割時相同。
+    單一頁面就超過大小上限時，該頁單獨成為一份分割檔案。
+    
+    Args:
+        entries: 檔案項目（路徑，或 (路徑, 頁面範圍)），依合併順序
+        policy: 分割規則 {'max_pages', 'max_bytes', 'files_per_part'}，未指定的項目不限制
+        classify: 判斷項目類型的函數，回傳 'Image' 或 'PDF'
+        split_entry: 將項目拆為 (路徑, 頁面範圍) 的函數
+        images_per_page: 每頁圖片數 (列, 欄)
+    
+    Returns:
+        List[list]: 每份分割檔案的檔案項目列表
+    """
+    validate_policy(policy)
+    planner = _PartPlanner(policy)
+    images_count = images_per_page[0] * images_per_page[1]
+    
+    for file_type, group in groupby(entries, key=classify):
+        if file_type == 'Image':
+            paths = [split_entry(entry)[0] for entry in group]
+            # 每頁為一個單位，不拆開同一頁的圖片
+            for start in range(0, len(paths), images_count):
+                unit = paths[start:start + images_count]
+                unit_bytes = sum(os.path.getsize(path) for path in unit)
+                files = set(unit)
+                if planner.capacity(1, unit_bytes, files) < 1:
+                    planner.next_part()
+                planner.add(unit, 1, unit_bytes, files)
+            continue
+        
+        for entry in group:
+            path, spec = split_entry(entry)
+            with fitz.open(path) as doc:
+                total_pages = doc.page_count
+            pages = expand_page_ranges(spec, total_pages)
+            page_bytes = os.path.getsize(path) / max(1, total_pages)
+            
+            remaining = pages
+            while remaining:
+                take = planner.capacity(len(remaining), page_bytes, {path})
+                if take == 0:
+                    if planner.entries:
+                        planner.next_part()
+                        continue
+                    take = 1
+                chunk, remaining = remaining[:take], remaining[take:]
+                whole = len(chunk) == len(pages) and not spec
+                planner.add([path if whole else (path, format_page_ranges(chunk))], len(chunk), page_bytes, {path})
+    
+    planner.next_part()
+    return planner.parts
@@ -0,0 +1,215 @@
+"""
+圖片頁面磁碟快取
+以圖片檔案識別與版面參數為鍵，保存已排版完成的單頁 PDF，
+重複合併相同的圖片時可略過解碼與排版
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from typing import List, Optional
+from core.image_probe import ImageProbe
+
+
+class PageCache:
+    """圖片頁面的磁碟快取（LRU 淘汰，可供多個執行緒與行程同時使用）"""
+    
+    # 快取格式版本，排版方式變更時遞增以避開舊的快取
+    CACHE_VERSION = 1
+    
+    # 超過容量上限時，淘汰至上限的此比例，避免每次寫入都觸發淘汰
+    EVICT_TARGET_RATIO = 0.9
+    
+    # 影響頁面內容的版面參數
+    LAYOUT_KEYS = ('page_size', 'images_per_page', 'margin_mm', 'spacing_mm', 'target_dpi', 'jpeg_quality')
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024, suffix: str = '.pdf'):
+        """
+        初始化頁面快取
+        
+        Args:
+            cache_dir: 快取目錄（不存在時自動建立）
+            max_bytes: 快取容量上限 (bytes)
+            suffix: 快取檔案的副檔名（其他資料例如縮圖也可使用相同的淘汰機制）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 第一次寫入時掃描目錄取得
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def __getstate__(self):
+        """序列化時略過鎖（傳遞給行程池的子行程）"""
+        return {'cache_dir': self.cache_dir, 'max_bytes': self.max_bytes, 'suffix': self.suffix}
+    
+    def __setstate__(self, state):
+        """還原序列化的快取設定"""
+        self.cache_dir = state['cache_dir']
+        self.max_bytes = state['max_bytes']
+        self.suffix = state['suffix']
+        self._lock = threading.Lock()
+        self._total_bytes = None
+    
+    @staticmethod
+    def default_dir() -> str:
+        """
+        取得預設的快取目錄
+        
+        Returns:
+            str: Windows 為 %LOCALAPPDATA%\\MergePDF\\page_cache，其他平台為 ~/.cache/mergepdf/page_cache
+        """
+        if sys.platform == 'win32':
+            base = os.environ.get('LOCALAPPDATA') or tempfile.gettempdir()
+            return os.path.join(base, 'MergePDF', 'page_cache')
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'mergepdf', 'page_cache')
+    
+    def make_key(self, image_paths: List[str], layout: dict) -> str:
+        """
+        計算一頁的快取鍵
+        
+        Args:
+            image_paths: 本頁的圖片路徑（依放置順序）
+            layout: 版面參數
+        
+        Returns:
+            str: 快取鍵；任一圖片內容（大小或修改時間）或版面參數改變時鍵值也會改變
+        """
+        data = {
+            'version': PageCache.CACHE_VERSION,
+            'images': [ImageProbe.file_identity(path) for path in image_paths],
+            'layout': [layout.get(key) for key in PageCache.LAYOUT_KEYS]
+        }
+        return hashlib.sha256(json.dumps(data).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        讀取快取的頁面
+        
+        Args:
+            key: 快取鍵
+        
+        Returns:
+            Optional[bytes]: 單頁 PDF 的位元組資料；未命中時回傳 None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            # 不存在，或剛好被其他行程淘汰
+            return None
+        
+        # 更新修改時間作為最近使用時間
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+    
+    def put(self, key: str, pdf_bytes: bytes) -> None:
+        """
+        寫入頁面（先寫入暫存檔再以原子操作取代，讀取端不會讀到寫入中的檔案）
+        
+        Args:
+            key: 快取鍵
+            pdf_bytes: 單頁 PDF 的位元組資料
+        """
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(pdf_bytes)
+                os.replace(temp_path, path)
+            except OSError:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except OSError:
+            # 快取寫入失敗（磁碟已滿、權限不足等）不影響合併
+            return
+        
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            else:
+                self._total_bytes += len(pdf_bytes)
+            
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+    
+    def clear(self) -> None:
+        """清除所有快取的頁面"""
+        with self._lock:
+            for entry in self._iter_entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+    
+    def _path(self, key: str) -> str:
+        """快取檔案路徑（以鍵的前兩碼分散至子目錄）"""
+        return os.path.join(self.cache_dir, key[:2], key + self.suffix)
+    
+    def _iter_entries(self):
+        """走訪所有快取檔案"""
+        try:
+            subdirs = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            try:
+                for entry in os.scandir(subdir.path):
+                    if entry.name.endswith(self.suffix) and entry.is_file():
+                        yield entry
+            except OSError:
+                continue
+    
+    def _scan_total(self) -> int:
+        """掃描目錄計算快取總大小"""
+        total = 0
+        for entry in self._iter_entries():
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+    
+    def _evict(self) -> None:
+        """依最近使用時間淘汰最舊的頁面，直到低於容量上限的目標比例"""
+        entries = []
+        for entry in self._iter_entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        
+        # 重新計算總大小（其他行程可能也在寫入或淘汰）
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * PageCache.EVICT_TARGET_RATIO
+        
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                # 其他行程已刪除，或檔案正在使用中（Windows）
+                pass
+        
+        self._total_bytes = total
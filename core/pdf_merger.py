@@ -4,24 +4,132 @@ PDF 合併模組
 """
 
 import fitz  # PyMuPDF
-from typing import List
+from typing import BinaryIO, List, Optional, Union
+import io
 import os
+from core.memory_governor import MemoryGovernor
+from core.tracing import NULL_TRACER, Tracer
+from utils.page_ranges import parse_page_ranges
+
+
+class _StreamOutput:
+    """
+    將 Document.save() 的輸出轉寫至二進位串流（管線、socket 包裝、BytesIO 等）
+    
+    MuPDF 以 write/tell 依序寫出（非線性化輸出不會回頭修改），因此不可定位的串流也能使用；
+    包裝後不具 name 屬性，避免 PyMuPDF 將 os.fdopen 等檔案物件的 name（檔案描述符）當成路徑
+    """
+    
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.position = 0
+    
+    def write(self, data: bytes) -> int:
+        self.stream.write(data)
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def seek(self, offset: int, whence: int = 0) -> int:
+        raise io.UnsupportedOperation("輸出串流不支援定位")
+    
+    def truncate(self, size: Optional[int] = None) -> int:
+        raise io.UnsupportedOperation("輸出串流不支援截斷")
+
+
+def _linearization_supported() -> bool:
+    """目前的 MuPDF 是否支援線性化儲存（MuPDF 1.26 起已移除）"""
+    try:
+        with fitz.open() as doc:
+            doc.new_page()
+            doc.save(io.BytesIO(), linear=True)
+        return True
+    except Exception:
+        return False
+
+
+# 匯入時檢查一次，不支援時不提供需要線性化的設定檔
+LINEARIZATION_SUPPORTED = _linearization_supported()
 
 
 class PDFMerger:
     """PDF 合併器（使用 PyMuPDF）"""
     
-    def __init__(self):
-        """初始化 PDF 合併器"""
+    # 輸出壓縮設定檔 → Document.save() 參數
+    SAVE_PROFILES = {
+        # 最快：不回收物件、不壓縮（PyMuPDF 預設值）
+        'fast': {},
+        # 平衡：移除未使用的物件，並壓縮未壓縮的資料流
+        'balanced': {'garbage': 1, 'deflate': True},
+        # 最小：合併重複物件，壓縮所有資料流（含圖片與字型），並使用物件串流
+        'smallest': {
+            'garbage': 4,
+            'clean': True,
+            'deflate': True,
+            'deflate_images': True,
+            'deflate_fonts': True,
+            'use_objstms': 1
+        },
+    }
+    
+    # 網頁：移除重複物件並線性化，讓文件伺服器可邊下載邊顯示（僅在 MuPDF 支援線性化時提供）
+    if LINEARIZATION_SUPPORTED:
+        SAVE_PROFILES['web'] = {'garbage': 3, 'deflate': True, 'linear': True}
+    
+    def __init__(
+        self,
+        max_open_docs: Optional[int] = None,
+        append_to: Optional[str] = None,
+        tracer: Tracer = NULL_TRACER,
+        memory_budget: Optional[int] = None,
+        spill_dir: Optional[str] = None
+    ):
+        """
+        初始化 PDF 合併器
+        
+        Args:
+            max_open_docs: 同時保持開啟的來源文件上限 (可選)
+                - None: 所有來源保留至 save() 時才一次合併（原始行為）
+                - N: 串流模式，開啟中的來源達到 N 份時立即寫入結果文件並關閉，
+                  記憶體峰值取決於最大的單一來源而非所有來源總和
+            append_to: 附加模式的既有 PDF 路徑 (可選)；新頁面加在其末端，
+                save() 時以增量儲存寫回此檔案，成本只與新增內容相關
+            tracer: 效能追蹤器 (可選)，記錄開啟、insert_pdf 與儲存的耗時
+            memory_budget: 記憶體預算 (bytes，可選)；行程 RSS 超過時將結果文件寫出至暫存檔
+                並重新開啟，已寫出的內容不再佔用記憶體，見 checkpoint()
+            spill_dir: 暫存檔的上層目錄 (可選)，None 表示使用系統暫存目錄
+        """
+        if max_open_docs is not None and max_open_docs < 1:
+            raise ValueError("max_open_docs 必須大於或等於 1")
+        
+        self.max_open_docs = max_open_docs
+        self.append_to = append_to
+        self.tracer = tracer
         self.pdf_documents = []
+        self.page_ranges = []  # 與 pdf_documents 對應的頁面區段 [(from_page, to_page), ...]，None 表示全部
         self.temp_docs = []  # 儲存暫時的 PDF 文件物件
+        self.result = None  # 合併結果文件（串流或附加模式）
+        self.image_xrefs = {}  # 結果文件中已嵌入的圖片 {(內容雜湊, ...): xref}，供重複圖片共用
+        self.governor = MemoryGovernor(memory_budget, spill_dir) if memory_budget else None
+        self._spilled = False  # 結果文件是否已改由暫存檔開啟
+        
+        if append_to is not None:
+            try:
+                with tracer.span('open', 'pdf', file=append_to):
+                    self.result = fitz.open(append_to)
+            except Exception as e:
+                raise Exception(f"開啟附加目標失敗 ({append_to}): {str(e)}")
     
-    def add_pdf(self, pdf_path: str) -> None:
+    def add_pdf(self, pdf_path: str, pages: Optional[str] = None) -> None:
         """
         加入 PDF 檔案到合併列表
         
         Args:
             pdf_path: PDF 檔案路徑
+            pages: 頁面範圍 (可選)，例如 "1-5,9,20-"；只有選取的頁面會被複製，
+                None 或空字串表示全部頁面
             
         Raises:
             Exception: 加入失敗時拋出異常
@@ -30,9 +138,17 @@ class PDFMerger:
             if not os.path.exists(pdf_path):
                 raise FileNotFoundError(f"檔案不存在: {pdf_path}")
             
-            # 開啟 PDF 文件並加入列表
-            doc = fitz.open(pdf_path)
+            # 開啟 PDF 文件並加入列表（只讀取目錄，頁面內容在插入時才解析）
+            with self.tracer.span('open', 'pdf', file=pdf_path):
+                doc = fitz.open(pdf_path)
+            try:
+                ranges = parse_page_ranges(pages, doc.page_count) if pages else None
+            except ValueError:
+                doc.close()
+                raise
             self.pdf_documents.append(doc)
+            self.page_ranges.append(ranges)
+            self._flush_if_needed()
             
         except Exception as e:
             raise Exception(f"加入 PDF 失敗 ({pdf_path}): {str(e)}")
@@ -51,41 +167,152 @@ class PDFMerger:
             # 從位元組資料建立 PDF 文件
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             self.pdf_documents.append(doc)
+            self.page_ranges.append(None)
             self.temp_docs.append(doc)  # 記錄為暫時文件
+            self._flush_if_needed()
             
         except Exception as e:
             raise Exception(f"加入 PDF 位元組資料失敗: {str(e)}")
     
-    def save(self, output_path: str) -> None:
+    def get_output_document(self) -> fitz.Document:
+        """
+        取得合併結果文件，供其他模組直接寫入頁面（例如圖片排版）
+        
+        尚未寫入的來源會先依序合併，以維持頁面順序。
+        
+        Returns:
+            fitz.Document: 合併結果文件
+        """
+        self._flush()
+        return self.result
+    
+    def checkpoint(self) -> fitz.Document:
+        """
+        檢查記憶體預算，超過時將結果文件寫出至暫存檔並重新開啟
+        
+        第一次寫出為完整儲存，之後以增量儲存只附加新增的物件；兩者都不重新編號物件，
+        因此 image_xrefs 仍然有效。重新開啟後頁面內容由 MuPDF 按需從暫存檔讀取。
+        
+        Returns:
+            fitz.Document: 結果文件（可能已重新開啟，呼叫端須改用回傳值繼續寫入）
+        """
+        if self.governor is not None and self.result is not None and self.governor.over_budget():
+            spill_path = self.governor.spill_path()
+            with self.tracer.span('spill', 'pdf', pages=self.result.page_count, spills=self.governor.spills + 1):
+                if self._spilled:
+                    self.result.save(spill_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+                else:
+                    self.result.save(spill_path)
+                self.result.close()
+                self.result = fitz.open(spill_path)
+                self._spilled = True
+            self.governor.spilled()
+        return self.result
+    
+    def save(self, output_path: Union[str, BinaryIO], profile: str = 'fast') -> int:
         """
         儲存合併後的 PDF 檔案
         
         Args:
-            output_path: 輸出檔案路徑
+            output_path: 輸出檔案路徑（附加模式下須為附加目標本身），或可寫入的二進位串流
+                （例如管線、socket 包裝、BytesIO），結果直接寫入而不經過暫存檔；串流不會被關閉
+            profile: 輸出壓縮設定檔，見 SAVE_PROFILES（fast、balanced、smallest，MuPDF 支援線性化時另有 web）；
+                附加模式使用增量儲存，不套用設定檔
+            
+        Returns:
+            int: 輸出文件的頁數
             
         Raises:
             Exception: 儲存失敗時拋出異常
         """
         try:
-            if not self.pdf_documents:
+            if profile not in PDFMerger.SAVE_PROFILES:
+                if profile == 'web':
+                    raise ValueError("輸出設定檔 web 需要線性化，目前的 MuPDF 版本不支援")
+                raise ValueError(f"未知的輸出設定檔: {profile}")
+            
+            if not self.pdf_documents and self.result is None:
                 raise ValueError("沒有要合併的 PDF 文件")
             
-            # 建立新的 PDF 文件
-            result = fitz.open()
+            # 將尚未寫入的來源合併至結果文件
+            self._flush()
             
-            # 合併所有 PDF
-            for doc in self.pdf_documents:
-                result.insert_pdf(doc)
+            is_stream = PDFMerger.is_stream(output_path)
+            if self.append_to is not None:
+                if is_stream:
+                    raise ValueError("附加模式的輸出必須為檔案路徑")
+                return self._save_incremental(output_path, profile)
             
             # 儲存結果
-            result.save(output_path)
-            result.close()
+            save_options = PDFMerger.SAVE_PROFILES[profile]
+            target = _StreamOutput(output_path) if is_stream else output_path
+            with self.tracer.span('save', 'pdf', profile=profile, pages=self.result.page_count):
+                self.result.save(target, **save_options)
+            if is_stream and hasattr(output_path, 'flush'):
+                output_path.flush()
+            return self.result.page_count
             
         except Exception as e:
             raise Exception(f"儲存合併 PDF 失敗: {str(e)}")
         finally:
             self.close()
     
+    def _save_incremental(self, output_path: str, profile: str) -> int:
+        """
+        附加模式：以增量儲存將新增的物件寫在原檔案末端
+        
+        檔案在開啟時經過修復而無法增量儲存時，改為完整重寫（先寫入暫存檔再取代）。
+        
+        Returns:
+            int: 輸出文件的頁數
+        """
+        if os.path.abspath(output_path) != os.path.abspath(self.append_to):
+            raise ValueError("附加模式的輸出路徑必須與附加目標相同")
+        
+        page_count = self.result.page_count
+        # 結果文件已改由暫存檔開啟時，無法增量儲存至原檔案
+        if not self._spilled and self.result.can_save_incrementally():
+            with self.tracer.span('save', 'pdf', incremental=True, pages=page_count):
+                self.result.save(output_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+            return page_count
+        
+        temp_path = output_path + '.tmp'
+        try:
+            with self.tracer.span('save', 'pdf', profile=profile, pages=page_count):
+                self.result.save(temp_path, **PDFMerger.SAVE_PROFILES[profile])
+            # 先關閉原檔案才能取代（Windows 不允許取代開啟中的檔案）
+            self.result.close()
+            self.result = None
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return page_count
+    
+    def _flush_if_needed(self) -> None:
+        """串流模式下，開啟中的來源達到上限時寫入結果文件"""
+        if self.max_open_docs is not None and len(self.pdf_documents) >= self.max_open_docs:
+            self._flush()
+    
+    def _flush(self) -> None:
+        """將開啟中的來源依序插入結果文件，並立即關閉來源"""
+        if self.result is None:
+            self.result = fitz.open()
+        
+        for doc, ranges in zip(self.pdf_documents, self.page_ranges):
+            with self.tracer.span('insert_pdf', 'pdf', file=doc.name or '<bytes>', pages=doc.page_count):
+                if ranges is None:
+                    self.result.insert_pdf(doc)
+                else:
+                    # 只複製選取的頁面及其引用的物件
+                    for from_page, to_page in ranges:
+                        self.result.insert_pdf(doc, from_page=from_page, to_page=to_page)
+            doc.close()
+            self.checkpoint()
+        self.pdf_documents.clear()
+        self.page_ranges.clear()
+        self.temp_docs.clear()
+    
     def close(self) -> None:
         """關閉合併器，釋放資源"""
         for doc in self.pdf_documents:
@@ -94,7 +321,26 @@ class PDFMerger:
             except:
                 pass
         self.pdf_documents.clear()
+        self.page_ranges.clear()
         self.temp_docs.clear()
+        
+        if self.result is not None:
+            try:
+                self.result.close()
+            except:
+                pass
+            self.result = None
+        self.image_xrefs.clear()
+        
+        # 結果文件關閉後才能刪除暫存檔
+        if self.governor is not None:
+            self.governor.cleanup()
+        self._spilled = False
+    
+    @staticmethod
+    def is_stream(output) -> bool:
+        """輸出目標是否為串流（具 write 方法的物件），而非檔案路徑"""
+        return not isinstance(output, (str, bytes, os.PathLike)) and hasattr(output, 'write')
     
     @staticmethod
     def get_pdf_info(pdf_path: str) -> dict:
@@ -135,7 +381,7 @@ class PDFMerger:
         Raises:
             Exception: 合併失敗時拋出異常
         """
-        merger = PDFMerger()
+        merger = PDFMerger(max_open_docs=1)
         try:
             for pdf_path in pdf_paths:
                 merger.add_pdf(pdf_path)
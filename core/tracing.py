@@ -0,0 +1,157 @@
+"""
+效能追蹤模組
+記錄合併流程中每個階段與每個檔案的耗時區段，可透過回呼即時取得，
+或匯出為 Chrome trace-event JSON（以 chrome://tracing 或 Perfetto 開啟）
+
+未啟用追蹤時使用 NULL_TRACER，每個區段只多一次方法呼叫，不讀取時間也不配置記錄
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class _Span:
+    """計時區段（with 區塊結束時記錄）"""
+    
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+    
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+    
+    def set(self, **args) -> None:
+        """附加區段資訊（例如處理結果的頁數）"""
+        self.args.update(args)
+    
+    def __enter__(self) -> '_Span':
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter_ns() - self.start
+        if exc_type is not None:
+            self.args['error'] = str(exc)
+        self.tracer.record(self.name, self.category, self.start, duration, self.args)
+        return False
+
+
+class _NullSpan:
+    """未啟用追蹤時的區段，不做任何事"""
+    
+    __slots__ = ()
+    
+    def set(self, **args) -> None:
+        pass
+    
+    def __enter__(self) -> '_NullSpan':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """效能追蹤器，收集 Chrome trace-event 格式的完整事件 (ph = 'X')"""
+    
+    enabled = True
+    
+    def __init__(self, callback: Optional[Callable[[dict], None]] = None):
+        """
+        初始化追蹤器
+        
+        Args:
+            callback: 區段結束時的回呼 (可選)，接收事件 dict
+                (name、cat、ts、dur 微秒、pid、tid、args)；可能於背景執行緒呼叫
+        """
+        self.callback = callback
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+    
+    def span(self, name: str, category: str = 'merge', **args) -> _Span:
+        """
+        建立計時區段，以 with 使用
+        
+        Args:
+            name: 區段名稱，例如 'insert_pdf'
+            category: 分類，例如 'pdf'、'image'
+            **args: 附加資訊，例如 file=路徑
+        """
+        return _Span(self, name, category, args)
+    
+    def record(self, name: str, category: str, start_ns: int, duration_ns: int, args: dict) -> None:
+        """記錄一個已完成的區段（時間為 time.perf_counter_ns()）"""
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_ns / 1000,
+            'dur': duration_ns / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': args
+        }
+        self.add_events([event])
+    
+    def add_events(self, events: List[dict]) -> None:
+        """加入其他追蹤器（例如行程池子行程）收集的事件"""
+        with self._lock:
+            self.events.extend(events)
+        if self.callback:
+            for event in events:
+                self.callback(event)
+    
+    def chrome_trace(self) -> dict:
+        """
+        取得 Chrome trace-event 格式的資料
+        
+        Returns:
+            dict: {'traceEvents': [...], 'displayTimeUnit': 'ms'}
+        """
+        with self._lock:
+            events = list(self.events)
+        
+        # 行程名稱的中繼事件，讓子行程在時間軸上容易辨識
+        main_pid = os.getpid()
+        metadata = [
+            {
+                'name': 'process_name',
+                'ph': 'M',
+                'pid': pid,
+                'args': {'name': 'MergePDF' if pid == main_pid else f'MergePDF worker {pid}'}
+            }
+            for pid in sorted({event['pid'] for event in events})
+        ]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
+    
+    def save(self, output_path: str) -> None:
+        """將追蹤資料寫入 JSON 檔案"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+class NullTracer:
+    """未啟用追蹤時使用的追蹤器，介面與 Tracer 相同但不記錄任何資料"""
+    
+    enabled = False
+    events: List[dict] = []
+    
+    def span(self, name: str, category: str = 'merge', **args) -> _NullSpan:
+        return _NULL_SPAN
+    
+    def record(self, name: str, category: str, start_ns: int, duration_ns: int, args: dict) -> None:
+        pass
+    
+    def add_events(self, events: List[dict]) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
@@ -0,0 +1,122 @@
+"""
+檔案資訊預取
+新增檔案時以執行緒池在背景呼叫 FileHandler.get_file_info，
+結果依檔案路徑快取，並分批通知介面更新頁數、尺寸與大小欄位
+"""
+
+from typing import Iterable, Optional
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from core.file_handler import FileHandler
+from gui.thumbnails import FITZ_LOCK
+from utils.validators import is_pdf_file
+
+
+def format_size(size: int) -> str:
+    """將位元組數轉為易讀的大小字串"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class _InfoSignals(QObject):
+    """檔案資訊工作的訊號"""
+    
+    # 完成 (檔案路徑, 檔案資訊)
+    fetched = Signal(str, dict)
+
+
+class _InfoTask(QRunnable):
+    """在執行緒池中讀取單一檔案的資訊"""
+    
+    def __init__(self, signals: _InfoSignals, file_path: str):
+        super().__init__()
+        self.signals = signals
+        self.file_path = file_path
+    
+    def run(self):
+        """讀取檔案資訊（get_file_info 只讀取標頭與 PDF 目錄，不解碼內容）"""
+        try:
+            if is_pdf_file(self.file_path):
+                with FITZ_LOCK:
+                    info = FileHandler.get_file_info(self.file_path)
+            else:
+                info = FileHandler.get_file_info(self.file_path)
+        except Exception as e:
+            # 檔案已刪除或無法讀取
+            info = {'path': self.file_path, 'error': str(e)}
+        self.signals.fetched.emit(self.file_path, info)
+
+
+class FileInfoPrefetcher(QObject):
+    """檔案資訊預取器：有上限的背景執行緒池 + 依路徑的結果快取"""
+    
+    # 一批檔案資訊已可取得，參數為檔案路徑列表
+    info_ready = Signal(list)
+    
+    def __init__(
+        self,
+        max_threads: Optional[int] = None,
+        batch_interval_ms: int = 100,
+        parent: Optional[QObject] = None
+    ):
+        """
+        初始化檔案資訊預取器
+        
+        Args:
+            max_threads: 背景執行緒數，None 表示依 CPU 核心數決定（最多 4）
+            batch_interval_ms: 合併通知的間隔 (毫秒)，大量檔案時避免逐一更新介面
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self._infos = {}  # {檔案路徑: 檔案資訊}，重新排序或重複加入時直接使用
+        self._pending = set()
+        self._ready = []
+        
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads or min(4, QThreadPool.globalInstance().maxThreadCount()))
+        
+        self._signals = _InfoSignals()
+        self._signals.fetched.connect(self._on_fetched)
+        
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.setInterval(batch_interval_ms)
+        self._batch_timer.timeout.connect(self._emit_ready)
+    
+    def info(self, file_path: str) -> Optional[dict]:
+        """
+        取得已快取的檔案資訊
+        
+        Returns:
+            Optional[dict]: FileHandler.get_file_info 的結果；尚未取得時回傳 None
+        """
+        return self._infos.get(file_path)
+    
+    def prefetch(self, file_paths: Iterable[str]) -> None:
+        """將尚未快取的檔案排入背景工作"""
+        for file_path in file_paths:
+            if file_path in self._infos or file_path in self._pending:
+                continue
+            self._pending.add(file_path)
+            self._pool.start(_InfoTask(self._signals, file_path))
+    
+    def shutdown(self) -> None:
+        """取消尚未開始的工作並等待執行中的工作結束"""
+        self._pool.clear()
+        self._pool.waitForDone()
+    
+    def _on_fetched(self, file_path: str, info: dict):
+        """背景工作完成（於 GUI 執行緒），累積後分批通知"""
+        self._pending.discard(file_path)
+        self._infos[file_path] = info
+        self._ready.append(file_path)
+        if not self._batch_timer.isActive():
+            self._batch_timer.start()
+    
+    def _emit_ready(self):
+        """發出累積的完成通知"""
+        ready, self._ready = self._ready, []
+        if ready:
+            self.info_ready.emit(ready)
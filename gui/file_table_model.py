@@ -0,0 +1,355 @@
+"""
+檔案列表模型
+以 QAbstractTableModel 提供檔案列表，新增、刪除、移動時只通知受影響的列，
+由檢視元件只繪製畫面上可見的列，數千個檔案也不需重建所有項目；
+PDF 的頁面範圍與檔案一起保存，可直接在表格中編輯；
+檔案類型由背景的檔案資訊預取判斷後保存在列中，繪製時不讀取檔案
+"""
+
+import os
+from typing import Iterable, List, Optional, Tuple
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from gui.file_info import FileInfoPrefetcher, format_size
+from gui.thumbnails import ThumbnailLoader
+from utils.page_ranges import parse_page_ranges, validate_page_spec
+
+
+class FileTableModel(QAbstractTableModel):
+    """檔案列表模型，每列只保存檔案路徑、頁面範圍與檔案類型，其餘欄位在繪製時計算或由快取取得"""
+    
+    # 欄位
+    (
+        COLUMN_INDEX, COLUMN_THUMBNAIL, COLUMN_NAME, COLUMN_TYPE,
+        COLUMN_PAGES, COLUMN_PAGE_RANGE, COLUMN_DIMENSIONS, COLUMN_SIZE, COLUMN_PATH
+    ) = range(9)
+    
+    HEADERS = ["序號", "縮圖", "檔案名稱", "類型", "頁數", "頁面範圍", "尺寸", "大小", "完整路徑"]
+    
+    # 頁面範圍為空時的顯示文字
+    ALL_PAGES_TEXT = "全部"
+    
+    # 背景讀取的檔案資訊欄位
+    INFO_COLUMNS = (COLUMN_PAGES, COLUMN_DIMENSIONS, COLUMN_SIZE)
+    
+    # 檔案類型（同 FileHandler.get_file_info 的 type）；None 表示尚未取得檔案資訊
+    TYPE_PDF = 'PDF'
+    TYPE_UNKNOWN = 'Unknown'
+    
+    def __init__(
+        self,
+        thumbnail_loader: ThumbnailLoader,
+        file_info_prefetcher: FileInfoPrefetcher,
+        parent=None
+    ):
+        """
+        初始化檔案列表模型
+        
+        Args:
+            thumbnail_loader: 縮圖載入器（模型只讀取已快取的縮圖，不會觸發載入）
+            file_info_prefetcher: 檔案資訊預取器
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self._entries: List[Tuple[str, str, Optional[str]]] = []  # [(檔案路徑, 頁面範圍, 檔案類型)]
+        self.thumbnail_loader = thumbnail_loader
+        self.file_info_prefetcher = file_info_prefetcher
+        
+        # 背景結果完成時只通知對應的欄，檢視元件僅重繪可見的儲存格
+        thumbnail_loader.thumbnail_ready.connect(
+            lambda _: self._column_changed(FileTableModel.COLUMN_THUMBNAIL, Qt.ItemDataRole.DecorationRole)
+        )
+        file_info_prefetcher.info_ready.connect(self._on_file_info_ready)
+    
+    # ===== Qt 模型介面 =====
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(FileTableModel.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return FileTableModel.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        row, column = index.row(), index.column()
+        file_path, page_spec, file_type = self._entries[row]
+        
+        if column == FileTableModel.COLUMN_PAGE_RANGE:
+            if role == Qt.ItemDataRole.EditRole:
+                return page_spec
+            if role == Qt.ItemDataRole.DisplayRole and file_type == FileTableModel.TYPE_PDF:
+                return page_spec or FileTableModel.ALL_PAGES_TEXT
+            return None
+        
+        if role == Qt.ItemDataRole.DecorationRole and column == FileTableModel.COLUMN_THUMBNAIL:
+            pixmap = self.thumbnail_loader.thumbnail(file_path)
+            return pixmap if pixmap is not None and not pixmap.isNull() else None
+        
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        
+        if column == FileTableModel.COLUMN_INDEX:
+            return str(row + 1)
+        if column == FileTableModel.COLUMN_NAME:
+            return os.path.basename(file_path)
+        if column == FileTableModel.COLUMN_TYPE:
+            return file_type or ""
+        if column in FileTableModel.INFO_COLUMNS:
+            return self._file_info_texts(file_path)[FileTableModel.INFO_COLUMNS.index(column)]
+        if column == FileTableModel.COLUMN_PATH:
+            return file_path
+        return None
+    
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        """編輯頁面範圍；格式錯誤或超出已知頁數時不接受"""
+        if (
+            not index.isValid() or role != Qt.ItemDataRole.EditRole or
+            index.column() != FileTableModel.COLUMN_PAGE_RANGE
+        ):
+            return False
+        
+        file_path, _, file_type = self._entries[index.row()]
+        page_spec = str(value or '').strip()
+        if page_spec == FileTableModel.ALL_PAGES_TEXT:
+            page_spec = ''
+        
+        try:
+            info = self.file_info_prefetcher.info(file_path)
+            if info and 'pages' in info:
+                parse_page_ranges(page_spec, info['pages'])
+            else:
+                validate_page_spec(page_spec)
+        except ValueError:
+            return False
+        
+        self._entries[index.row()] = (file_path, page_spec, file_type)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return True
+    
+    def flags(self, index):
+        # 可拖曳列；拖放到空白處（無效索引）視為移到最後
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        flags = (
+            Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable |
+            Qt.ItemFlag.ItemIsDragEnabled | Qt.ItemFlag.ItemIsDropEnabled
+        )
+        # 只有 PDF 可指定頁面範圍
+        if (
+            index.column() == FileTableModel.COLUMN_PAGE_RANGE and
+            self._entries[index.row()][2] == FileTableModel.TYPE_PDF
+        ):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+    
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+    
+    # ===== 檔案列表操作 =====
+    
+    def files(self) -> list:
+        """
+        取得合併用的檔案列表（依合併順序，回傳副本）
+        
+        Returns:
+            list: 未指定頁面範圍的項目為路徑，否則為 (路徑, 頁面範圍)，
+                可直接傳給 FileHandler.merge_files
+        """
+        return [(path, spec) if spec else path for path, spec, _ in self._entries]
+    
+    def file_at(self, row: int) -> str:
+        """取得指定列的檔案路徑"""
+        return self._entries[row][0]
+    
+    def page_range_at(self, row: int) -> str:
+        """取得指定列的頁面範圍（空字串表示全部頁面）"""
+        return self._entries[row][1]
+    
+    def add_files(self, file_paths: Iterable[str]) -> None:
+        """將檔案加入列表末端（頁面範圍預設為全部；檔案類型已有快取時直接使用，否則待背景讀取）"""
+        entries = [(file_path, '', self._cached_type(file_path)) for file_path in file_paths]
+        if not entries:
+            return
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._entries.extend(entries)
+        self.endInsertRows()
+    
+    def remove_unsupported(self) -> List[str]:
+        """
+        移除已判斷為不支援格式（或無法讀取）的檔案
+        
+        Returns:
+            List[str]: 被移除的檔案路徑
+        """
+        rows = [row for row, entry in enumerate(self._entries) if entry[2] == FileTableModel.TYPE_UNKNOWN]
+        removed = [self._entries[row][0] for row in rows]
+        self.remove_rows(rows)
+        return removed
+    
+    def clear(self) -> None:
+        """清空列表"""
+        self.beginResetModel()
+        self._entries.clear()
+        self.endResetModel()
+    
+    def remove_rows(self, rows: Iterable[int]) -> None:
+        """刪除指定的列（可不連續），每個連續區段只通知一次"""
+        for first, last in reversed(FileTableModel._blocks(rows)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._entries[first:last + 1]
+            self.endRemoveRows()
+    
+    def move_block(self, first: int, last: int, destination: int) -> bool:
+        """
+        將連續的列 [first, last] 移到 destination 之前
+        
+        Args:
+            first: 區段的第一列
+            last: 區段的最後一列
+            destination: 目標位置（移動前的列索引，len 表示最後）
+        
+        Returns:
+            bool: 是否有移動（目標位於區段內時不移動）
+        """
+        if first <= destination <= last + 1:
+            return False
+        if not self.beginMoveRows(QModelIndex(), first, last, QModelIndex(), destination):
+            return False
+        
+        block = self._entries[first:last + 1]
+        del self._entries[first:last + 1]
+        insert_at = destination if destination < first else destination - len(block)
+        self._entries[insert_at:insert_at] = block
+        
+        self.endMoveRows()
+        return True
+    
+    def move_rows_up(self, rows: Iterable[int]) -> Optional[List[int]]:
+        """
+        將選取的列各上移一列（多個區段各自移動）
+        
+        Returns:
+            Optional[List[int]]: 移動後的列；已在最上方無法移動時回傳 None
+        """
+        blocks = FileTableModel._blocks(rows)
+        if not blocks or blocks[0][0] == 0:
+            return None
+        for first, last in blocks:
+            self.move_block(first, last, first - 1)
+        return [row - 1 for first, last in blocks for row in range(first, last + 1)]
+    
+    def move_rows_down(self, rows: Iterable[int]) -> Optional[List[int]]:
+        """
+        將選取的列各下移一列（多個區段各自移動）
+        
+        Returns:
+            Optional[List[int]]: 移動後的列；已在最下方無法移動時回傳 None
+        """
+        blocks = FileTableModel._blocks(rows)
+        if not blocks or blocks[-1][1] == len(self._entries) - 1:
+            return None
+        for first, last in reversed(blocks):
+            self.move_block(first, last, last + 2)
+        return [row + 1 for first, last in blocks for row in range(first, last + 1)]
+    
+    def move_rows_to(self, rows: Iterable[int], destination: int) -> Tuple[int, int]:
+        """
+        將選取的列（可不連續）依原順序集中移到 destination 之前（用於拖放）
+        
+        Args:
+            rows: 要移動的列
+            destination: 目標位置（移動前的列索引，len 表示最後）
+        
+        Returns:
+            Tuple[int, int]: 移動後的第一列與最後一列
+        """
+        blocks = FileTableModel._blocks(rows)
+        if not blocks:
+            return (destination, destination - 1)
+        
+        # 目標落在選取區段內時，視為插入在該區段之前
+        for first, last in blocks:
+            if first < destination <= last:
+                destination = first
+                break
+        
+        above = [block for block in blocks if block[1] < destination]
+        below = [block for block in blocks if block[0] >= destination]
+        
+        # 目標上方的區段由近而遠依序移到目標之前（只影響目標上方的列）
+        insert_before = destination
+        for first, last in reversed(above):
+            self.move_block(first, last, insert_before)
+            insert_before -= last - first + 1
+        
+        # 目標下方的區段依序接在後面
+        insert_at = destination
+        for first, last in below:
+            self.move_block(first, last, insert_at)
+            insert_at += last - first + 1
+        
+        return (insert_before, insert_at - 1)
+    
+    # ===== 內部 =====
+    
+    @staticmethod
+    def _blocks(rows: Iterable[int]) -> List[Tuple[int, int]]:
+        """將列索引整理為遞增的連續區段 [(first, last), ...]"""
+        blocks = []
+        for row in sorted(set(rows)):
+            if blocks and row == blocks[-1][1] + 1:
+                blocks[-1] = (blocks[-1][0], row)
+            else:
+                blocks.append((row, row))
+        return blocks
+    
+    def _column_changed(self, column: int, role) -> None:
+        """通知整欄資料已變更（檢視元件只會重繪可見的儲存格）"""
+        if self._entries:
+            self.dataChanged.emit(
+                self.index(0, column),
+                self.index(len(self._entries) - 1, column),
+                [role]
+            )
+    
+    def _on_file_info_ready(self, file_paths: list):
+        """一批檔案資訊讀取完成：記錄檔案類型，並通知類型與檔案資訊欄位"""
+        if not self._entries:
+            return
+        
+        ready = set(file_paths)
+        for row, (file_path, page_spec, file_type) in enumerate(self._entries):
+            if file_type is None and file_path in ready:
+                self._entries[row] = (file_path, page_spec, self._cached_type(file_path))
+        
+        self.dataChanged.emit(
+            self.index(0, FileTableModel.COLUMN_TYPE),
+            self.index(len(self._entries) - 1, FileTableModel.INFO_COLUMNS[-1]),
+            [Qt.ItemDataRole.DisplayRole]
+        )
+    
+    def _cached_type(self, file_path: str) -> Optional[str]:
+        """由已快取的檔案資訊取得檔案類型；尚未讀取時回傳 None"""
+        info = self.file_info_prefetcher.info(file_path)
+        if info is None:
+            return None
+        return info.get('type', FileTableModel.TYPE_UNKNOWN)
+    
+    def _file_info_texts(self, file_path: str) -> Tuple[str, str, str]:
+        """檔案資訊欄位的顯示文字 (頁數, 尺寸, 大小)"""
+        info = self.file_info_prefetcher.info(file_path)
+        if info is None:
+            return ("", "", "")
+        if 'size' not in info:
+            return ("", "", "無法讀取")
+        
+        pages = str(info['pages']) if 'pages' in info else ""
+        dimensions = f"{info['width']}×{info['height']}" if 'width' in info else ""
+        return (pages, dimensions, format_size(info['size']))
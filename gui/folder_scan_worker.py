@@ -0,0 +1,73 @@
+"""
+資料夾掃描工作執行緒
+在背景執行緒走訪資料夾，並以 Qt 訊號分批回報找到的檔案
+"""
+
+import time
+from PySide6.QtCore import QObject, Signal, Slot
+from typing import List, Optional
+from utils.folder_scanner import natural_sort_key, scan_paths
+
+
+class FolderScanWorker(QObject):
+    """資料夾掃描工作物件，移至 QThread 後由 run() 執行"""
+    
+    # 找到一批檔案
+    batch_found = Signal(list)
+    # 掃描結束（無論完成或取消），參數為找到的檔案數
+    finished = Signal(int)
+    
+    # 每批最多的檔案數
+    BATCH_SIZE = 500
+    
+    # 距離上一批超過此時間 (秒) 即送出，讓掃描較慢時也能逐步顯示
+    BATCH_INTERVAL = 0.1
+    
+    def __init__(
+        self,
+        paths: List[str],
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None
+    ):
+        """
+        初始化掃描工作
+        
+        Args:
+            paths: 要展開的檔案或資料夾（依自然排序處理）
+            include: 只納入符合任一樣式的檔名 (可選)
+            exclude: 排除符合任一樣式的檔名或資料夾名稱 (可選)
+        """
+        super().__init__()
+        self.paths = sorted(paths, key=natural_sort_key)
+        self.include = include
+        self.exclude = exclude
+        self._cancel_requested = False
+    
+    @Slot()
+    def run(self):
+        """執行掃描（於背景執行緒）"""
+        count = 0
+        batch = []
+        last_emit = time.monotonic()
+        
+        try:
+            for file_path in scan_paths(self.paths, self.include, self.exclude):
+                if self._cancel_requested:
+                    break
+                batch.append(file_path)
+                count += 1
+                
+                if len(batch) >= FolderScanWorker.BATCH_SIZE or \
+                        time.monotonic() - last_emit >= FolderScanWorker.BATCH_INTERVAL:
+                    self.batch_found.emit(batch)
+                    batch = []
+                    last_emit = time.monotonic()
+            
+            if batch and not self._cancel_requested:
+                self.batch_found.emit(batch)
+        finally:
+            self.finished.emit(count)
+    
+    def cancel(self):
+        """要求停止掃描"""
+        self._cancel_requested = True
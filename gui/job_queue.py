@@ -0,0 +1,464 @@
+"""
+合併工作佇列
+將目前的檔案列表與設定加入佇列成為一個工作，由有上限的工作池同時執行多個工作，
+並提供各工作的進度、取消與重試
+
+PyMuPDF 並非執行緒安全，每個工作在獨立的子行程中執行，以 multiprocessing 佇列回報進度與結果；
+GUI 執行緒以計時器定期讀取，不會被合併阻塞
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+from typing import Dict, List, Optional
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt, QTimer, Signal
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionProgressBar
+
+# 工作狀態
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_CANCELING = 'canceling'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_CANCELED = 'canceled'
+
+# 已結束的狀態（可移除；失敗與取消的工作可重試）
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELED)
+RETRYABLE_STATUSES = (STATUS_FAILED, STATUS_CANCELED)
+
+STATUS_TEXT = {
+    STATUS_QUEUED: "等待中",
+    STATUS_RUNNING: "執行中",
+    STATUS_CANCELING: "取消中",
+    STATUS_DONE: "完成",
+    STATUS_FAILED: "失敗",
+    STATUS_CANCELED: "已取消"
+}
+
+# 子行程回報進度的最短間隔 (秒)，逐張圖片回報時避免塞滿佇列
+_PROGRESS_INTERVAL = 0.1
+
+
+def _run_job(job_id: int, attempt: int, file_paths: list, output_path: str, layout_options: dict, append: bool,
+             events, cancel_event) -> None:
+    """
+    在子行程執行一個合併工作（模組層級函數，供 spawn 行程呼叫）
+    
+    以 events 佇列回報 (工作編號, 執行次數, 種類, 內容)：
+        ('progress', (目前, 總數, 訊息))、('done', 頁數)、('failed', 錯誤訊息)、('canceled', None)
+    執行次數讓接收端辨識並捨棄已取消或已重試的舊行程遲到的事件
+    """
+    from core.file_handler import FileHandler
+    from gui.merge_worker import MergeCanceled
+    
+    last_report = 0.0
+    
+    def report_progress(current: int, total: int, message: str):
+        nonlocal last_report
+        if cancel_event.is_set():
+            raise MergeCanceled("使用者取消操作")
+        now = time.monotonic()
+        if now - last_report >= _PROGRESS_INTERVAL or current >= total:
+            last_report = now
+            events.put((job_id, attempt, 'progress', (current, total, message)))
+    
+    try:
+        pages = FileHandler.merge_files(
+            file_paths,
+            output_path,
+            report_progress,
+            layout_options=layout_options,
+            append=append
+        )
+        events.put((job_id, attempt, 'done', pages))
+    except Exception as e:
+        if cancel_event.is_set():
+            events.put((job_id, attempt, 'canceled', None))
+        else:
+            events.put((job_id, attempt, 'failed', str(e)))
+
+
+class MergeJob:
+    """佇列中的一個合併工作"""
+    
+    def __init__(self, job_id: int, file_paths: list, output_path: str, layout_options: dict, append: bool):
+        """
+        初始化合併工作
+        
+        Args:
+            job_id: 工作編號（1 起算）
+            file_paths: 要合併的檔案列表，項目為路徑或 (路徑, 頁面範圍)（會複製一份，避免與介面共用）
+            output_path: 輸出 PDF 檔案路徑
+            layout_options: 圖片版面選項
+            append: 是否附加在既有輸出檔案的末端
+        """
+        self.job_id = job_id
+        self.file_paths = list(file_paths)
+        self.output_path = output_path
+        self.layout_options = dict(layout_options)
+        self.append = append
+        self.status = STATUS_QUEUED
+        self.current = 0
+        self.total = len(self.file_paths)
+        self.message = ""
+        self.pages = 0
+        self.error = ""
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self.process = None
+        self.cancel_event = None
+        # 已啟動的次數，每次啟動（含重試）遞增，用來捨棄先前執行的遲到事件
+        self.attempt = 0
+    
+    @property
+    def finished(self) -> bool:
+        """工作是否已結束"""
+        return self.status in FINISHED_STATUSES
+    
+    @property
+    def active(self) -> bool:
+        """工作是否等待中或執行中"""
+        return not self.finished
+    
+    def percent(self) -> int:
+        """進度百分比"""
+        if self.status == STATUS_DONE:
+            return 100
+        if self.total <= 0:
+            return 0
+        return min(100, int(self.current * 100 / self.total))
+    
+    def reset(self) -> None:
+        """重試前清除上一次執行的結果"""
+        self.status = STATUS_QUEUED
+        self.current = 0
+        self.message = ""
+        self.pages = 0
+        self.error = ""
+        self.elapsed = 0.0
+
+
+class JobQueue(QAbstractTableModel):
+    """合併工作佇列與表格模型：依序啟動等待中的工作，同時執行的數量不超過 max_concurrent"""
+    
+    COLUMN_ID, COLUMN_OUTPUT, COLUMN_FILES, COLUMN_STATUS, COLUMN_PROGRESS, COLUMN_MESSAGE = range(6)
+    
+    HEADERS = ["序號", "輸出檔案", "檔案數", "狀態", "進度", "訊息"]
+    
+    # 讀取子行程事件的間隔 (毫秒)
+    POLL_INTERVAL_MS = 100
+    
+    # 關閉時等待子行程結束的時間 (秒)，逾時則強制終止
+    SHUTDOWN_TIMEOUT = 5.0
+    
+    # 工作結束，參數為工作編號
+    job_finished = Signal(int)
+    # 等待中與執行中的工作數改變 (等待中, 執行中)
+    counts_changed = Signal(int, int)
+    
+    def __init__(self, max_concurrent: int = 2, parent: Optional[QObject] = None):
+        """
+        初始化工作佇列
+        
+        Args:
+            max_concurrent: 同時執行的工作數上限
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.max_concurrent = max(1, max_concurrent)
+        self._jobs: List[MergeJob] = []
+        self._next_id = 1
+        
+        # spawn 行程不會繼承 GUI 執行緒與 Qt 狀態，各平台行為一致
+        self._context = multiprocessing.get_context('spawn')
+        self._events = self._context.Queue()
+        
+        self._timer = QTimer(self)
+        self._timer.setInterval(JobQueue.POLL_INTERVAL_MS)
+        self._timer.timeout.connect(self._poll)
+    
+    # ===== 表格模型 =====
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._jobs)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(JobQueue.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return JobQueue.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        job = self._jobs[index.row()]
+        column = index.column()
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == JobQueue.COLUMN_ID:
+                return str(job.job_id)
+            if column == JobQueue.COLUMN_OUTPUT:
+                return os.path.basename(job.output_path) + (" (附加)" if job.append else "")
+            if column == JobQueue.COLUMN_FILES:
+                return str(len(job.file_paths))
+            if column == JobQueue.COLUMN_STATUS:
+                return STATUS_TEXT[job.status]
+            if column == JobQueue.COLUMN_PROGRESS:
+                return job.percent()
+            if column == JobQueue.COLUMN_MESSAGE:
+                if job.status == STATUS_FAILED:
+                    return job.error
+                if job.status == STATUS_DONE:
+                    return f"共 {job.pages} 頁，耗時 {job.elapsed:.1f} 秒"
+                return job.message
+        
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if column == JobQueue.COLUMN_OUTPUT:
+                return job.output_path
+            if column == JobQueue.COLUMN_MESSAGE:
+                return job.error or job.message or None
+        
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            if column in (JobQueue.COLUMN_ID, JobQueue.COLUMN_FILES, JobQueue.COLUMN_STATUS):
+                return Qt.AlignmentFlag.AlignCenter
+        
+        return None
+    
+    # ===== 工作操作 =====
+    
+    def submit(self, file_paths: list, output_path: str, layout_options: dict, append: bool = False) -> int:
+        """
+        加入一個工作
+        
+        Args:
+            file_paths: 要合併的檔案列表
+            output_path: 輸出 PDF 檔案路徑
+            layout_options: 圖片版面選項（workers 為 None 時依同時執行數平分 CPU 核心）
+            append: 是否附加在既有輸出檔案的末端
+        
+        Returns:
+            int: 工作編號
+        
+        Raises:
+            ValueError: 檔案列表為空，或已有等待中、執行中的工作寫入同一個輸出檔案
+        """
+        if not file_paths:
+            raise ValueError("檔案列表不能為空")
+        if self.active_output(output_path):
+            raise ValueError(f"已有工作正在寫入此輸出檔案：\n{output_path}")
+        
+        job = MergeJob(self._next_id, file_paths, output_path, layout_options, append)
+        self._next_id += 1
+        
+        row = len(self._jobs)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._jobs.append(job)
+        self.endInsertRows()
+        
+        self._start_queued()
+        return job.job_id
+    
+    def cancel(self, row: int) -> None:
+        """取消工作：等待中的直接取消，執行中的於下一次進度回報時中止"""
+        job = self._jobs[row]
+        if job.status == STATUS_QUEUED:
+            job.status = STATUS_CANCELED
+            self._job_changed(job)
+            self.job_finished.emit(job.job_id)
+        elif job.status == STATUS_RUNNING:
+            job.cancel_event.set()
+            job.status = STATUS_CANCELING
+            self._job_changed(job)
+    
+    def retry(self, row: int) -> None:
+        """重新排入失敗或已取消的工作"""
+        job = self._jobs[row]
+        if job.status not in RETRYABLE_STATUSES:
+            return
+        if self.active_output(job.output_path):
+            raise ValueError(f"已有工作正在寫入此輸出檔案：\n{job.output_path}")
+        job.reset()
+        self._job_changed(job)
+        self._start_queued()
+    
+    def remove_finished(self) -> None:
+        """移除已結束的工作"""
+        for row in reversed(range(len(self._jobs))):
+            if self._jobs[row].finished:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._jobs[row]
+                self.endRemoveRows()
+    
+    def set_max_concurrent(self, max_concurrent: int) -> None:
+        """調整同時執行的工作數上限（執行中的工作不受影響）"""
+        self.max_concurrent = max(1, max_concurrent)
+        self._start_queued()
+    
+    def job_at(self, row: int) -> MergeJob:
+        """取得指定列的工作"""
+        return self._jobs[row]
+    
+    def active_output(self, output_path: str) -> bool:
+        """是否有等待中或執行中的工作寫入此輸出檔案"""
+        target = os.path.normcase(os.path.abspath(output_path))
+        return any(
+            job.active and os.path.normcase(os.path.abspath(job.output_path)) == target
+            for job in self._jobs
+        )
+    
+    def counts(self):
+        """
+        取得工作數
+        
+        Returns:
+            Tuple[int, int]: (等待中, 執行中)
+        """
+        queued = sum(1 for job in self._jobs if job.status == STATUS_QUEUED)
+        running = sum(1 for job in self._jobs if job.status in (STATUS_RUNNING, STATUS_CANCELING))
+        return queued, running
+    
+    def shutdown(self) -> None:
+        """取消所有工作並等待子行程結束（關閉視窗時呼叫）"""
+        self._timer.stop()
+        running = []
+        for job in self._jobs:
+            if job.status == STATUS_QUEUED:
+                job.status = STATUS_CANCELED
+            elif job.process is not None:
+                job.cancel_event.set()
+                running.append(job)
+        
+        deadline = time.monotonic() + JobQueue.SHUTDOWN_TIMEOUT
+        for job in running:
+            job.process.join(max(0.0, deadline - time.monotonic()))
+            if job.process.is_alive():
+                job.process.terminate()
+                job.process.join()
+            job.process = None
+            job.cancel_event = None
+            job.status = STATUS_CANCELED
+        
+        self._events.close()
+        self._events.join_thread()
+    
+    # ===== 排程 =====
+    
+    def _start_queued(self) -> None:
+        """在有空位時依加入順序啟動等待中的工作"""
+        running = sum(1 for job in self._jobs if job.process is not None)
+        for job in self._jobs:
+            if running >= self.max_concurrent:
+                break
+            if job.status == STATUS_QUEUED:
+                self._start(job)
+                running += 1
+        
+        if running and not self._timer.isActive():
+            self._timer.start()
+        self.counts_changed.emit(*self.counts())
+    
+    def _start(self, job: MergeJob) -> None:
+        """在子行程啟動工作"""
+        # 各工作平分 CPU 核心，避免每個工作都各自使用所有核心轉換圖片
+        layout_options = dict(job.layout_options)
+        if layout_options.get('workers') is None:
+            layout_options['workers'] = max(1, (os.cpu_count() or 1) // self.max_concurrent)
+        
+        job.status = STATUS_RUNNING
+        job.attempt += 1
+        job.started_at = time.monotonic()
+        job.cancel_event = self._context.Event()
+        # 非 daemon 行程：工作內的圖片轉換還會再建立行程池
+        job.process = self._context.Process(
+            target=_run_job,
+            args=(job.job_id, job.attempt, job.file_paths, job.output_path, layout_options, job.append,
+                  self._events, job.cancel_event),
+            name=f"MergePDF job {job.job_id}"
+        )
+        job.process.start()
+        self._job_changed(job)
+    
+    def _poll(self) -> None:
+        """讀取子行程回報的事件，並處理意外結束的行程"""
+        self._drain_events()
+        
+        for job in self._jobs:
+            if job.process is None or job.process.is_alive():
+                continue
+            # 行程已結束：先讀完剩餘事件，仍沒有結果表示行程異常結束
+            self._drain_events()
+            if job.process is None:
+                continue
+            if job.status == STATUS_CANCELING:
+                self._finish(job, STATUS_CANCELED)
+            else:
+                job.error = f"工作行程異常結束 (代碼 {job.process.exitcode})"
+                self._finish(job, STATUS_FAILED)
+        
+        if not any(job.process is not None for job in self._jobs):
+            self._timer.stop()
+    
+    def _drain_events(self) -> None:
+        """處理佇列中所有的事件"""
+        jobs: Dict[int, MergeJob] = {job.job_id: job for job in self._jobs}
+        while True:
+            try:
+                job_id, attempt, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                return
+            
+            job = jobs.get(job_id)
+            # 已結束的工作，或已取消、重試前的行程遲到的事件
+            if job is None or job.process is None or attempt != job.attempt:
+                continue
+            if kind == 'progress':
+                job.current, job.total, job.message = payload
+                self._job_changed(job)
+            elif kind == 'done':
+                job.pages = payload
+                self._finish(job, STATUS_DONE)
+            elif kind == 'failed':
+                job.error = payload
+                self._finish(job, STATUS_FAILED)
+            elif kind == 'canceled':
+                self._finish(job, STATUS_CANCELED)
+    
+    def _finish(self, job: MergeJob, status: str) -> None:
+        """工作結束：回收子行程並啟動下一個工作"""
+        job.process.join()
+        job.process = None
+        job.cancel_event = None
+        job.status = status
+        job.elapsed = time.monotonic() - job.started_at
+        self._job_changed(job)
+        self.job_finished.emit(job.job_id)
+        self._start_queued()
+    
+    def _job_changed(self, job: MergeJob) -> None:
+        """通知該工作所在的列需要重繪"""
+        row = self._jobs.index(job)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, JobQueue.COLUMN_MESSAGE))
+
+
+class ProgressBarDelegate(QStyledItemDelegate):
+    """以進度條繪製 0–100 的數值"""
+    
+    def paint(self, painter, option, index):
+        value = index.data(Qt.ItemDataRole.DisplayRole)
+        if not isinstance(value, int):
+            super().paint(painter, option, index)
+            return
+        
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(4, 4, -4, -4)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = value
+        bar.text = f"{value}%"
+        bar.textVisible = True
+        bar.state = option.state
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ProgressBar, bar, painter)
@@ -5,26 +5,82 @@ MergePDF 應用程式的主要使用者介面
 
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QTableWidget, QTableWidgetItem, QFileDialog,
+    QPushButton, QTableView, QAbstractItemView, QFileDialog,
     QMessageBox, QLabel, QLineEdit, QProgressDialog, QHeaderView,
-    QMenu, QComboBox, QSpinBox
+    QMenu, QComboBox, QSpinBox, QCheckBox
 )
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QThread, QTimer, QItemSelection, QItemSelectionModel
 from PySide6.QtGui import QIcon, QAction
 import os
+import re
 from typing import List, Optional
-from core.file_handler import FileHandler
-from utils.validators import validate_files, get_file_type
+from core.page_cache import PageCache
+from core.pdf_merger import PDFMerger
+from gui.file_info import FileInfoPrefetcher
+from gui.file_table_model import FileTableModel
+from gui.folder_scan_worker import FolderScanWorker
+from gui.job_queue import JobQueue, ProgressBarDelegate, STATUS_DONE, STATUS_FAILED
+from gui.merge_worker import MergeWorker
+from gui.thumbnails import ThumbnailLoader
 
 
 class MainWindow(QMainWindow):
     """主視窗類別 - 使用 PySide6"""
     
+    # 縮圖的最大邊長（像素）
+    THUMBNAIL_SIZE = 48
+    
+    # 捲動停止多久後才載入可見列的縮圖 (毫秒)，快速捲動時不會排入途經的列
+    THUMBNAIL_DELAY_MS = 60
+    
+    # 不支援的檔案在背景判斷後陸續移除，累積此時間 (毫秒) 後才一次提示
+    UNSUPPORTED_NOTICE_DELAY_MS = 300
+    
+    # 工作佇列預設同時執行的工作數
+    DEFAULT_CONCURRENT_JOBS = 2
+    
     def __init__(self):
         """初始化主視窗"""
         super().__init__()
-        self.file_list: List[str] = []
         self.dark_mode = False  # 預設為亮色主題
+        
+        # 背景合併工作
+        self.merge_worker: Optional[MergeWorker] = None
+        self.merge_thread: Optional[QThread] = None
+        self.merge_progress: Optional[QProgressDialog] = None
+        
+        # 背景資料夾掃描（一次一個，其餘排隊）
+        self.scan_worker: Optional[FolderScanWorker] = None
+        self.scan_thread: Optional[QThread] = None
+        self.pending_scans: List[List[str]] = []
+        self.scan_found = 0
+        
+        # 背景縮圖載入（只處理畫面上可見的列）
+        self.thumbnail_loader = ThumbnailLoader(
+            size=MainWindow.THUMBNAIL_SIZE,
+            disk_cache_dir=os.path.join(os.path.dirname(PageCache.default_dir()), 'thumbnails'),
+            parent=self
+        )
+        
+        # 背景讀取檔案資訊（頁數、尺寸、大小）
+        self.file_info_prefetcher = FileInfoPrefetcher(parent=self)
+        
+        # 檔案列表模型（只保存路徑，新增、刪除、移動時只通知受影響的列）
+        self.file_model = FileTableModel(self.thumbnail_loader, self.file_info_prefetcher, self)
+        
+        # 檔案類型由背景的檔案資訊判斷（模型先記錄類型），不支援的檔案於判斷後移除
+        self.file_info_prefetcher.info_ready.connect(self._remove_unsupported_files)
+        self.unsupported_files: List[str] = []
+        self.unsupported_timer = QTimer(self)
+        self.unsupported_timer.setSingleShot(True)
+        self.unsupported_timer.setInterval(MainWindow.UNSUPPORTED_NOTICE_DELAY_MS)
+        self.unsupported_timer.timeout.connect(self._warn_unsupported_files)
+        
+        # 合併工作佇列（每個工作在獨立的子行程執行，同時執行數有上限）
+        self.job_queue = JobQueue(MainWindow.DEFAULT_CONCURRENT_JOBS, self)
+        self.job_queue.job_finished.connect(self._on_job_finished)
+        self.job_queue.counts_changed.connect(self._on_job_counts_changed)
+        
         self.init_ui()
         
         # 設定預設輸出路徑為桌面
@@ -34,7 +90,7 @@ class MainWindow(QMainWindow):
     def init_ui(self):
         """初始化使用者介面"""
         self.setWindowTitle("MergePDF - 檔案合併工具")
-        self.setGeometry(100, 100, 900, 650)
+        self.setGeometry(100, 100, 900, 820)
         self.setMinimumSize(QSize(800, 600))
         
         # 建立中央 widget
@@ -79,6 +135,12 @@ class MainWindow(QMainWindow):
         self.add_btn.clicked.connect(self.add_files)
         toolbar_layout.addWidget(self.add_btn)
         
+        # 新增資料夾按鈕（樣式與新增檔案相同，由 apply_theme 設定）
+        self.add_folder_btn = QPushButton("📂 新增資料夾")
+        self.add_folder_btn.setMinimumHeight(40)
+        self.add_folder_btn.clicked.connect(self.add_folder)
+        toolbar_layout.addWidget(self.add_folder_btn)
+        
         # 清空按鈕
         self.clear_btn = QPushButton("🗑️ 清空列表")
         self.clear_btn.setMinimumHeight(40)
@@ -127,22 +189,28 @@ class MainWindow(QMainWindow):
         self.merge_btn.clicked.connect(self.merge_files)
         toolbar_layout.addWidget(self.merge_btn)
         
+        # 加入佇列按鈕（以目前的檔案列表與設定建立工作，樣式由 apply_theme 設定）
+        self.enqueue_btn = QPushButton("📥 加入佇列")
+        self.enqueue_btn.setMinimumHeight(40)
+        self.enqueue_btn.clicked.connect(self.enqueue_job)
+        toolbar_layout.addWidget(self.enqueue_btn)
+        
         main_layout.addLayout(toolbar_layout)
         
         # ===== 檔案列表 =====
-        list_label = QLabel("📁 檔案列表（可拖曳調整順序）")
+        list_label = QLabel("📁 檔案列表（可拖曳調整順序，或將檔案、資料夾拖入）")
         list_label.setObjectName("list_label")
         list_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #007bff; padding: 5px;")
         main_layout.addWidget(list_label)
         
         # 建立表格
-        self.file_table = QTableWidget()
-        self.file_table.setColumnCount(4)
-        self.file_table.setHorizontalHeaderLabels(["序號", "檔案名稱", "類型", "完整路徑"])
+        self.file_table = QTableView()
+        self.file_table.setModel(self.file_model)
+        self.file_table.verticalHeader().setVisible(False)
         
         # 設定表格樣式 - 明亮色系
         self.file_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 2px solid #dee2e6;
                 border-radius: 8px;
                 background-color: #ffffff;
@@ -151,25 +219,25 @@ class MainWindow(QMainWindow):
                 selection-background-color: #007bff;
                 selection-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 border-bottom: 1px solid #e9ecef;
                 color: #212529;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #e7f3ff;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #007bff;
                 color: white;
                 font-weight: bold;
             }
-            QTableWidget::item:selected:hover {
+            QTableView::item:selected:hover {
                 background-color: #0056b3;
                 color: white;
                 font-weight: bold;
             }
-            QTableWidget::item:focus {
+            QTableView::item:focus {
                 outline: 2px solid #007bff;
             }
             QHeaderView::section {
@@ -196,22 +264,54 @@ class MainWindow(QMainWindow):
         # 啟用拖放功能
         self.file_table.setDragEnabled(True)
         self.file_table.setAcceptDrops(True)
-        self.file_table.setDragDropMode(QTableWidget.DragDropMode.InternalMove)
+        self.file_table.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
         self.file_table.setDefaultDropAction(Qt.DropAction.MoveAction)
-        self.file_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.file_table.setDragDropOverwriteMode(False)
+        self.file_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        
+        # PDF 的頁面範圍（例如 1-5,9,20-）可雙擊或按 F2 編輯
+        self.file_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.EditKeyPressed
+        )
         
         # 設定欄位寬度
         header = self.file_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(FileTableModel.COLUMN_INDEX, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(FileTableModel.COLUMN_THUMBNAIL, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(FileTableModel.COLUMN_NAME, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(FileTableModel.COLUMN_TYPE, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(FileTableModel.COLUMN_PAGES, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(FileTableModel.COLUMN_PAGE_RANGE, QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(FileTableModel.COLUMN_DIMENSIONS, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(FileTableModel.COLUMN_SIZE, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(FileTableModel.COLUMN_PATH, QHeaderView.ResizeMode.Stretch)
+        
+        self.file_table.setColumnWidth(FileTableModel.COLUMN_INDEX, 60)
+        self.file_table.setColumnWidth(FileTableModel.COLUMN_THUMBNAIL, MainWindow.THUMBNAIL_SIZE + 24)
+        self.file_table.setColumnWidth(FileTableModel.COLUMN_TYPE, 80)
+        self.file_table.setColumnWidth(FileTableModel.COLUMN_PAGES, 60)
+        self.file_table.setColumnWidth(FileTableModel.COLUMN_PAGE_RANGE, 100)
+        self.file_table.setColumnWidth(FileTableModel.COLUMN_DIMENSIONS, 100)
+        self.file_table.setColumnWidth(FileTableModel.COLUMN_SIZE, 80)
+        
+        # 縮圖大小與列高
+        self.file_table.setIconSize(QSize(MainWindow.THUMBNAIL_SIZE, MainWindow.THUMBNAIL_SIZE))
+        self.file_table.verticalHeader().setDefaultSectionSize(MainWindow.THUMBNAIL_SIZE + 8)
         
-        self.file_table.setColumnWidth(0, 60)
-        self.file_table.setColumnWidth(2, 80)
+        # 捲動或調整大小後延遲載入可見列的縮圖
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(MainWindow.THUMBNAIL_DELAY_MS)
+        self.thumbnail_timer.timeout.connect(self._load_visible_thumbnails)
+        # （不可直接連接 QTimer.start，訊號的參數會被當成間隔時間）
+        self.file_table.verticalScrollBar().valueChanged.connect(self._schedule_thumbnails)
+        self.file_table.verticalScrollBar().rangeChanged.connect(self._schedule_thumbnails)
+        self.file_model.rowsMoved.connect(self._schedule_thumbnails)
+        self.file_model.rowsRemoved.connect(self._schedule_thumbnails)
+        self.file_model.rowsInserted.connect(self._schedule_thumbnails)
         
         # 啟用選取整列
-        self.file_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.file_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.file_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.file_table.customContextMenuRequested.connect(self.show_context_menu)
         
@@ -220,37 +320,77 @@ class MainWindow(QMainWindow):
             """自訂拖放事件處理"""
             if event.source() == self.file_table:
                 # 取得拖放的來源和目標行
-                source_row = self.file_table.currentRow()
+                source_rows = self._selected_rows()
                 drop_pos = event.position().toPoint() if hasattr(event.position(), 'toPoint') else event.pos()
                 target_row = self.file_table.indexAt(drop_pos).row()
                 
-                # 如果目標行無效（拖到空白處），使用最後一行
+                # 如果目標行無效（拖到空白處），移到最後；往下拖時放在目標行之後
                 if target_row < 0:
-                    target_row = len(self.file_list) - 1
+                    destination = self.file_model.rowCount()
+                elif source_rows and target_row > source_rows[-1]:
+                    destination = target_row + 1
+                else:
+                    destination = target_row
                 
-                if source_row >= 0 and target_row >= 0 and source_row != target_row:
-                    # 更新內部檔案列表
-                    moved_file = self.file_list.pop(source_row)
-                    self.file_list.insert(target_row, moved_file)
-                    
-                    # 重新整理表格
-                    self.update_file_table()
+                if source_rows:
+                    # 只移動受影響的列
+                    first, last = self.file_model.move_rows_to(source_rows, destination)
                     
                     # 選取移動後的行
-                    self.file_table.setCurrentCell(target_row, 0)
+                    self._select_rows(range(first, last + 1))
                     
-                    self.statusBar().showMessage(f"✨ 已移動檔案至位置 {target_row + 1}")
+                    self.statusBar().showMessage(f"✨ 已移動 {len(source_rows)} 個檔案至位置 {first + 1}")
                 
                 # 阻止預設行為（防止刪除項目）
                 event.setDropAction(Qt.DropAction.IgnoreAction)
                 event.accept()
+            elif event.mimeData().hasUrls():
+                # 從檔案總管拖入的檔案與資料夾，於背景展開
+                paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+                self.add_paths(paths)
+                event.acceptProposedAction()
             else:
                 event.ignore()
         
+        # 內部移動模式預設拒絕外部拖入，檔案與資料夾需另外接受
+        default_drag_enter_event = self.file_table.dragEnterEvent
+        default_drag_move_event = self.file_table.dragMoveEvent
+        
+        def custom_drag_enter_event(event):
+            """接受從外部拖入的檔案與資料夾"""
+            if event.source() is None and event.mimeData().hasUrls():
+                event.acceptProposedAction()
+            else:
+                default_drag_enter_event(event)
+        
+        def custom_drag_move_event(event):
+            """接受從外部拖入的檔案與資料夾"""
+            if event.source() is None and event.mimeData().hasUrls():
+                event.acceptProposedAction()
+            else:
+                default_drag_move_event(event)
+        
         self.file_table.dropEvent = custom_drop_event
+        self.file_table.dragEnterEvent = custom_drag_enter_event
+        self.file_table.dragMoveEvent = custom_drag_move_event
         
         main_layout.addWidget(self.file_table)
         
+        # 資料夾篩選（新增資料夾或拖入資料夾時套用）
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("資料夾篩選  包含:"))
+        self.include_input = QLineEdit()
+        self.include_input.setPlaceholderText("例如 *.jpg; scan_*（空白表示全部）")
+        self.include_input.setMinimumHeight(30)
+        filter_layout.addWidget(self.include_input)
+        
+        filter_layout.addWidget(QLabel("排除:"))
+        self.exclude_input = QLineEdit()
+        self.exclude_input.setPlaceholderText("例如 *_thumb.*; backup")
+        self.exclude_input.setMinimumHeight(30)
+        filter_layout.addWidget(self.exclude_input)
+        main_layout.addLayout(filter_layout)
+        
         # ===== 輸出設定 =====
         output_label = QLabel("⚙️ 輸出設定")
         output_label.setObjectName("output_label")
@@ -272,10 +412,10 @@ class MainWindow(QMainWindow):
         self.output_dir_input.setMinimumHeight(30)
         dir_layout.addWidget(self.output_dir_input)
         
-        browse_btn = QPushButton("瀏覽...")
-        browse_btn.setMinimumHeight(30)
-        browse_btn.clicked.connect(self.browse_output_dir)
-        dir_layout.addWidget(browse_btn)
+        self.browse_btn = QPushButton("瀏覽...")
+        self.browse_btn.setMinimumHeight(30)
+        self.browse_btn.clicked.connect(self.browse_output_dir)
+        dir_layout.addWidget(self.browse_btn)
         main_layout.addLayout(dir_layout)
         
         # ===== 圖片版面設定 =====
@@ -333,8 +473,94 @@ class MainWindow(QMainWindow):
         row2_layout.addStretch()
         layout_settings_layout.addLayout(row2_layout)
         
+        # 第三行：圖片解析度與輸出壓縮
+        row3_layout = QHBoxLayout()
+        row3_layout.addWidget(QLabel("圖片解析度:"))
+        self.image_dpi_combo = QComboBox()
+        self.image_dpi_combo.addItems(["原始", "300 dpi (印刷)", "200 dpi", "150 dpi (螢幕)"])
+        self.image_dpi_combo.setMinimumHeight(30)
+        row3_layout.addWidget(self.image_dpi_combo)
+        
+        row3_layout.addSpacing(20)
+        row3_layout.addWidget(QLabel("輸出壓縮:"))
+        self.save_profile_combo = QComboBox()
+        self.save_profile_combo.addItems(["最快", "平衡", "最小檔案"])
+        # 網頁設定檔需要線性化，目前的 MuPDF 不支援時不提供
+        if 'web' in PDFMerger.SAVE_PROFILES:
+            self.save_profile_combo.addItem("網頁")
+        self.save_profile_combo.setCurrentIndex(0)
+        self.save_profile_combo.setMinimumHeight(30)
+        row3_layout.addWidget(self.save_profile_combo)
+        
+        row3_layout.addSpacing(20)
+        # 頁面快取預設關閉：只有以相同圖片與版面反覆合併時才有幫助
+        self.page_cache_check = QCheckBox("重複使用已轉換的頁面")
+        self.page_cache_check.setToolTip("重新排序或更換輸出檔名後再次合併時，沿用磁碟快取中已排版的圖片頁面")
+        self.page_cache_check.setChecked(False)
+        row3_layout.addWidget(self.page_cache_check)
+        
+        row3_layout.addStretch()
+        layout_settings_layout.addLayout(row3_layout)
+        
         main_layout.addWidget(layout_settings_frame)
         
+        # ===== 工作佇列 =====
+        queue_header_layout = QHBoxLayout()
+        queue_label = QLabel("📋 工作佇列")
+        queue_label.setObjectName("queue_label")
+        queue_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #6f42c1; padding: 5px;")
+        queue_header_layout.addWidget(queue_label)
+        queue_header_layout.addStretch()
+        
+        queue_header_layout.addWidget(QLabel("同時執行:"))
+        self.concurrent_jobs_spin = QSpinBox()
+        self.concurrent_jobs_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.concurrent_jobs_spin.setValue(self.job_queue.max_concurrent)
+        self.concurrent_jobs_spin.setMinimumHeight(30)
+        self.concurrent_jobs_spin.valueChanged.connect(self.job_queue.set_max_concurrent)
+        queue_header_layout.addWidget(self.concurrent_jobs_spin)
+        
+        self.cancel_job_btn = QPushButton("取消")
+        self.cancel_job_btn.setMinimumHeight(30)
+        self.cancel_job_btn.clicked.connect(self.cancel_selected_jobs)
+        queue_header_layout.addWidget(self.cancel_job_btn)
+        
+        self.retry_job_btn = QPushButton("重試")
+        self.retry_job_btn.setMinimumHeight(30)
+        self.retry_job_btn.clicked.connect(self.retry_selected_jobs)
+        queue_header_layout.addWidget(self.retry_job_btn)
+        
+        self.clear_jobs_btn = QPushButton("移除已結束")
+        self.clear_jobs_btn.setMinimumHeight(30)
+        self.clear_jobs_btn.clicked.connect(self.job_queue.remove_finished)
+        queue_header_layout.addWidget(self.clear_jobs_btn)
+        main_layout.addLayout(queue_header_layout)
+        
+        self.job_table = QTableView()
+        self.job_table.setModel(self.job_queue)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.setAlternatingRowColors(True)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.job_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.job_table.setItemDelegateForColumn(JobQueue.COLUMN_PROGRESS, ProgressBarDelegate(self.job_table))
+        self.job_table.doubleClicked.connect(self._on_job_double_clicked)
+        self.job_table.setMaximumHeight(180)
+        
+        job_header = self.job_table.horizontalHeader()
+        job_header.setSectionResizeMode(JobQueue.COLUMN_ID, QHeaderView.ResizeMode.Fixed)
+        job_header.setSectionResizeMode(JobQueue.COLUMN_OUTPUT, QHeaderView.ResizeMode.Interactive)
+        job_header.setSectionResizeMode(JobQueue.COLUMN_FILES, QHeaderView.ResizeMode.Fixed)
+        job_header.setSectionResizeMode(JobQueue.COLUMN_STATUS, QHeaderView.ResizeMode.Fixed)
+        job_header.setSectionResizeMode(JobQueue.COLUMN_PROGRESS, QHeaderView.ResizeMode.Fixed)
+        job_header.setSectionResizeMode(JobQueue.COLUMN_MESSAGE, QHeaderView.ResizeMode.Stretch)
+        self.job_table.setColumnWidth(JobQueue.COLUMN_ID, 60)
+        self.job_table.setColumnWidth(JobQueue.COLUMN_OUTPUT, 200)
+        self.job_table.setColumnWidth(JobQueue.COLUMN_FILES, 70)
+        self.job_table.setColumnWidth(JobQueue.COLUMN_STATUS, 80)
+        self.job_table.setColumnWidth(JobQueue.COLUMN_PROGRESS, 120)
+        main_layout.addWidget(self.job_table)
+        
         # ===== 狀態列 =====
         self.statusBar().showMessage("✨ 就緒")
         
@@ -393,6 +619,7 @@ class MainWindow(QMainWindow):
                     background-color: #256838;
                 }
             """)
+            self.add_folder_btn.setStyleSheet(self.add_btn.styleSheet())
             
             self.clear_btn.setStyleSheet("""
                 QPushButton {
@@ -430,6 +657,8 @@ class MainWindow(QMainWindow):
                 }
             """)
             
+            self.enqueue_btn.setStyleSheet(self.merge_btn.styleSheet())
+            
             self.theme_btn.setStyleSheet("""
                 QPushButton {
                     background-color: #6c757d;
@@ -450,7 +679,7 @@ class MainWindow(QMainWindow):
             
             # 更新表格樣式
             self.file_table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     border: 2px solid #3c3c3c;
                     border-radius: 8px;
                     background-color: #2b2b2b;
@@ -459,25 +688,25 @@ class MainWindow(QMainWindow):
                     selection-background-color: #0d6efd;
                     selection-color: white;
                 }
-                QTableWidget::item {
+                QTableView::item {
                     padding: 10px;
                     border-bottom: 1px solid #3c3c3c;
                     color: #e0e0e0;
                 }
-                QTableWidget::item:hover {
+                QTableView::item:hover {
                     background-color: #3c4a57;
                 }
-                QTableWidget::item:selected {
+                QTableView::item:selected {
                     background-color: #0d6efd;
                     color: white;
                     font-weight: bold;
                 }
-                QTableWidget::item:selected:hover {
+                QTableView::item:selected:hover {
                     background-color: #0a58ca;
                     color: white;
                     font-weight: bold;
                 }
-                QTableWidget::item:focus {
+                QTableView::item:focus {
                     outline: 2px solid #4a9eff;
                 }
                 QHeaderView::section {
@@ -498,6 +727,8 @@ class MainWindow(QMainWindow):
                 }
             """)
             
+            self.job_table.setStyleSheet(self.file_table.styleSheet())
+            
             # 更新標籤樣式
             self.findChild(QLabel, "list_label").setStyleSheet(
                 "font-size: 12pt; font-weight: bold; color: #4a9eff; padding: 5px;"
@@ -510,6 +741,11 @@ class MainWindow(QMainWindow):
                 layout_label.setStyleSheet(
                     "font-size: 12pt; font-weight: bold; color: #fd8c3a; padding: 5px;"
                 )
+            queue_label = self.findChild(QLabel, "queue_label")
+            if queue_label:
+                queue_label.setStyleSheet(
+                    "font-size: 12pt; font-weight: bold; color: #a77bdb; padding: 5px;"
+                )
             
             # 更新狀態列
             self.statusBar().setStyleSheet("""
@@ -520,7 +756,7 @@ class MainWindow(QMainWindow):
                     font-weight: bold;
                 }
             """)
-            
+        
         else:
             # ===== 亮色主題 =====
             self.setStyleSheet("""
@@ -564,6 +800,7 @@ class MainWindow(QMainWindow):
                     background-color: #1e7e34;
                 }
             """)
+            self.add_folder_btn.setStyleSheet(self.add_btn.styleSheet())
             
             self.clear_btn.setStyleSheet("""
                 QPushButton {
@@ -601,6 +838,8 @@ class MainWindow(QMainWindow):
                 }
             """)
             
+            self.enqueue_btn.setStyleSheet(self.merge_btn.styleSheet())
+            
             self.theme_btn.setStyleSheet("""
                 QPushButton {
                     background-color: #6c757d;
@@ -621,7 +860,7 @@ class MainWindow(QMainWindow):
             
             # 更新表格樣式
             self.file_table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     border: 2px solid #dee2e6;
                     border-radius: 8px;
                     background-color: #ffffff;
@@ -630,25 +869,25 @@ class MainWindow(QMainWindow):
                     selection-background-color: #007bff;
                     selection-color: white;
                 }
-                QTableWidget::item {
+                QTableView::item {
                     padding: 10px;
                     border-bottom: 1px solid #e9ecef;
                     color: #212529;
                 }
-                QTableWidget::item:hover {
+                QTableView::item:hover {
                     background-color: #e7f3ff;
                 }
-                QTableWidget::item:selected {
+                QTableView::item:selected {
                     background-color: #007bff;
                     color: white;
                     font-weight: bold;
                 }
-                QTableWidget::item:selected:hover {
+                QTableView::item:selected:hover {
                     background-color: #0056b3;
                     color: white;
                     font-weight: bold;
                 }
-                QTableWidget::item:focus {
+                QTableView::item:focus {
                     outline: 2px solid #007bff;
                 }
                 QHeaderView::section {
@@ -669,6 +908,8 @@ class MainWindow(QMainWindow):
                 }
             """)
             
+            self.job_table.setStyleSheet(self.file_table.styleSheet())
+            
             # 更新標籤樣式
             self.findChild(QLabel, "list_label").setStyleSheet(
                 "font-size: 12pt; font-weight: bold; color: #007bff; padding: 5px;"
@@ -681,6 +922,11 @@ class MainWindow(QMainWindow):
                 layout_label.setStyleSheet(
                     "font-size: 12pt; font-weight: bold; color: #fd7e14; padding: 5px;"
                 )
+            queue_label = self.findChild(QLabel, "queue_label")
+            if queue_label:
+                queue_label.setStyleSheet(
+                    "font-size: 12pt; font-weight: bold; color: #6f42c1; padding: 5px;"
+                )
             
             # 更新狀態列
             self.statusBar().setStyleSheet("""
@@ -702,25 +948,111 @@ class MainWindow(QMainWindow):
         )
         
         if file_paths:
-            valid_files, invalid_files = validate_files(file_paths)
-            
-            # 加入有效檔案
-            self.file_list.extend(valid_files)
-            self.update_file_table()
-            
-            # 提示無效檔案
-            if invalid_files:
-                QMessageBox.warning(
-                    self,
-                    "部分檔案無效",
-                    f"以下檔案格式不支援，已忽略：\n\n" + "\n".join([os.path.basename(f) for f in invalid_files])
-                )
-            
-            self.statusBar().showMessage(f"已新增 {len(valid_files)} 個檔案")
+            # 檔案類型於背景判斷（網路磁碟上讀取標頭也不會阻塞介面），不支援的檔案屆時移除並提示
+            self._add_to_list(file_paths)
+            self.statusBar().showMessage(f"已新增 {len(file_paths)} 個檔案")
+    
+    def add_folder(self):
+        """新增資料夾（包含子資料夾）中所有支援的檔案"""
+        directory = QFileDialog.getExistingDirectory(self, "選擇要加入的資料夾")
+        if directory:
+            self.add_paths([directory])
+    
+    def add_paths(self, paths: List[str]):
+        """
+        於背景展開檔案與資料夾，找到的檔案分批加入列表
+        
+        Args:
+            paths: 檔案或資料夾路徑（掃描中時排隊等候）
+        """
+        if not paths:
+            return
+        self.pending_scans.append(list(paths))
+        if self.scan_thread is None:
+            self._start_next_scan()
+    
+    def _start_next_scan(self):
+        """開始下一個排隊中的掃描"""
+        if not self.pending_scans:
+            return
+        
+        worker = FolderScanWorker(
+            self.pending_scans.pop(0),
+            include=MainWindow._parse_patterns(self.include_input.text()),
+            exclude=MainWindow._parse_patterns(self.exclude_input.text())
+        )
+        thread = QThread(self)
+        worker.moveToThread(thread)
+        
+        thread.started.connect(worker.run)
+        worker.batch_found.connect(self._on_scan_batch)
+        worker.finished.connect(self._on_scan_finished)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(self._on_scan_thread_finished)
+        
+        self.scan_worker = worker
+        self.scan_thread = thread
+        self.scan_found = 0
+        self.statusBar().showMessage("正在掃描資料夾...")
+        thread.start()
+    
+    def _on_scan_batch(self, file_paths: list):
+        """加入掃描到的一批檔案"""
+        self._add_to_list(file_paths)
+        self.scan_found += len(file_paths)
+        self.statusBar().showMessage(f"正在掃描資料夾... 已找到 {self.scan_found} 個檔案")
+    
+    def _on_scan_finished(self, count: int):
+        """掃描結束"""
+        self.statusBar().showMessage(f"已新增 {count} 個檔案")
+    
+    def _on_scan_thread_finished(self):
+        """掃描執行緒結束，繼續下一個排隊中的掃描"""
+        self.scan_worker = None
+        self.scan_thread = None
+        self._start_next_scan()
+    
+    def _add_to_list(self, file_paths: List[str]):
+        """將檔案加入列表，並在背景讀取檔案資訊（含檔案類型）"""
+        self.file_model.add_files(file_paths)
+        self.file_info_prefetcher.prefetch(file_paths)
+        # 已讀取過資訊的檔案直接帶入類型，不會再收到 info_ready
+        self._remove_unsupported_files()
+    
+    def _remove_unsupported_files(self, *args):
+        """移除已判斷為不支援的檔案，累積後一次提示"""
+        removed = self.file_model.remove_unsupported()
+        if removed:
+            self.unsupported_files.extend(removed)
+            self.unsupported_timer.start()
+    
+    def _warn_unsupported_files(self):
+        """提示已移除的不支援檔案"""
+        invalid_files, self.unsupported_files = self.unsupported_files, []
+        if not invalid_files:
+            return
+        
+        # 大量檔案時只列出前幾個
+        names = [os.path.basename(f) for f in invalid_files[:20]]
+        if len(invalid_files) > len(names):
+            names.append(f"…等共 {len(invalid_files)} 個檔案")
+        self.statusBar().showMessage(f"已移除 {len(invalid_files)} 個不支援的檔案")
+        QMessageBox.warning(
+            self,
+            "部分檔案無效",
+            f"以下檔案格式不支援，已忽略：\n\n" + "\n".join(names)
+        )
+    
+    @staticmethod
+    def _parse_patterns(text: str) -> List[str]:
+        """解析以分號、逗號或空白分隔的萬用字元樣式"""
+        return [pattern for pattern in re.split(r'[;,\s]+', text) if pattern]
     
     def clear_all(self):
         """清空所有檔案"""
-        if self.file_list:
+        if self.file_model.rowCount():
             reply = QMessageBox.question(
                 self,
                 "確認",
@@ -729,35 +1061,53 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                self.file_list.clear()
-                self.update_file_table()
+                self.file_model.clear()
                 self.statusBar().showMessage("已清空列表")
     
-    def update_file_table(self):
-        """更新檔案列表顯示"""
-        self.file_table.setRowCount(len(self.file_list))
-        
-        for index, file_path in enumerate(self.file_list):
-            # 序號
-            self.file_table.setItem(index, 0, QTableWidgetItem(str(index + 1)))
-            
-            # 檔案名稱
-            file_name = os.path.basename(file_path)
-            self.file_table.setItem(index, 1, QTableWidgetItem(file_name))
-            
-            # 類型
-            file_type = get_file_type(file_path)
-            self.file_table.setItem(index, 2, QTableWidgetItem(file_type))
-            
-            # 完整路徑
-            self.file_table.setItem(index, 3, QTableWidgetItem(file_path))
+    def _visible_rows(self) -> range:
+        """目前畫面上可見的列範圍"""
+        row_count = self.file_model.rowCount()
+        if row_count == 0:
+            return range(0)
+        first = self.file_table.rowAt(0)
+        last = self.file_table.rowAt(self.file_table.viewport().height() - 1)
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = row_count - 1
+        return range(first, last + 1)
+    
+    def _schedule_thumbnails(self, *args):
+        """重新計時，捲動停止後才載入可見列的縮圖"""
+        self.thumbnail_timer.start()
+    
+    def _load_visible_thumbnails(self):
+        """為可見列載入縮圖，並取消已捲出畫面的列尚未開始的工作"""
+        self.thumbnail_loader.cancel_pending()
+        for row in self._visible_rows():
+            self.thumbnail_loader.request(self.file_model.file_at(row))
+    
+    def _selected_rows(self) -> List[int]:
+        """目前選取的列（遞增排序）"""
+        return sorted(index.row() for index in self.file_table.selectionModel().selectedRows())
+    
+    def _select_rows(self, rows):
+        """選取指定的列，並將游標移到第一列"""
+        rows = list(rows)
+        selection = QItemSelection()
+        last_column = self.file_model.columnCount() - 1
+        for row in rows:
+            selection.select(self.file_model.index(row, 0), self.file_model.index(row, last_column))
         
-        # 更新狀態列
-        self.statusBar().showMessage(f"共 {len(self.file_list)} 個檔案")
+        selection_model = self.file_table.selectionModel()
+        selection_model.select(selection, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+        if rows:
+            selection_model.setCurrentIndex(self.file_model.index(rows[0], 0), QItemSelectionModel.SelectionFlag.NoUpdate)
+            self.file_table.scrollTo(self.file_model.index(rows[0], 0))
     
     def show_context_menu(self, position):
         """顯示右鍵選單"""
-        if self.file_table.currentRow() >= 0:
+        if self._selected_rows():
             menu = QMenu()
             
             move_up_action = QAction("🔼 上移", self)
@@ -778,29 +1128,22 @@ class MainWindow(QMainWindow):
     
     def move_up(self):
         """上移選取的檔案"""
-        current_row = self.file_table.currentRow()
-        if current_row > 0:
-            self.file_list[current_row], self.file_list[current_row - 1] = \
-                self.file_list[current_row - 1], self.file_list[current_row]
-            self.update_file_table()
-            self.file_table.setCurrentCell(current_row - 1, 0)
+        moved_rows = self.file_model.move_rows_up(self._selected_rows())
+        if moved_rows is not None:
+            self._select_rows(moved_rows)
     
     def move_down(self):
         """下移選取的檔案"""
-        current_row = self.file_table.currentRow()
-        if current_row < len(self.file_list) - 1:
-            self.file_list[current_row], self.file_list[current_row + 1] = \
-                self.file_list[current_row + 1], self.file_list[current_row]
-            self.update_file_table()
-            self.file_table.setCurrentCell(current_row + 1, 0)
+        moved_rows = self.file_model.move_rows_down(self._selected_rows())
+        if moved_rows is not None:
+            self._select_rows(moved_rows)
     
     def remove_selected(self):
         """刪除選取的檔案"""
-        current_row = self.file_table.currentRow()
-        if current_row >= 0:
-            del self.file_list[current_row]
-            self.update_file_table()
-            self.statusBar().showMessage("已刪除檔案")
+        rows = self._selected_rows()
+        if rows:
+            self.file_model.remove_rows(rows)
+            self.statusBar().showMessage(f"已刪除 {len(rows)} 個檔案")
     
     def browse_output_dir(self):
         """瀏覽輸出目錄"""
@@ -810,16 +1153,82 @@ class MainWindow(QMainWindow):
     
     def merge_files(self):
         """執行合併"""
-        # 驗證檔案列表
-        if not self.file_list:
-            QMessageBox.warning(self, "無法合併", "請先新增要合併的檔案！")
+        prepared = self._prepare_merge("無法合併")
+        if prepared is None:
+            return
+        file_paths, output_path, append = prepared
+        
+        # 建立進度對話框（非阻塞，事件迴圈持續運作）
+        progress = QProgressDialog("正在合併檔案，請稍候...", "取消", 0, len(file_paths), self)
+        progress.setWindowTitle("合併中")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        self.merge_progress = progress
+        
+        # 在背景執行緒執行合併
+        worker = MergeWorker(file_paths, output_path, self._get_layout_options(), append)
+        thread = QThread(self)
+        worker.moveToThread(thread)
+        
+        thread.started.connect(worker.run)
+        worker.progress.connect(self._on_merge_progress)
+        worker.succeeded.connect(self._on_merge_succeeded)
+        worker.failed.connect(self._on_merge_failed)
+        worker.canceled.connect(self._on_merge_canceled)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(self._on_merge_thread_finished)
+        # 直接連線：worker 所在執行緒忙於合併，無法處理佇列中的訊號
+        progress.canceled.connect(worker.cancel, Qt.ConnectionType.DirectConnection)
+        
+        self.merge_worker = worker
+        self.merge_thread = thread
+        self._set_merge_controls_enabled(False)
+        self.statusBar().showMessage("正在合併...")
+        progress.show()
+        thread.start()
+    
+    def enqueue_job(self):
+        """以目前的檔案列表與設定建立工作，加入工作佇列"""
+        prepared = self._prepare_merge("無法加入佇列")
+        if prepared is None:
+            return
+        file_paths, output_path, append = prepared
+        
+        # workers 交由佇列依同時執行數分配
+        layout_options = {**self._get_layout_options(), 'workers': None}
+        try:
+            job_id = self.job_queue.submit(file_paths, output_path, layout_options, append)
+        except ValueError as e:
+            QMessageBox.warning(self, "無法加入佇列", str(e))
             return
         
+        self.statusBar().showMessage(f"📥 已加入工作 #{job_id}：{os.path.basename(output_path)}")
+    
+    def _prepare_merge(self, title: str):
+        """
+        驗證檔案列表與輸出設定，並確認是否覆蓋或附加既有的輸出檔案
+        
+        Args:
+            title: 驗證失敗時的訊息標題
+        
+        Returns:
+            (檔案列表, 輸出路徑, 是否附加)，驗證失敗或使用者取消時為 None
+        """
+        # 驗證檔案列表
+        file_paths = self.file_model.files()
+        if not file_paths:
+            QMessageBox.warning(self, title, "請先新增要合併的檔案！")
+            return None
+        
         # 驗證輸出設定
         output_name = self.output_name_input.text().strip()
         if not output_name:
-            QMessageBox.warning(self, "無法合併", "請輸入輸出檔案名稱！")
-            return
+            QMessageBox.warning(self, title, "請輸入輸出檔案名稱！")
+            return None
         
         # 確保副檔名為 .pdf
         if not output_name.lower().endswith('.pdf'):
@@ -827,65 +1236,175 @@ class MainWindow(QMainWindow):
         
         output_dir = self.output_dir_input.text().strip()
         if not output_dir or not os.path.isdir(output_dir):
-            QMessageBox.warning(self, "無法合併", "請選擇有效的輸出目錄！")
-            return
+            QMessageBox.warning(self, title, "請選擇有效的輸出目錄！")
+            return None
         
         output_path = os.path.join(output_dir, output_name)
         
-        # 確認覆蓋
+        # 佇列中的工作寫入同一個檔案時，兩者的輸出會互相覆蓋
+        if self.job_queue.active_output(output_path):
+            QMessageBox.warning(self, title, f"佇列中已有工作正在寫入此輸出檔案：\n{output_path}")
+            return None
+        
+        # 確認覆蓋或附加
+        append = False
         if os.path.exists(output_path):
-            reply = QMessageBox.question(
-                self,
-                "確認覆蓋",
-                f"檔案已存在：\n{output_path}\n\n是否要覆蓋？",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            if reply == QMessageBox.StandardButton.No:
-                return
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Icon.Question)
+            box.setWindowTitle("檔案已存在")
+            box.setText(f"檔案已存在：\n{output_path}\n\n要覆蓋檔案，還是將新頁面附加在檔案末端？")
+            overwrite_btn = box.addButton("覆蓋", QMessageBox.ButtonRole.DestructiveRole)
+            append_btn = box.addButton("附加到末端", QMessageBox.ButtonRole.AcceptRole)
+            box.addButton("取消", QMessageBox.ButtonRole.RejectRole)
+            box.exec()
+            
+            clicked = box.clickedButton()
+            if clicked is append_btn:
+                append = True
+            elif clicked is not overwrite_btn:
+                return None
         
-        # 建立進度對話框
-        progress = QProgressDialog("正在合併檔案，請稍候...", "取消", 0, len(self.file_list), self)
-        progress.setWindowTitle("合併中")
-        progress.setWindowModality(Qt.WindowModality.WindowModal)
-        progress.setMinimumDuration(0)
+        return file_paths, output_path, append
+    
+    def _on_merge_progress(self, current: int, total: int, message: str):
+        """更新合併進度"""
+        progress = self.merge_progress
+        if progress is None:
+            return
+        # 先更新文字：視窗模態的 setValue() 會處理事件，期間可能已收到結束訊號並關閉對話框
+        progress.setLabelText(f"進度: {current}/{total}\n{message}")
+        if total > 0:
+            progress.setMaximum(total)
+        progress.setValue(current)
+    
+    def _on_merge_succeeded(self, output_path: str):
+        """合併成功"""
+        self._close_merge_progress()
         
-        def progress_callback(current, total, message):
-            """進度回呼函數"""
-            progress.setValue(current)
-            progress.setLabelText(f"進度: {current}/{total}\n{message}")
-            if progress.wasCanceled():
-                raise Exception("使用者取消操作")
+        # 成功提示
+        reply = QMessageBox.question(
+            self,
+            "合併完成",
+            f"檔案已成功合併！\n\n輸出位置：\n{output_path}\n\n是否要開啟檔案所在資料夾？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
         
-        # 執行合併
-        try:
-            # 取得圖片版面設定
-            layout_options = self._get_layout_options()
-            
-            FileHandler.merge_files(
-                self.file_list, 
-                output_path, 
-                progress_callback,
-                layout_options=layout_options
-            )
-            progress.close()
-            
-            # 成功提示
+        if reply == QMessageBox.StandardButton.Yes:
+            os.startfile(os.path.dirname(output_path))
+        
+        self.statusBar().showMessage("合併完成！")
+    
+    def _on_merge_failed(self, error: str):
+        """合併失敗"""
+        self._close_merge_progress()
+        QMessageBox.critical(self, "合併失敗", f"合併過程發生錯誤：\n\n{error}")
+        self.statusBar().showMessage("合併失敗")
+    
+    def _on_merge_canceled(self):
+        """使用者取消合併"""
+        self._close_merge_progress()
+        self.statusBar().showMessage("已取消合併")
+    
+    def _on_merge_thread_finished(self):
+        """背景執行緒結束，恢復介面"""
+        self.merge_worker = None
+        self.merge_thread = None
+        self._set_merge_controls_enabled(True)
+    
+    def _close_merge_progress(self):
+        """關閉進度對話框"""
+        if self.merge_progress is not None:
+            self.merge_progress.close()
+            self.merge_progress.deleteLater()
+            self.merge_progress = None
+    
+    def _on_job_finished(self, job_id: int):
+        """佇列中的工作結束，於狀態列顯示結果（不彈出對話框，避免打斷後續操作）"""
+        for row in range(self.job_queue.rowCount()):
+            job = self.job_queue.job_at(row)
+            if job.job_id != job_id:
+                continue
+            name = os.path.basename(job.output_path)
+            if job.status == STATUS_DONE:
+                self.statusBar().showMessage(f"✅ 工作 #{job_id} 完成：{name}（{job.pages} 頁）")
+            elif job.status == STATUS_FAILED:
+                self.statusBar().showMessage(f"❌ 工作 #{job_id} 失敗：{job.error}")
+            else:
+                self.statusBar().showMessage(f"工作 #{job_id} 已取消")
+            return
+    
+    def _on_job_counts_changed(self, queued: int, running: int):
+        """有工作時在視窗標題顯示佇列狀態"""
+        title = "MergePDF - 檔案合併工具"
+        if queued or running:
+            title += f"（執行中 {running}，等待中 {queued}）"
+        self.setWindowTitle(title)
+    
+    def _selected_job_rows(self) -> List[int]:
+        """取得工作佇列中選取的列"""
+        return sorted({index.row() for index in self.job_table.selectionModel().selectedRows()})
+    
+    def cancel_selected_jobs(self):
+        """取消選取的工作"""
+        for row in self._selected_job_rows():
+            self.job_queue.cancel(row)
+    
+    def retry_selected_jobs(self):
+        """重新排入選取的失敗或已取消工作"""
+        for row in self._selected_job_rows():
+            try:
+                self.job_queue.retry(row)
+            except ValueError as e:
+                QMessageBox.warning(self, "無法重試", str(e))
+    
+    def _on_job_double_clicked(self, index):
+        """雙擊已完成的工作時開啟輸出檔案所在資料夾"""
+        job = self.job_queue.job_at(index.row())
+        if job.status == STATUS_DONE:
+            os.startfile(os.path.dirname(job.output_path))
+    
+    def _set_merge_controls_enabled(self, enabled: bool):
+        """合併期間停用會影響合併內容的控制項"""
+        for widget in (
+            self.add_btn, self.add_folder_btn, self.clear_btn, self.merge_btn, self.enqueue_btn, self.file_table,
+            self.output_name_input, self.output_dir_input, self.browse_btn,
+            self.page_size_combo, self.images_per_page_combo,
+            self.margin_spin, self.spacing_spin, self.image_dpi_combo,
+            self.save_profile_combo, self.page_cache_check
+        ):
+            widget.setEnabled(enabled)
+    
+    def resizeEvent(self, event):
+        """視窗大小改變時，可見的列可能增加"""
+        super().resizeEvent(event)
+        self.thumbnail_timer.start()
+    
+    def closeEvent(self, event):
+        """關閉視窗時取消進行中的合併並等待背景執行緒結束"""
+        queued, running = self.job_queue.counts()
+        if queued or running:
             reply = QMessageBox.question(
                 self,
-                "合併完成",
-                f"檔案已成功合併！\n\n輸出位置：\n{output_path}\n\n是否要開啟檔案所在資料夾？",
+                "工作佇列",
+                f"仍有 {running} 個工作執行中、{queued} 個工作等待中，關閉後將全部取消。\n\n確定要關閉嗎？",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
-            
-            if reply == QMessageBox.StandardButton.Yes:
-                os.startfile(output_dir)
-            
-            self.statusBar().showMessage("合併完成！")
-            
-        except Exception as e:
-            progress.close()
-            QMessageBox.critical(self, "合併失敗", f"合併過程發生錯誤：\n\n{str(e)}")
-            self.statusBar().showMessage("合併失敗")
+            if reply != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+        self.job_queue.shutdown()
+        if self.merge_thread is not None:
+            self.merge_worker.cancel()
+            self.merge_thread.quit()
+            self.merge_thread.wait()
+        if self.scan_thread is not None:
+            self.pending_scans.clear()
+            self.scan_worker.cancel()
+            self.scan_thread.quit()
+            self.scan_thread.wait()
+        self.thumbnail_loader.shutdown()
+        self.file_info_prefetcher.shutdown()
+        super().closeEvent(event)
     
     def _get_layout_options(self) -> dict:
         """取得圖片版面設定選項"""
@@ -906,11 +1425,31 @@ class MainWindow(QMainWindow):
             4: (3, 3)    # 9張
         }
         
+        # 輸出壓縮設定檔映射
+        save_profiles = {
+            0: 'fast',
+            1: 'balanced',
+            2: 'smallest',
+            3: 'web'
+        }
+        
+        # 圖片降採樣解析度映射 (dpi)
+        image_dpis = {
+            0: None,  # 原始
+            1: 300,
+            2: 200,
+            3: 150
+        }
+        
         return {
             'page_size': page_sizes[self.page_size_combo.currentIndex()],
             'images_per_page': images_per_page[self.images_per_page_combo.currentIndex()],
             'margin_mm': self.margin_spin.value(),
-            'spacing_mm': self.spacing_spin.value()
+            'spacing_mm': self.spacing_spin.value(),
+            'workers': None,  # 使用所有 CPU 核心平行轉換圖片
+            'target_dpi': image_dpis[self.image_dpi_combo.currentIndex()],
+            'save_profile': save_profiles[self.save_profile_combo.currentIndex()],
+            'page_cache_dir': PageCache.default_dir() if self.page_cache_check.isChecked() else None
         }
 
 
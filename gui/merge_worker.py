@@ -0,0 +1,117 @@
+"""
+合併工作執行緒
+在子行程執行 FileHandler.merge_files，背景執行緒轉送子行程的事件，並以 Qt 訊號回報進度與結果
+
+PyMuPDF 並非執行緒安全；合併在獨立行程中進行，不需與縮圖、檔案資訊等背景工作搶 PyMuPDF 鎖
+"""
+
+import multiprocessing
+import queue
+from PySide6.QtCore import QObject, Signal, Slot
+from typing import List
+
+
+class MergeCanceled(Exception):
+    """使用者取消合併"""
+
+
+class MergeWorker(QObject):
+    """合併工作物件，移至 QThread 後由 run() 執行"""
+    
+    # 進度 (目前, 總數, 訊息)
+    progress = Signal(int, int, str)
+    # 合併成功，參數為輸出路徑
+    succeeded = Signal(str)
+    # 合併失敗，參數為錯誤訊息
+    failed = Signal(str)
+    # 使用者取消
+    canceled = Signal()
+    # 工作結束（無論成功、失敗或取消）
+    finished = Signal()
+    
+    # 等待子行程事件的逾時 (秒)，逾時後檢查行程是否仍在執行
+    POLL_INTERVAL = 0.1
+    
+    def __init__(self, file_paths: List, output_path: str, layout_options: dict, append: bool = False):
+        """
+        初始化合併工作
+        
+        Args:
+            file_paths: 要合併的檔案列表，項目為路徑或 (路徑, 頁面範圍)（會複製一份，避免與介面共用）
+            output_path: 輸出 PDF 檔案路徑
+            layout_options: 圖片版面選項
+            append: 是否附加在既有輸出檔案的末端
+        """
+        super().__init__()
+        self.file_paths = list(file_paths)
+        self.output_path = output_path
+        self.layout_options = dict(layout_options)
+        self.append = append
+        self._cancel_requested = False
+        
+        # 與工作佇列相同使用 spawn 行程，不繼承 GUI 執行緒與 Qt 狀態
+        self._context = multiprocessing.get_context('spawn')
+        self._cancel_event = self._context.Event()
+    
+    @Slot()
+    def run(self):
+        """啟動合併子行程並轉送其事件（於背景執行緒）"""
+        # 延遲匯入：job_queue 的子行程函數會匯入本模組的 MergeCanceled
+        from gui.job_queue import _run_job
+        
+        events = self._context.Queue()
+        # 非 daemon 行程：合併內的圖片轉換還會再建立行程池
+        process = self._context.Process(
+            target=_run_job,
+            args=(0, 1, self.file_paths, self.output_path, self.layout_options, self.append,
+                  events, self._cancel_event),
+            name="MergePDF merge"
+        )
+        try:
+            process.start()
+            kind, payload = self._relay_events(process, events)
+            if kind == 'done':
+                self.succeeded.emit(self.output_path)
+            elif kind == 'canceled':
+                self.canceled.emit()
+            else:
+                self.failed.emit(payload)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            if process.pid is not None:
+                process.join()
+            events.close()
+            events.join_thread()
+            self.finished.emit()
+    
+    def cancel(self):
+        """要求取消合併，子行程於下一次進度回報時中止"""
+        self._cancel_requested = True
+        self._cancel_event.set()
+    
+    def _relay_events(self, process, events):
+        """
+        轉送子行程的進度事件，直到收到結果
+        
+        Returns:
+            Tuple[str, object]: 結果種類 ('done'、'failed'、'canceled') 與內容
+        """
+        while True:
+            try:
+                _, _, kind, payload = events.get(timeout=MergeWorker.POLL_INTERVAL)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                # 行程已結束：再讀一次剩餘事件，仍沒有結果表示行程異常結束
+                try:
+                    _, _, kind, payload = events.get(timeout=MergeWorker.POLL_INTERVAL)
+                except queue.Empty:
+                    if self._cancel_requested:
+                        return 'canceled', None
+                    return 'failed', f"合併行程異常結束 (代碼 {process.exitcode})"
+            
+            if kind == 'progress':
+                self.progress.emit(*payload)
+            else:
+                return kind, payload
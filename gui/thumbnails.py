@@ -0,0 +1,197 @@
+"""
+檔案縮圖載入器
+以執行緒池在背景產生 PDF 第一頁與圖片的縮圖，結果保存在記憶體 LRU 快取，
+並可選擇寫入磁碟快取；只有畫面上可見的列才會提出請求
+"""
+
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+import fitz  # PyMuPDF
+from PIL import Image
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPixmap
+from core.image_probe import ImageProbe
+from core.page_cache import PageCache
+from utils.validators import is_pdf_file
+
+# PyMuPDF 不支援多執行緒同時操作，背景執行緒中的 PDF 讀取（縮圖、檔案資訊）依序進行；
+# 合併與合併工作佇列的工作在子行程執行，不需要此鎖
+FITZ_LOCK = threading.Lock()
+
+
+def render_thumbnail(file_path: str, size: int) -> bytes:
+    """
+    產生縮圖（不使用 Qt，可在任何執行緒執行）
+    
+    PDF 以 PyMuPDF 繪製第一頁；圖片以 Pillow 的 draft 模式縮小解碼，
+    不解碼完整解析度。與合併結果相同，不套用 EXIF 方向。
+    
+    Args:
+        file_path: 檔案路徑
+        size: 縮圖的最大邊長（像素）
+    
+    Returns:
+        bytes: PNG 格式的縮圖資料
+    """
+    if is_pdf_file(file_path):
+        with FITZ_LOCK:
+            with fitz.open(file_path) as doc:
+                page = doc[0]
+                scale = size / max(page.rect.width, page.rect.height)
+                pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+                return pixmap.tobytes('png')
+    
+    with Image.open(file_path) as img:
+        img.draft('RGB', (size, size))
+        if img.mode not in ('RGB', 'RGBA', 'L'):
+            img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+        img.thumbnail((size, size))
+        output = io.BytesIO()
+        img.save(output, format='PNG')
+        return output.getvalue()
+
+
+class _ThumbnailSignals(QObject):
+    """縮圖工作的訊號（QRunnable 本身無法發出訊號）"""
+    
+    # 完成 (檔案路徑, 縮圖)；失敗時縮圖為空的 QImage
+    rendered = Signal(str, QImage)
+
+
+class _ThumbnailTask(QRunnable):
+    """在執行緒池中產生單一檔案的縮圖"""
+    
+    def __init__(self, loader: 'ThumbnailLoader', file_path: str):
+        super().__init__()
+        self.loader = loader
+        self.file_path = file_path
+    
+    def run(self):
+        """產生縮圖：先查詢磁碟快取，未命中時繪製並寫回"""
+        image = QImage()
+        try:
+            self.loader._mark_started(self.file_path)
+            disk_cache = self.loader.disk_cache
+            key = self.loader.cache_key(self.file_path) if disk_cache else None
+            
+            data = disk_cache.get(key) if disk_cache else None
+            if data is None:
+                data = render_thumbnail(self.file_path, self.loader.size)
+                if disk_cache:
+                    disk_cache.put(key, data)
+            
+            # QImage 可在背景執行緒建立，QPixmap 則須在 GUI 執行緒轉換
+            image = QImage.fromData(data, 'PNG')
+        except Exception:
+            # 無法產生縮圖的檔案（損毀、已刪除）顯示為空白
+            pass
+        self.loader._signals.rendered.emit(self.file_path, image)
+
+
+class ThumbnailLoader(QObject):
+    """縮圖載入器：記憶體 LRU 快取 + 可選的磁碟快取 + 背景執行緒池"""
+    
+    # 縮圖已可取得，參數為檔案路徑
+    thumbnail_ready = Signal(str)
+    
+    def __init__(
+        self,
+        size: int = 64,
+        max_entries: int = 1000,
+        disk_cache_dir: Optional[str] = None,
+        disk_cache_max_mb: float = 256,
+        max_threads: Optional[int] = None,
+        parent: Optional[QObject] = None
+    ):
+        """
+        初始化縮圖載入器
+        
+        Args:
+            size: 縮圖的最大邊長（像素）
+            max_entries: 記憶體快取的縮圖數量上限
+            disk_cache_dir: 磁碟快取目錄 (可選)，None 表示只使用記憶體快取
+            disk_cache_max_mb: 磁碟快取的容量上限 (MB)
+            max_threads: 背景執行緒數，None 表示依 CPU 核心數決定（最多 4）
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.size = size
+        self.max_entries = max_entries
+        self.disk_cache = None
+        if disk_cache_dir:
+            self.disk_cache = PageCache(disk_cache_dir, int(disk_cache_max_mb * 1024 * 1024), suffix='.png')
+        
+        self._pixmaps = OrderedDict()  # {檔案路徑: QPixmap}，僅在 GUI 執行緒存取
+        self._pending = set()  # 已排入佇列或執行中的檔案
+        self._started = set()  # 執行中的檔案（背景執行緒寫入，以鎖保護）
+        self._lock = threading.Lock()
+        
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads or min(4, QThreadPool.globalInstance().maxThreadCount()))
+        
+        self._signals = _ThumbnailSignals()
+        self._signals.rendered.connect(self._on_rendered)
+    
+    def cache_key(self, file_path: str) -> str:
+        """磁碟快取鍵：檔案識別（路徑、大小、修改時間）與縮圖大小"""
+        data = [ImageProbe.file_identity(file_path), self.size]
+        return hashlib.sha256(json.dumps(data).encode('utf-8')).hexdigest()
+    
+    def thumbnail(self, file_path: str) -> Optional[QPixmap]:
+        """
+        取得已快取的縮圖（不會產生新的縮圖）
+        
+        Returns:
+            Optional[QPixmap]: 縮圖；尚未載入時回傳 None
+        """
+        pixmap = self._pixmaps.get(file_path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(file_path)
+        return pixmap
+    
+    def request(self, file_path: str) -> Optional[QPixmap]:
+        """
+        取得縮圖；尚未載入時排入背景工作，完成後發出 thumbnail_ready
+        
+        Returns:
+            Optional[QPixmap]: 已快取的縮圖，或 None（載入中）
+        """
+        pixmap = self.thumbnail(file_path)
+        if pixmap is None and file_path not in self._pending:
+            self._pending.add(file_path)
+            self._pool.start(_ThumbnailTask(self, file_path))
+        return pixmap
+    
+    def cancel_pending(self) -> None:
+        """取消尚未開始的工作（例如捲動後已不在畫面上的列）"""
+        self._pool.clear()
+        with self._lock:
+            self._pending = set(self._started)
+    
+    def shutdown(self) -> None:
+        """取消尚未開始的工作並等待執行中的工作結束"""
+        self._pool.clear()
+        self._pool.waitForDone()
+    
+    def _mark_started(self, file_path: str) -> None:
+        """背景執行緒開始處理時記錄（cancel_pending 不會移除執行中的工作）"""
+        with self._lock:
+            self._started.add(file_path)
+    
+    def _on_rendered(self, file_path: str, image: QImage):
+        """背景工作完成（於 GUI 執行緒）"""
+        with self._lock:
+            self._started.discard(file_path)
+        self._pending.discard(file_path)
+        
+        # 失敗的檔案以空白縮圖快取，避免重複嘗試
+        self._pixmaps[file_path] = QPixmap.fromImage(image)
+        self._pixmaps.move_to_end(file_path)
+        if len(self._pixmaps) > self.max_entries:
+            self._pixmaps.popitem(last=False)
+        
+        self.thumbnail_ready.emit(file_path)
@@ -1,15 +1,37 @@
 """
 MergePDF - 多格式檔案合併為 PDF 工具
 主程式進入點 - 使用 PySide6
+
+帶有命令列子命令時（例如 `python main.py merge ...`）改以命令列模式執行，不載入 PySide6
 """
 
+import time
+
+# 記錄啟動時間，命令列報告中的 startup_seconds 由此起算
+_START_TIME = time.perf_counter()
+
 import sys
-from PySide6.QtWidgets import QApplication, QMessageBox
-from gui.main_window import create_app
+import multiprocessing
 
 
 def main():
     """主函數"""
+    # 只匯入子命令名稱，啟動 GUI 時不載入命令列與核心模組
+    from cli.commands import COMMANDS
+    
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        from cli.main import main as cli_main
+        sys.exit(cli_main(sys.argv[1:], start_time=_START_TIME))
+    
+    run_gui()
+
+
+def run_gui():
+    """啟動 GUI"""
+    # 延遲載入 Qt，命令列模式不需要
+    from PySide6.QtWidgets import QApplication, QMessageBox
+    from gui.main_window import create_app
+    
     try:
         # 建立 Qt 應用程式
         app = QApplication(sys.argv)
@@ -25,7 +47,7 @@ def main():
         
         # 執行應用程式主迴圈
         sys.exit(app.exec())
-        
+    
     except Exception as e:
         # 錯誤處理
         import traceback
@@ -45,4 +67,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包為執行檔後，行程池的子行程需要此呼叫
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,21 @@
+"""
+MergePDF 命令列進入點
+用法: python -m mergepdf merge --manifest job.json
+
+不會載入 PySide6，適合伺服器端的批次工作
+"""
+
+import time
+
+# 記錄啟動時間，報告中的 startup_seconds 由此起算
+_START_TIME = time.perf_counter()
+
+import multiprocessing
+import sys
+from cli.main import main
+
+
+if __name__ == "__main__":
+    # 打包為執行檔後，行程池的子行程需要此呼叫
+    multiprocessing.freeze_support()
+    sys.exit(main(start_time=_START_TIME))
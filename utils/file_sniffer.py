@@ -0,0 +1,128 @@
+"""
+檔案內容偵測工具
+讀取檔案開頭的一小段標頭，依 magic bytes 判斷 JPEG、PNG、PDF，
+結果以檔案識別 (路徑, 大小, 修改時間) 快取，每個檔案最多讀取一次
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+_JPEG_MAGIC = b'\xff\xd8\xff'
+_PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+_PDF_MAGIC = b'%PDF-'
+
+# PDF 標頭前允許的垃圾位元組上限（與 Acrobat 的容許範圍相同）
+_PDF_SEARCH_LIMIT = 1024
+
+
+class FileSniffer:
+    """檔案內容偵測器，結果依檔案識別快取並於各模組間共用"""
+    
+    # 一次讀取的標頭大小；大多數 JPEG 的 SOF 與 EXIF 方向都位於此範圍內
+    HEADER_SIZE = 32 * 1024
+    
+    # 快取項目上限（超過時淘汰最久未使用的項目）
+    CACHE_MAX_ENTRIES = 50000
+    
+    _kinds = OrderedDict()
+    _lock = threading.Lock()
+    
+    # 標頭讀取後的處理函數 (路徑, 檔案識別, 類型, 標頭)，例如圖片尺寸探測，
+    # 讓同一份標頭同時用於分類與解析，不必重複讀取檔案
+    _header_consumers: List[Callable[[str, Tuple[str, int, int], Optional[str], bytes], None]] = []
+    
+    @staticmethod
+    def file_identity(file_path: str) -> Tuple[str, int, int]:
+        """
+        取得檔案識別，檔案內容變更時識別也會改變
+        
+        Args:
+            file_path: 檔案路徑
+        
+        Returns:
+            Tuple[str, int, int]: (絕對路徑, 檔案大小, 修改時間 ns)
+        """
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    
+    @staticmethod
+    def detect(header: bytes) -> Optional[str]:
+        """
+        依標頭內容判斷檔案類型
+        
+        Args:
+            header: 檔案開頭的位元組資料
+        
+        Returns:
+            Optional[str]: 'JPEG'、'PNG'、'PDF'，無法辨識時回傳 None
+        """
+        if header.startswith(_JPEG_MAGIC):
+            return 'JPEG'
+        if header.startswith(_PNG_MAGIC):
+            return 'PNG'
+        if _PDF_MAGIC in header[:_PDF_SEARCH_LIMIT]:
+            return 'PDF'
+        return None
+    
+    @staticmethod
+    def read_header(file_path: str) -> bytes:
+        """讀取檔案開頭的標頭（最多 HEADER_SIZE 位元組）"""
+        with open(file_path, 'rb') as f:
+            return f.read(FileSniffer.HEADER_SIZE)
+    
+    @staticmethod
+    def sniff(file_path: str) -> Optional[str]:
+        """
+        判斷檔案類型（結果會被快取）
+        
+        Args:
+            file_path: 檔案路徑
+        
+        Returns:
+            Optional[str]: 'JPEG'、'PNG'、'PDF'，無法辨識時回傳 None
+        
+        Raises:
+            OSError: 檔案不存在或無法讀取
+        """
+        identity = FileSniffer.file_identity(file_path)
+        
+        with FileSniffer._lock:
+            if identity in FileSniffer._kinds:
+                FileSniffer._kinds.move_to_end(identity)
+                return FileSniffer._kinds[identity]
+        
+        header = FileSniffer.read_header(file_path)
+        kind = FileSniffer.detect(header)
+        FileSniffer.remember(identity, kind)
+        
+        for consumer in FileSniffer._header_consumers:
+            try:
+                consumer(file_path, identity, kind, header)
+            except Exception:
+                # 附帶的解析失敗不影響分類結果
+                pass
+        
+        return kind
+    
+    @staticmethod
+    def remember(identity: Tuple[str, int, int], kind: Optional[str]) -> None:
+        """記錄已知的檔案類型（其他模組讀取標頭時一併提供，避免再次讀取）"""
+        with FileSniffer._lock:
+            FileSniffer._kinds[identity] = kind
+            FileSniffer._kinds.move_to_end(identity)
+            if len(FileSniffer._kinds) > FileSniffer.CACHE_MAX_ENTRIES:
+                FileSniffer._kinds.popitem(last=False)
+    
+    @staticmethod
+    def add_header_consumer(consumer: Callable[[str, Tuple[str, int, int], Optional[str], bytes], None]) -> None:
+        """註冊標頭處理函數，sniff() 讀取標頭後會以同一份資料呼叫"""
+        if consumer not in FileSniffer._header_consumers:
+            FileSniffer._header_consumers.append(consumer)
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """清除快取"""
+        with FileSniffer._lock:
+            FileSniffer._kinds.clear()
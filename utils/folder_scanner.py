@@ -0,0 +1,96 @@
+"""
+資料夾掃描工具
+以 os.scandir 逐層走訪資料夾，使用 DirEntry 快取的檔案類型資訊，
+以產生器邊掃描邊回傳支援的檔案（依自然排序）
+"""
+
+import fnmatch
+import os
+import re
+from typing import Iterable, Iterator, List, Optional
+from utils.validators import SUPPORTED_FORMATS
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def natural_sort_key(name: str) -> list:
+    """
+    自然排序鍵：數字部分依數值比較（img2 排在 img10 之前）
+    
+    Args:
+        name: 檔案名稱或路徑
+    
+    Returns:
+        list: 排序鍵
+    """
+    return [int(part) if part.isdigit() else part.lower() for part in _DIGITS.split(name)]
+
+
+def _matches(name: str, patterns: List[str]) -> bool:
+    """檔名是否符合任一萬用字元樣式（不分大小寫）"""
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def scan_paths(
+    paths: Iterable[str],
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    recursive: bool = True
+) -> Iterator[str]:
+    """
+    展開檔案與資料夾，逐一產生支援格式的檔案路徑
+    
+    指定的檔案依原順序產生；資料夾內先產生檔案再進入子資料夾，
+    同一層的項目依自然排序。只讀取目錄項目，不會開啟檔案。
+    
+    Args:
+        paths: 檔案或資料夾路徑
+        include: 只納入符合任一樣式的檔名 (可選)，例如 ['*.jpg', 'scan_*']
+        exclude: 排除符合任一樣式的檔名或資料夾名稱 (可選)
+        recursive: 是否走訪子資料夾
+    
+    Yields:
+        str: 支援格式的檔案路徑
+    """
+    include = [pattern.lower() for pattern in include or []]
+    exclude = [pattern.lower() for pattern in exclude or []]
+    
+    def accept(name: str) -> bool:
+        if os.path.splitext(name)[1].lower() not in SUPPORTED_FORMATS:
+            return False
+        if include and not _matches(name, include):
+            return False
+        return not (exclude and _matches(name, exclude))
+    
+    for path in paths:
+        if not os.path.isdir(path):
+            if os.path.isfile(path) and accept(os.path.basename(path)):
+                yield path
+            continue
+        
+        # 以堆疊走訪，避免深層資料夾造成遞迴過深
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: natural_sort_key(entry.name))
+            except OSError:
+                # 無權限或已刪除的資料夾略過
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                try:
+                    # DirEntry 的類型資訊來自目錄項目本身，不需額外的 stat 呼叫
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not (exclude and _matches(entry.name, exclude)):
+                            subdirs.append(entry.path)
+                    elif entry.is_file() and accept(entry.name):
+                        yield entry.path
+                except OSError:
+                    continue
+            
+            # 反向推入堆疊，使子資料夾依自然排序處理
+            stack.extend(reversed(subdirs))
@@ -0,0 +1,120 @@
+"""
+頁面範圍工具
+解析「1-5,9,20-」格式的頁面範圍（頁碼從 1 開始）
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# 單一項目：N、A-B、A-、-B
+_ITEM = re.compile(r'^\s*(\d*)\s*(-?)\s*(\d*)\s*$')
+
+
+def _parse_items(spec: str) -> List[Tuple[Optional[int], Optional[int]]]:
+    """將範圍字串拆成 (起, 迄) 項目（1 起算，None 表示開放端）"""
+    items = []
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        match = _ITEM.match(part)
+        if not match or not (match.group(1) or match.group(3)):
+            raise ValueError(f"頁面範圍格式錯誤: {part.strip()}")
+        
+        start, dash, end = match.groups()
+        start = int(start) if start else None
+        end = int(end) if end else None
+        if not dash:
+            end = start
+        if start == 0 or end == 0:
+            raise ValueError(f"頁碼從 1 開始: {part.strip()}")
+        items.append((start, end))
+    return items
+
+
+def validate_page_spec(spec: Optional[str]) -> None:
+    """
+    檢查頁面範圍的格式（不需知道文件頁數）
+    
+    Args:
+        spec: 頁面範圍，None 或空字串表示全部頁面
+    
+    Raises:
+        ValueError: 格式錯誤
+    """
+    if spec:
+        _parse_items(spec)
+
+
+def parse_page_ranges(spec: Optional[str], page_count: int) -> List[Tuple[int, int]]:
+    """
+    將頁面範圍轉為 insert_pdf 使用的 (from_page, to_page)（0 起算，含兩端）
+    
+    範例（10 頁的文件）：
+        "1-5,9,8-"  → [(0, 4), (8, 8), (7, 9)]
+        "-3"        → [(0, 2)]
+        "5-3"       → [(4, 2)]（倒序）
+    
+    Args:
+        spec: 頁面範圍，None 或空字串表示全部頁面
+        page_count: 文件頁數
+    
+    Returns:
+        List[Tuple[int, int]]: 頁面區段，依指定順序排列
+    
+    Raises:
+        ValueError: 格式錯誤或頁碼超出文件頁數
+    """
+    if not spec or not spec.strip():
+        return [(0, page_count - 1)]
+    
+    ranges = []
+    for start, end in _parse_items(spec):
+        start = 1 if start is None else start
+        end = page_count if end is None else end
+        if start > page_count or end > page_count:
+            raise ValueError(f"頁碼超出範圍 (共 {page_count} 頁): {spec}")
+        ranges.append((start - 1, end - 1))
+    
+    if not ranges:
+        raise ValueError(f"頁面範圍未包含任何頁面: {spec}")
+    return ranges
+
+
+def expand_page_ranges(spec: Optional[str], page_count: int) -> List[int]:
+    """
+    將頁面範圍展開為頁碼列表（1 起算，依指定順序）
+    
+    Args:
+        spec: 頁面範圍，None 或空字串表示全部頁面
+        page_count: 文件頁數
+    
+    Returns:
+        List[int]: 頁碼列表
+    """
+    pages = []
+    for from_page, to_page in parse_page_ranges(spec, page_count):
+        step = 1 if from_page <= to_page else -1
+        pages.extend(page + 1 for page in range(from_page, to_page + step, step))
+    return pages
+
+
+def format_page_ranges(pages: List[int]) -> str:
+    """
+    將頁碼列表（1 起算）轉為頁面範圍字串，連續遞增或遞減的頁碼合併為區段
+    
+    範例：
+        [1, 2, 3, 9, 5, 4] → "1-3,9,5-4"
+    """
+    parts = []
+    index = 0
+    while index < len(pages):
+        start = end = pages[index]
+        step = 0
+        index += 1
+        if index < len(pages) and abs(pages[index] - start) == 1:
+            step = pages[index] - start
+            while index < len(pages) and pages[index] == end + step:
+                end = pages[index]
+                index += 1
+        parts.append(str(start) if start == end else f"{start}-{end}")
+    return ','.join(parts)
@@ -0,0 +1,71 @@
+"""
+行程記憶體查詢工具
+不依賴第三方套件，取得目前行程的常駐記憶體 (RSS) 與峰值
+"""
+
+import os
+import sys
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+    
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+    
+    def _memory_counters() -> _ProcessMemoryCounters:
+        """呼叫 GetProcessMemoryInfo 取得記憶體計數"""
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(),
+            ctypes.byref(counters),
+            counters.cb
+        )
+        return counters
+else:
+    import resource
+
+
+def current_rss_bytes() -> int:
+    """
+    取得目前行程的常駐記憶體
+    
+    Returns:
+        int: RSS (bytes)；無法取得時回傳峰值
+    """
+    if sys.platform == 'win32':
+        return _memory_counters().WorkingSetSize
+    
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """
+    取得目前行程啟動以來的常駐記憶體峰值
+    
+    Returns:
+        int: 峰值 RSS (bytes)
+    """
+    if sys.platform == 'win32':
+        return _memory_counters().PeakWorkingSetSize
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 為單位，macOS 以 bytes 為單位
+    return peak if sys.platform == 'darwin' else peak * 1024
@@ -1,16 +1,53 @@
 """
 檔案驗證工具
 用於檢查檔案格式和有效性
+
+檔案類型依內容 (magic bytes) 判斷，副檔名錯誤的檔案也能正確分類；
+檔案無法讀取時才退回以副檔名判斷
 """
 
 import os
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from utils.file_sniffer import FileSniffer
 
-# 支援的檔案格式
+# 支援的檔案格式（副檔名，用於檔案對話框與資料夾掃描的初步篩選）
 SUPPORTED_IMAGE_FORMATS = {'.jpg', '.jpeg', '.png'}
 SUPPORTED_PDF_FORMAT = {'.pdf'}
 SUPPORTED_FORMATS = SUPPORTED_IMAGE_FORMATS | SUPPORTED_PDF_FORMAT
 
+# 依內容判斷的檔案類型
+IMAGE_KINDS = {'JPEG', 'PNG'}
+PDF_KIND = 'PDF'
+
+
+def _extension_kind(file_path: str) -> Optional[str]:
+    """依副檔名推測的檔案類型"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in SUPPORTED_PDF_FORMAT:
+        return PDF_KIND
+    if ext == '.png':
+        return 'PNG'
+    if ext in SUPPORTED_IMAGE_FORMATS:
+        return 'JPEG'
+    return None
+
+
+def detect_file_kind(file_path: str) -> Optional[str]:
+    """
+    判斷檔案類型（依內容，結果依檔案識別快取）
+    
+    Args:
+        file_path: 檔案路徑
+        
+    Returns:
+        Optional[str]: 'JPEG'、'PNG'、'PDF'，不支援的內容回傳 None；
+            檔案無法讀取時依副檔名推測
+    """
+    try:
+        return FileSniffer.sniff(file_path)
+    except OSError:
+        return _extension_kind(file_path)
+
 
 def is_supported_file(file_path: str) -> bool:
     """
@@ -22,14 +59,14 @@ def is_supported_file(file_path: str) -> bool:
     Returns:
         bool: 是否為支援的格式
     """
-    if not os.path.exists(file_path):
-        return False
-    
     if not os.path.isfile(file_path):
         return False
     
-    _, ext = os.path.splitext(file_path)
-    return ext.lower() in SUPPORTED_FORMATS
+    # 依內容判斷，副檔名錯誤的檔案也能接受，內容不符的檔案則在加入時就排除
+    try:
+        return FileSniffer.sniff(file_path) is not None
+    except OSError:
+        return False
 
 
 def is_image_file(file_path: str) -> bool:
@@ -42,8 +79,7 @@ def is_image_file(file_path: str) -> bool:
     Returns:
         bool: 是否為圖片格式
     """
-    _, ext = os.path.splitext(file_path)
-    return ext.lower() in SUPPORTED_IMAGE_FORMATS
+    return detect_file_kind(file_path) in IMAGE_KINDS
 
 
 def is_pdf_file(file_path: str) -> bool:
@@ -56,8 +92,7 @@ def is_pdf_file(file_path: str) -> bool:
     Returns:
         bool: 是否為 PDF 格式
     """
-    _, ext = os.path.splitext(file_path)
-    return ext.lower() in SUPPORTED_PDF_FORMAT
+    return detect_file_kind(file_path) == PDF_KIND
 
 
 def validate_files(file_paths: List[str]) -> Tuple[List[str], List[str]]: